@@ -1,7 +1,7 @@
 """
 Base class for components
 """
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 class BaseComponent:
@@ -16,15 +16,17 @@ class BaseComponent:
     name: str = None  # type: ignore
     setting_prefix: str = None  # type: ignore
 
-    def __init__(self, service, name: str = None, setting_prefix: str = None):
+    def __init__(
+        self, service, name: Optional[str] = None, setting_prefix: Optional[str] = None
+    ):
         """
 
         :param service:
         :type service:
         :param name:
-        :type name: str
+        :type name: Optional[str]
         :param setting_prefix
-        :type setting_prefix: str
+        :type setting_prefix: Optional[str]
         """
         self.service = service
         self.settings = service.settings
@@ -35,22 +37,20 @@ class BaseComponent:
         if setting_prefix:
             self.setting_prefix = setting_prefix
 
-        self.config: Dict[str, Any] = {
-            key.replace(self.setting_prefix, ""): value
-            for key, value in self.settings.items()
-            if key.startswith(self.setting_prefix)
-        }
+        self.config: Dict[str, Any] = dict(self.settings.prefixed(self.setting_prefix))
 
     @classmethod
-    def from_service(cls, service, name: str = None, setting_prefix: str = None):
+    def from_service(
+        cls, service, name: Optional[str] = None, setting_prefix: Optional[str] = None
+    ):
         """
         Initialize components from a service instance
         :param service:
         :type service:
         :param name:
-        :type name: str
+        :type name: Optional[str]
         :param setting_prefix:
-        :type setting_prefix: str
+        :type setting_prefix: Optional[str]
         :return:
         """
         obj = cls(service, name, setting_prefix)
@@ -10,6 +10,8 @@ class LoggerMixin:  # pylint: disable=too-few-public-methods
     Logger Mixin
     """
 
+    __slots__ = ()
+
     @cached_property
     def logger(self) -> logging.Logger:
         """
@@ -27,7 +27,11 @@ class ManagerMixin:  # pylint: disable=too-few-public-methods
 
         self._cls_components: Dict[str, int] = dict(
             sorted(
-                self.settings[self.manage].items(),  # type: ignore
+                (
+                    items
+                    for items in self.settings[self.manage].items()  # type: ignore
+                    if self.is_enabled(items[0])
+                ),
                 key=lambda items: items[1],
             )
         )
@@ -36,3 +40,14 @@ class ManagerMixin:  # pylint: disable=too-few-public-methods
             cls.name: cls.from_service(self.service)  # type: ignore
             for cls in (load_object(cls) for cls in self._cls_components.keys())
         }
+
+    # pylint: disable=unused-argument
+    def is_enabled(self, cls: str) -> bool:
+        """
+        Check if a component should be loaded in this process
+        :param cls:
+        :type cls: str
+        :return:
+        :rtype: bool
+        """
+        return True
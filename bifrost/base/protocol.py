@@ -1,94 +1,152 @@
 """
 Transports and Protocols
 https://docs.python.org/3/library/asyncio-protocol.html
+
+There is one protocol per transport, so the protocols keep their attributes in
+__slots__ without any __dict__: the name, role and setting prefix are class
+attributes, the role being set in the class compiled by the middleware manager,
+and the configuration, logger and stats are shared through the channel.
 """
 from __future__ import annotations
 
-import functools
-from typing import TYPE_CHECKING, Any, Dict, Set
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Set, Type
 
 from bifrost.exceptions.protocol import TransportNotDefinedException
 
 if TYPE_CHECKING:
     from asyncio.transports import Transport
 
+    from bifrost.channels.registry import Connection
+    from bifrost.channels.timeouts import ConnectionTimeouts
+    from bifrost.channels.timings import HandshakeTimings
     from bifrost.settings import Settings
 
 
-class ProtocolMixin:
+# the loggers by the protocol classes
+_LOGGERS: Dict[Type, logging.Logger] = {}
+
+
+class ProtocolMixin:  # pylint: disable=too-many-instance-attributes
     """
     Base Protocol
     """
 
+    __slots__ = (
+        "channel",
+        "config",
+        "_transport",
+        "_server_transport",
+        "_client_transport",
+        "writing_paused",
+        "buffered",
+        "timeouts",
+        "timings",
+        "source",
+        "connection",
+    )
+
     name: str = None  # type: ignore
     role: str = None  # type: ignore
     setting_prefix: str = None  # type: ignore
 
     certificates: Set[str] = set()
 
-    def __init__(
-        self, channel, name: str = None, role: str = None, setting_prefix: str = None
-    ):
+    def __init__(self, channel):
         """
 
         :param channel:
         :type channel:
-        :param name:
-        :type name: str
-        :param role:
-        :type role: str
-        :param setting_prefix:
-        :type setting_prefix: str
         """
         self.channel = channel
 
-        if name:
-            self.name: str = name
-        if role:
-            self.role: str = role
-        if setting_prefix:
-            self.setting_prefix: str = setting_prefix
+        # the configuration of this protocol, built once by the channel and
+        # shared by all protocols of the same class
+        self.config: Mapping[str, Any] = channel.protocol_config(
+            type(self), self.setting_prefix
+        )
 
         self._transport = None
         self._server_transport = None
         self._client_transport = None
 
+        # flow control: whether the transport of this protocol is over its high
+        # watermark, and how many bytes were buffered when it was paused
+        self.writing_paused: bool = False
+        self.buffered: int = 0
+
+        # the timeouts of the connection, shared by both sides
+        self.timeouts: Optional[ConnectionTimeouts] = None
+        # the phases of the handshake, until the first byte from the target
+        self.timings: Optional[HandshakeTimings] = None
+
+        # the source of a connection admitted on the interface, released to the
+        # channel when the connection is lost
+        self.source: Any = None
+
+        # the connection in the registry of RegistryMiddleware, shared by both
+        # sides
+        self.connection: Optional[Connection] = None
+
     @classmethod
-    def from_channel(
-        cls, channel, name: str = None, role: str = None, setting_prefix: str = None
-    ) -> ProtocolMixin:
+    def from_channel(cls, channel, role: str = None) -> ProtocolMixin:
         """
 
         :param channel:
         :type channel:
-        :param name:
-        :type name: str
         :param role:
         :type role: str
-        :param setting_prefix:
-        :type setting_prefix: str
-        :return:
+        :return: an instance of the class compiled with the middlewares for the
+            role
         :rtype: ProtocolMixin
         """
-        obj = cls(channel, name, role, setting_prefix)
+        compiled = channel.middleware_manager.compile(cls, role or cls.role)
+        obj = compiled(channel)
         return obj
 
-    @functools.cached_property
-    def config(self):
+    @classmethod
+    def build_config(cls, channel, setting_prefix: str) -> Dict[str, Any]:
         """
-        The configuration of this protocol
+        Build the configuration of the protocols of this class in a channel;
+        override it to resolve the objects used by every connection
+        :param channel:
+        :type channel: Channel
+        :param setting_prefix:
+        :type setting_prefix: str
         :return:
+        :rtype: Dict[str, Any]
         """
-        config: Dict[str, Any] = {
-            key.replace(self.setting_prefix, ""): value
-            for key, value in self.settings.items()
-            if key.startswith(self.setting_prefix)
-        }
+        config: Dict[str, Any] = dict(channel.settings.prefixed(setting_prefix))
 
-        config.update(self.channel.config)
+        config.update(channel.config)
 
         return config
 
+    @property
+    def logger(self) -> logging.Logger:
+        """
+        The logger of the class of this protocol
+        :return:
+        :rtype: Logger
+        """
+        cls: Type = type(self)
+        try:
+            return _LOGGERS[cls]
+        except KeyError:
+            logger = _LOGGERS[cls] = logging.getLogger(
+                ".".join([cls.__module__, cls.__name__])
+            )
+            return logger
+
+    @property
+    def stats(self):
+        """
+
+        :return:
+        :rtype: Stats
+        """
+        return self.channel.stats
+
     @property
     def settings(self) -> Settings:
         """
@@ -173,6 +231,116 @@ class ProtocolMixin:
         """
         self._client_transport = value
 
+    @property
+    def peer_transport(self) -> Transport:
+        """
+        The transport on the other side of the relay: the server transport for
+        a client protocol, the client transport for an interface protocol
+        :return:
+        :rtype: Transport
+        """
+        if self.role == "client":
+            return self.server_transport
+        return self.client_transport
+
+    @peer_transport.setter
+    def peer_transport(self, value) -> None:
+        """
+        Set the transport on the other side of the relay for the role
+        :param value:
+        :type value:
+        :return:
+        :rtype: None
+        """
+        if self.role == "client":
+            self.server_transport = value
+        else:
+            self.client_transport = value
+
+    def set_write_buffer_limits(self, transport) -> None:
+        """
+        Apply the watermarks of this role configured in the channel, e.g.
+        INTERFACE_WRITE_BUFFER_HIGH and INTERFACE_WRITE_BUFFER_LOW
+        :param transport:
+        :type transport:
+        :return:
+        :rtype: None
+        """
+        role = (self.role or "interface").upper()
+        high = self.config.get(f"{role}_WRITE_BUFFER_HIGH")
+        low = self.config.get(f"{role}_WRITE_BUFFER_LOW")
+        if high is not None or low is not None:
+            transport.set_write_buffer_limits(high=high, low=low)
+
+    def pause_peer_reading(self) -> None:
+        """
+        The transport of this protocol is over its high watermark, stop reading
+        from the peer until it is drained
+        :return:
+        :rtype: None
+        """
+        self.writing_paused = True
+        self.buffered = self.transport.get_write_buffer_size()
+        self.channel.counter_buffered.add(self.buffered)
+
+        try:
+            peer_transport = self.peer_transport
+        except TransportNotDefinedException:
+            # the peer is not connected yet, it would be paused when connected
+            return
+        if not peer_transport.is_closing():
+            peer_transport.pause_reading()
+
+    def resume_peer_reading(self) -> None:
+        """
+        The transport of this protocol is drained below its low watermark,
+        continue reading from the peer
+        :return:
+        :rtype: None
+        """
+        self.writing_paused = False
+        self.release_buffered()
+
+        try:
+            peer_transport = self.peer_transport
+        except TransportNotDefinedException:
+            return
+        if not peer_transport.is_closing():
+            peer_transport.resume_reading()
+
+    def release_buffered(self) -> None:
+        """
+        Remove the bytes buffered at pausing from the stats
+        :return:
+        :rtype: None
+        """
+        if self.buffered:
+            self.channel.counter_buffered.add(-self.buffered)
+            self.buffered = 0
+
+    def release_source(self) -> None:
+        """
+        Release the source of the connection admitted to the channel
+        :return:
+        :rtype: None
+        """
+        if self.source is not None:
+            self.channel.release(self.source)
+            self.source = None
+
+    def data_relayed(self) -> None:
+        """
+        Data is relayed to the peer: the connection is active, and the first
+        data ends the timings of the handshake
+        :return:
+        :rtype: None
+        """
+        if (timeouts := self.timeouts) is not None:
+            timeouts.touch()
+        if (timings := self.timings) is not None:
+            self.timings = None
+            timings.phase("first_byte")
+
     @property
     def socket(self):
         return self.transport.get_extra_info("socket")
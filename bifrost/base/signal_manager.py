@@ -9,6 +9,8 @@ class SignalManagerMixin:  # pylint: disable=too-few-public-methods
     Signal Manager Mixin
     """
 
+    __slots__ = ()
+
     @cached_property
     def signal_manager(self):
         """
@@ -9,6 +9,8 @@ class StatsMixin:  # pylint: disable=too-few-public-methods
     Stats Mixin
     """
 
+    __slots__ = ()
+
     @cached_property
     def stats(self):
         """
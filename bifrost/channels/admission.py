@@ -0,0 +1,160 @@
+"""
+Admission control of the connections on an interface
+
+A channel accepts up to MAX_CONNECTIONS connections at once; at capacity it
+stops accepting, leaving the new connections in the backlog of the listening
+sockets until a connection is closed, instead of accepting and closing them.
+The accepts are paced by a token bucket of ACCEPT_RATE per second with bursts of
+ACCEPT_BURST.
+
+A source is a network of SOURCE_LIMITS containing the address of the client,
+limited to its connections as a whole, or else the address itself within its
+network of SOURCE_PREFIX_V4 or SOURCE_PREFIX_V6 bits, limited to
+MAX_CONNECTIONS_PER_SOURCE. A connection from a source at its limit can only be
+known once accepted, so it is closed at once.
+"""
+from __future__ import annotations
+
+import ipaddress
+from collections import defaultdict
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+# the source of the connections not limited by source
+ANY = "*"
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+class TokenBucket:  # pylint: disable=too-few-public-methods
+    """
+    Allow RATE events per second in average, and BURST events at once
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: Optional[float] = None, now: float = 0):
+        """
+
+        :param rate:
+        :type rate: float
+        :param burst: the rate if None
+        :type burst: Optional[float]
+        :param now:
+        :type now: float
+        """
+        self.rate: float = rate
+        self.burst: float = max(burst or rate, 1)
+        self.tokens: float = self.burst
+        self.updated: float = now
+
+    def take(self, now: float) -> float:
+        """
+        Take a token
+        :param now:
+        :type now: float
+        :return: 0 if a token is taken, or the seconds to wait for the next token
+        :rtype: float
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class Admission:
+    """
+    The connections accepted by a channel, in total and by source
+    """
+
+    def __init__(self, config: Mapping[str, Any]):
+        """
+
+        :param config: the configuration of the channel
+        :type config: Mapping[str, Any]
+        """
+        self.max_connections: Optional[int] = config.get("MAX_CONNECTIONS")
+        self.max_per_source: Optional[int] = config.get("MAX_CONNECTIONS_PER_SOURCE")
+        self.prefixes: Dict[int, int] = {
+            4: config.get("SOURCE_PREFIX_V4", 32),
+            6: config.get("SOURCE_PREFIX_V6", 64),
+        }
+        self.networks: List[Tuple[IPNetwork, int]] = [
+            (ipaddress.ip_network(network), limit)
+            for network, limit in (config.get("SOURCE_LIMITS") or {}).items()
+        ]
+
+        # the connections accepted in total and by source
+        self.active: int = 0
+        self.sources: Dict[Any, int] = defaultdict(int)
+
+    @property
+    def full(self) -> bool:
+        """
+        Whether the channel is at capacity
+        :return:
+        :rtype: bool
+        """
+        return self.max_connections is not None and self.active >= self.max_connections
+
+    def source(self, host: str) -> Tuple[Any, Optional[int]]:
+        """
+        Get the source of an address and its limit
+        :param host:
+        :type host: str
+        :return:
+        :rtype: Tuple[Any, Optional[int]]
+        """
+        if not self.networks and self.max_per_source is None:
+            return ANY, None
+
+        address = ipaddress.ip_address(host.split("%")[0])
+        if getattr(address, "ipv4_mapped", None) is not None:
+            address = address.ipv4_mapped  # type: ignore
+
+        for network, limit in self.networks:
+            if address in network:
+                return network, limit
+
+        if self.max_per_source is None:
+            return ANY, None
+        return (
+            ipaddress.ip_network(
+                (address, self.prefixes[address.version]), strict=False
+            ),
+            self.max_per_source,
+        )
+
+    def admit(self, host: str) -> Optional[Any]:
+        """
+        Admit a connection accepted from an address
+        :param host:
+        :type host: str
+        :return: the source of the connection, None if it is at its limit
+        :rtype: Optional[Any]
+        """
+        source, limit = self.source(host)
+        if limit is not None and self.sources.get(source, 0) >= limit:
+            return None
+
+        self.active += 1
+        if limit is None:
+            return ANY
+        self.sources[source] += 1
+        return source
+
+    def release(self, source: Any) -> None:
+        """
+        A connection admitted is closed
+        :param source:
+        :type source: Any
+        :return:
+        :rtype: None
+        """
+        self.active -= 1
+        if source is not ANY:
+            if (count := self.sources[source] - 1) > 0:
+                self.sources[source] = count
+            else:
+                del self.sources[source]
@@ -1,15 +1,30 @@
 """
 Channel
 """
+import asyncio
+import socket
 import ssl
 from asyncio.events import get_event_loop
-from typing import Optional
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Type
 
 from bifrost.base import BaseComponent, LoggerMixin, SignalManagerMixin, StatsMixin
+from bifrost.channels.admission import Admission, TokenBucket
+from bifrost.channels.timeouts import ConnectionTimeouts
+from bifrost.channels.timings import PHASES, PREFIX
+from bifrost.extensions.stats import Counter
+from bifrost.utils.histogram import Histogram
 from bifrost.utils.misc import load_object
+from bifrost.utils.timer_wheel import TimerWheel, get_timer_wheel
 
+# the seconds to wait before accepting again after an error, as the loop does
+ACCEPT_RETRY_DELAY = 1
 
-class Channel(BaseComponent, LoggerMixin, SignalManagerMixin, StatsMixin):
+
+class Channel(  # pylint: disable=too-many-instance-attributes
+    BaseComponent, LoggerMixin, SignalManagerMixin, StatsMixin
+):
     """
     Channel
     """
@@ -28,7 +43,150 @@ class Channel(BaseComponent, LoggerMixin, SignalManagerMixin, StatsMixin):
 
         self.config.update(self.settings["CHANNELS"][self.name])
 
-        self.server = None
+        self.middleware_manager = service.middleware_manager
+        self.resolver = service.resolver
+
+        # the configurations by the protocol classes and setting prefixes
+        self._protocol_configs: Dict[Tuple[Type, str], Mapping[str, Any]] = {}
+
+        # the listening sockets and the tasks accepting the connections on them
+        self.sockets: List[socket.socket] = []
+        self._serving: List[asyncio.Task] = []
+
+        self.admission: Admission = Admission(self.config)
+        self.accept_bucket: Optional[TokenBucket] = (
+            TokenBucket(self.config["ACCEPT_RATE"], self.config.get("ACCEPT_BURST"))
+            if self.config.get("ACCEPT_RATE")
+            else None
+        )
+        # set while the channel is under capacity
+        self._available: Optional[asyncio.Event] = None
+
+        # the counters of the protocols in this channel, resolved once here
+        self.counter_data_sent: Counter = self.stats.counter("data/sent")
+        self.counter_data_received: Counter = self.stats.counter("data/received")
+        self.counter_channel_data_sent: Counter = self.stats.counter(
+            f"data/{self.name}/sent"
+        )
+        self.counter_channel_data_received: Counter = self.stats.counter(
+            f"data/{self.name}/received"
+        )
+        self.counter_paused: Counter = self.stats.counter(f"flow/{self.name}/paused")
+        self.counter_resumed: Counter = self.stats.counter(f"flow/{self.name}/resumed")
+        self.counter_buffered: Counter = self.stats.counter("flow/buffered")
+        self._counter_connections: Dict[str, Counter] = {}
+        # the outbound connections won by every family, their total latency in
+        # microseconds, and the ones timed out
+        self.counter_connect_families: Dict[int, Counter] = {
+            socket.AF_INET: self.stats.counter(f"connect/{self.name}/ipv4"),
+            socket.AF_INET6: self.stats.counter(f"connect/{self.name}/ipv6"),
+        }
+        self.counter_connect_latency: Counter = self.stats.counter(
+            f"connect/{self.name}/latency_us"
+        )
+        self.counter_connect_timeouts: Counter = self.stats.counter(
+            f"connect/{self.name}/timeouts"
+        )
+        # the connections admitted and open, the connections closed at once for
+        # their sources at limit, and the times of pausing the accepts at
+        # capacity or for the accept rate
+        self.counter_active: Counter = self.stats.counter(
+            f"admission/{self.name}/active"
+        )
+        self.counter_rejected: Counter = self.stats.counter(
+            f"admission/{self.name}/rejected"
+        )
+        self.counter_accept_paused: Counter = self.stats.counter(
+            f"admission/{self.name}/paused"
+        )
+        self.counter_accept_throttled: Counter = self.stats.counter(
+            f"admission/{self.name}/throttled"
+        )
+        # the connections aborted by every timeout
+        self.counter_timeouts: Dict[str, Counter] = {
+            timeout: self.stats.counter(f"timeouts/{self.name}/{timeout}")
+            for timeout in ("handshake", "idle", "lifetime")
+        }
+        # the durations of every phase of the handshakes
+        self.histogram_phases: Dict[str, Histogram] = {
+            phase: self.stats.histogram(f"{PREFIX}{self.name}/{phase}")
+            for phase in PHASES
+        }
+
+    def protocol_config(self, cls: Type, setting_prefix: str) -> Mapping[str, Any]:
+        """
+        Get the read-only configuration of a protocol class in this channel,
+        built at the first time
+        :param cls:
+        :type cls: Type
+        :param setting_prefix:
+        :type setting_prefix: str
+        :return:
+        :rtype: Mapping[str, Any]
+        """
+        try:
+            return self._protocol_configs[(cls, setting_prefix)]
+        except KeyError:
+            config = self._protocol_configs[(cls, setting_prefix)] = MappingProxyType(
+                cls.build_config(self, setting_prefix)
+            )
+            return config
+
+    @cached_property
+    def timer_wheel(self) -> TimerWheel:
+        """
+        The timer wheel of the loop, shared by all channels in it
+        :return:
+        :rtype: TimerWheel
+        """
+        return get_timer_wheel(resolution=self.settings["TIMER_WHEEL_RESOLUTION"])
+
+    @cached_property
+    def timeout_ticks(self) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        """
+        HANDSHAKE_TIMEOUT, IDLE_TIMEOUT and LIFETIME_TIMEOUT in ticks of the
+        timer wheel, None if not configured; with one more tick, as the ticks of
+        the connections are rounded down
+        :return:
+        :rtype: Tuple[Optional[int], Optional[int], Optional[int]]
+        """
+        handshake, idle, lifetime = (
+            None
+            if (timeout := self.config.get(key)) is None
+            else self.timer_wheel.ticks(timeout) + 1
+            for key in ("HANDSHAKE_TIMEOUT", "IDLE_TIMEOUT", "LIFETIME_TIMEOUT")
+        )
+        return handshake, idle, lifetime
+
+    def track(self, transport, handshake: bool = True) -> Optional[ConnectionTimeouts]:
+        """
+        Start the timeouts of a connection made on the interface
+        :param transport:
+        :type transport: Transport
+        :param handshake: whether the connection starts with a handshake
+        :type handshake: bool
+        :return: None if no timeout is configured
+        :rtype: Optional[ConnectionTimeouts]
+        """
+        if self.timeout_ticks == (None, None, None):
+            return None
+        return ConnectionTimeouts(self, transport, handshake)
+
+    def counter_connections(self, protocol: str) -> Counter:
+        """
+        Get the counter of the connections made by a protocol in this channel
+        :param protocol: the name of the protocol
+        :type protocol: str
+        :return:
+        :rtype: Counter
+        """
+        try:
+            return self._counter_connections[protocol]
+        except KeyError:
+            counter = self._counter_connections[protocol] = self.stats.counter(
+                f"connections/{self.name}/{protocol}"
+            )
+            return counter
 
     async def start(self) -> None:
         """
@@ -36,7 +194,11 @@ class Channel(BaseComponent, LoggerMixin, SignalManagerMixin, StatsMixin):
         :return:
         :rtype: None
         """
-        cls_interface = load_object(self.config["INTERFACE_PROTOCOL"])
+        cls_interface = self.middleware_manager.compile(
+            load_object(self.config["INTERFACE_PROTOCOL"]), "interface"
+        )
+        # build the configuration before any connection
+        self.protocol_config(cls_interface, cls_interface.setting_prefix)
 
         loop = get_event_loop()
 
@@ -51,12 +213,14 @@ class Channel(BaseComponent, LoggerMixin, SignalManagerMixin, StatsMixin):
         else:
             ssl_context = None
 
-        self.server = await loop.create_server(
-            protocol_factory=lambda: cls_interface.from_channel(self, role="interface"),
-            host=self.config["INTERFACE_ADDRESS"],
-            port=self.config["INTERFACE_PORT"],
-            ssl=ssl_context,
-        )
+        self._available = asyncio.Event()
+        self._available.set()
+
+        self.sockets = await self._listen(loop)
+        for sock in self.sockets:
+            self._serving.append(
+                loop.create_task(self._serve(sock, cls_interface, ssl_context))
+            )
 
         self.logger.info(
             "Channel [%s] is open; "
@@ -69,11 +233,165 @@ class Channel(BaseComponent, LoggerMixin, SignalManagerMixin, StatsMixin):
 
     async def stop(self) -> None:
         """
+        Stop accepting the connections; the connections open are kept
 
         :return:
         :rtype: None
         """
-        if self.server:
-            self.server.close()
-            await self.server.wait_closed()
+        for task in self._serving:
+            task.cancel()
+        await asyncio.gather(*self._serving, return_exceptions=True)
+        self._serving.clear()
+
+        if self.sockets:
+            for sock in self.sockets:
+                sock.close()
+            self.sockets.clear()
             self.logger.info("Channel [%s] is closed.", self.name)
+
+    def release(self, source: Any) -> None:
+        """
+        A connection admitted on the interface is closed, accept again if the
+        channel was at capacity
+        :param source:
+        :type source: Any
+        :return:
+        :rtype: None
+        """
+        self.admission.release(source)
+        self.counter_active.add(-1)
+        if self._available is not None and not self.admission.full:
+            self._available.set()
+
+    async def _listen(self, loop) -> List[socket.socket]:
+        """
+        Bind the listening sockets of the interface, one per address, with the
+        backlog of BACKLOG
+        :param loop:
+        :type loop: AbstractEventLoop
+        :return:
+        :rtype: List[socket.socket]
+        """
+        infos = await loop.getaddrinfo(
+            self.config["INTERFACE_ADDRESS"],
+            self.config["INTERFACE_PORT"],
+            type=socket.SOCK_STREAM,
+            flags=socket.AI_PASSIVE,
+        )
+
+        sockets: List[socket.socket] = []
+        try:
+            for family, type_, proto, _, address in dict.fromkeys(infos):
+                sock = socket.socket(family, type_, proto)
+                sockets.append(sock)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                if self.settings["WORKERS"] > 1:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                if family == socket.AF_INET6:
+                    sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 1)
+                sock.bind(address)
+                sock.listen(self.config.get("BACKLOG", 100))
+                sock.setblocking(False)
+        except BaseException:
+            for sock in sockets:
+                sock.close()
+            raise
+        return sockets
+
+    async def _serve(
+        self,
+        sock: socket.socket,
+        cls_interface: Type,
+        ssl_context: Optional[ssl.SSLContext],
+    ) -> None:
+        """
+        Accept the connections on a listening socket while the channel is under
+        capacity, at the accept rate
+        :param sock:
+        :type sock: socket.socket
+        :param cls_interface:
+        :type cls_interface: Type
+        :param ssl_context:
+        :type ssl_context: Optional[ssl.SSLContext]
+        :return:
+        :rtype: None
+        """
+        loop = get_event_loop()
+        available: asyncio.Event = self._available  # type: ignore
+
+        while True:
+            if self.admission.full:
+                # the new connections wait in the backlog
+                self.counter_accept_paused.add()
+                available.clear()
+                await available.wait()
+                continue
+
+            if self.accept_bucket is not None and (
+                delay := self.accept_bucket.take(loop.time())
+            ):
+                self.counter_accept_throttled.add()
+                await asyncio.sleep(delay)
+                continue
+
+            try:
+                conn, address = await loop.sock_accept(sock)
+            except OSError as exc:
+                # e.g. out of file descriptors, retry later as the loop does
+                self.logger.error("Failed to accept a connection: %r", exc)
+                await asyncio.sleep(ACCEPT_RETRY_DELAY)
+                continue
+
+            if (source := self.admission.admit(address[0])) is None:
+                self.counter_rejected.add()
+                conn.close()
+                continue
+            self.counter_active.add()
+
+            connect = self._connect(conn, source, cls_interface, ssl_context)
+            if ssl_context is None:
+                await connect
+            else:
+                # not to wait for the TLS handshake
+                loop.create_task(connect)
+
+    async def _connect(
+        self,
+        conn: socket.socket,
+        source: Any,
+        cls_interface: Type,
+        ssl_context: Optional[ssl.SSLContext],
+    ) -> None:
+        """
+        Make the connection of an accepted socket with the interface protocol,
+        which releases its source when it is lost
+        :param conn:
+        :type conn: socket.socket
+        :param source:
+        :type source: Any
+        :param cls_interface:
+        :type cls_interface: Type
+        :param ssl_context:
+        :type ssl_context: Optional[ssl.SSLContext]
+        :return:
+        :rtype: None
+        """
+        protocols: List[Any] = []
+
+        def factory():
+            protocol = cls_interface.from_channel(self, role="interface")
+            protocol.source = source
+            protocols.append(protocol)
+            return protocol
+
+        try:
+            await get_event_loop().connect_accepted_socket(
+                factory, conn, ssl=ssl_context
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            # the protocol is never connected, nor lost then
+            self.logger.debug("Failed to connect an accepted socket: %r", exc)
+            conn.close()
+            for protocol in protocols:
+                protocol.source = None
+            self.release(source)
@@ -0,0 +1,302 @@
+"""
+Registry of the live connections
+
+Every connection made on an interface is registered with an id increasing in
+the order of the connections, its channel, peer, user, destination and the bytes
+relayed, and removed when it is lost. The connections are indexed by the
+channel, the user and the destination, so a query filtered by one of them only
+scans the connections matching it.
+
+A query is paged with a cursor, the id of the last connection of the previous
+page: the ids of all connections, and of the connections of every value indexed,
+are kept in sorted lists, the ones of the connections lost being removed lazily,
+so a page starts with a binary search instead of a scan or a sort from the first
+connection.
+"""
+from __future__ import annotations
+
+import itertools
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# the fields the connections are indexed by
+INDEXES = ("channel", "user", "destination")
+
+
+class Connection:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """
+    A live connection
+    """
+
+    __slots__ = (
+        "registry",
+        "id",
+        "channel",
+        "peer",
+        "user",
+        "destination",
+        "port",
+        "started",
+        "sent",
+        "received",
+    )
+
+    def __init__(self, registry: ConnectionRegistry, id_: int, channel: str, peer: str):
+        """
+
+        :param registry:
+        :type registry: ConnectionRegistry
+        :param id_:
+        :type id_: int
+        :param channel:
+        :type channel: str
+        :param peer: the address of the client, "host:port"
+        :type peer: str
+        """
+        self.registry: ConnectionRegistry = registry
+        self.id: int = id_  # pylint: disable=invalid-name
+        self.channel: str = channel
+        self.peer: str = peer
+        self.user: Optional[str] = None
+        self.destination: Optional[str] = None
+        self.port: Optional[int] = None
+        # the wall time the connection is made
+        self.started: float = time.time()
+        # the bytes received from the client and from the target
+        self.sent: int = 0
+        self.received: int = 0
+
+    def report(self) -> Dict[str, Any]:
+        """
+
+        :return:
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "id": self.id,
+            "channel": self.channel,
+            "peer": self.peer,
+            "user": self.user,
+            "destination": self.destination,
+            "port": self.port,
+            "started": self.started,
+            "sent": self.sent,
+            "received": self.received,
+        }
+
+
+class IndexEntry:
+    """
+    The connections of a value indexed, with their ids in increasing order
+    """
+
+    __slots__ = ("connections", "order")
+
+    def __init__(self):
+        self.connections: Dict[int, Connection] = {}
+        # the ids in increasing order, with the ones removed not dropped yet
+        self.order: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    def __iter__(self) -> Iterator[int]:
+        return self.after(0)
+
+    def add(self, connection: Connection) -> None:
+        """
+        Add a connection; its id is usually the greatest one, and appended
+        :param connection:
+        :type connection: Connection
+        :return:
+        :rtype: None
+        """
+        id_: int = connection.id
+        self.connections[id_] = connection
+        order: List[int] = self.order
+        if not order or order[-1] < id_:
+            order.append(id_)
+        elif order[(index := bisect_left(order, id_))] != id_:
+            # an id still in the order, if it is added again, is not repeated
+            order.insert(index, id_)
+
+    def remove(self, connection: Connection) -> None:
+        """
+        Remove a connection; the ids removed are dropped once they are half of
+        the order
+        :param connection:
+        :type connection: Connection
+        :return:
+        :rtype: None
+        """
+        self.connections.pop(connection.id, None)
+        if len(self.order) > 2 * len(self.connections) + 64:
+            self.order = [id_ for id_ in self.order if id_ in self.connections]
+
+    def after(self, after: int) -> Iterator[int]:
+        """
+        The ids greater than a cursor in increasing order; an id inserted before
+        the position of the iteration, by a connection indexed meanwhile, is
+        skipped
+        :param after:
+        :type after: int
+        :return:
+        :rtype: Iterator[int]
+        """
+        order: List[int] = self.order
+        for id_ in itertools.islice(order, bisect_right(order, after), None):
+            if id_ > after and id_ in self.connections:
+                after = id_
+                yield id_
+
+
+class ConnectionRegistry:
+    """
+    The live connections, indexed by INDEXES
+    """
+
+    def __init__(self):
+        self.connections: Dict[int, Connection] = {}
+        # the ids in increasing order, with the ones lost not removed yet
+        self.order: List[int] = []
+        # the connections by the values of every index
+        self.indexes: Dict[str, Dict[Any, IndexEntry]] = {
+            field: {} for field in INDEXES
+        }
+        self._ids: Iterator[int] = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    def register(self, channel: str, peer: str) -> Connection:
+        """
+        Register a connection made
+        :param channel:
+        :type channel: str
+        :param peer:
+        :type peer: str
+        :return:
+        :rtype: Connection
+        """
+        connection = Connection(self, next(self._ids), channel, peer)
+        self.connections[connection.id] = connection
+        self.order.append(connection.id)
+        self._index(connection, "channel")
+        return connection
+
+    def update(self, connection: Connection, **fields: Any) -> None:
+        """
+        Update the fields of a connection, and its indexes
+        :param connection:
+        :type connection: Connection
+        :param fields:
+        :type fields: Any
+        :return:
+        :rtype: None
+        """
+        for field, value in fields.items():
+            indexed: bool = field in self.indexes
+            if indexed:
+                self._unindex(connection, field)
+            setattr(connection, field, value)
+            if indexed:
+                self._index(connection, field)
+
+    def unregister(self, connection: Connection) -> None:
+        """
+        Remove a connection lost
+        :param connection:
+        :type connection: Connection
+        :return:
+        :rtype: None
+        """
+        if self.connections.pop(connection.id, None) is None:
+            return
+        for field in INDEXES:
+            self._unindex(connection, field)
+
+        # the ids lost are removed once they are half of the list
+        if len(self.order) > 2 * len(self.connections) + 64:
+            self.order = [id_ for id_ in self.order if id_ in self.connections]
+
+    def select(
+        self, after: int = 0, min_bytes: int = 0, **filters: Any
+    ) -> Iterator[Connection]:
+        """
+        The connections registered after a cursor in the order of their ids,
+        filtered by the values of the fields and the bytes relayed
+        :param after: the id of the last connection of the previous page
+        :type after: int
+        :param min_bytes: the least bytes sent and received
+        :type min_bytes: int
+        :param filters: the values of the fields, None for any
+        :type filters: Any
+        :return:
+        :rtype: Iterator[Connection]
+        """
+        filters = {
+            field: value for field, value in filters.items() if value is not None
+        }
+
+        ids: Iterable[int]
+        indexed = [
+            self.indexes[field].get(value, IndexEntry())
+            for field, value in filters.items()
+            if field in self.indexes
+        ]
+        if indexed:
+            ids = min(indexed, key=len).after(after)
+        else:
+            ids = itertools.islice(self.order, bisect_right(self.order, after), None)
+
+        for id_ in ids:
+            connection: Optional[Connection] = self.connections.get(id_)
+            if connection is None:
+                continue
+            if connection.sent + connection.received < min_bytes:
+                continue
+            if any(
+                getattr(connection, field) != value for field, value in filters.items()
+            ):
+                continue
+            yield connection
+
+    def _index(self, connection: Connection, field: str) -> None:
+        """
+
+        :param connection:
+        :type connection: Connection
+        :param field:
+        :type field: str
+        :return:
+        :rtype: None
+        """
+        if (value := getattr(connection, field)) is None:
+            return
+        index: Dict[Any, IndexEntry] = self.indexes[field]
+        if (entry := index.get(value)) is None:
+            entry = index[value] = IndexEntry()
+        entry.add(connection)
+
+    def _unindex(self, connection: Connection, field: str) -> None:
+        """
+
+        :param connection:
+        :type connection: Connection
+        :param field:
+        :type field: str
+        :return:
+        :rtype: None
+        """
+        value = getattr(connection, field)
+        if value is None:
+            return
+        index: Dict[Any, IndexEntry] = self.indexes[field]
+        if (entry := index.get(value)) is not None:
+            entry.remove(connection)
+            if not entry:
+                del index[value]
+
+
+__all__ = ["Connection", "ConnectionRegistry"]
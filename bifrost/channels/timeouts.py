@@ -0,0 +1,143 @@
+"""
+Timeouts of the connections
+
+Every connection of a channel has one timer in the timer wheel of the loop for
+the nearest of its deadlines: the handshake not done after HANDSHAKE_TIMEOUT,
+no data in either direction for IDLE_TIMEOUT, or the connection open for
+LIFETIME_TIMEOUT. The data only touches the activity tick of the connection; the
+timer checks it when it fires and is scheduled again for the next deadline, so a
+busy connection costs nothing in the wheel.
+
+Both transports of an expired connection are aborted, dropping the data buffered
+for a peer not reading.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, Tuple, cast
+
+from bifrost.exceptions.protocol import TransportNotDefinedException
+from bifrost.utils.timer_wheel import Timer, TimerWheel
+
+if TYPE_CHECKING:
+    from asyncio.transports import Transport
+
+    from bifrost.base.protocol import ProtocolMixin
+    from bifrost.channels import Channel
+
+
+class ConnectionTimeouts:
+    """
+    The deadlines of a connection, shared by the protocols of both transports
+    """
+
+    __slots__ = (
+        "channel",
+        "transport",
+        "wheel",
+        "started",
+        "activity",
+        "handshake",
+        "timer",
+    )
+
+    def __init__(self, channel: Channel, transport: Transport, handshake: bool = True):
+        """
+
+        :param channel:
+        :type channel: Channel
+        :param transport: the transport of the interface
+        :type transport: Transport
+        :param handshake: whether the connection starts with a handshake
+        :type handshake: bool
+        """
+        self.channel: Channel = channel
+        self.transport: Transport = transport
+        self.wheel: TimerWheel = channel.timer_wheel
+
+        # in ticks of the wheel
+        self.started: int = self.wheel.now()
+        self.activity: int = self.started
+        self.handshake: bool = handshake
+
+        self.timer: Optional[Timer] = None
+        self._schedule()
+
+    def touch(self) -> None:
+        """
+        Some data is received on either side
+        :return:
+        :rtype: None
+        """
+        self.activity = self.wheel.tick
+
+    def handshake_done(self) -> None:
+        """
+        The handshake is done, the connection is relaying data; the handshake
+        deadline is dropped when the timer fires
+        :return:
+        :rtype: None
+        """
+        self.handshake = False
+
+    def cancel(self) -> None:
+        """
+        The connection is lost
+        :return:
+        :rtype: None
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def deadline(self) -> Optional[Tuple[int, str]]:
+        """
+        The nearest deadline in ticks and its timeout
+        :return: None if no timeout is configured
+        :rtype: Optional[Tuple[int, str]]
+        """
+        handshake, idle, lifetime = self.channel.timeout_ticks
+        deadlines = []
+        if self.handshake and handshake is not None:
+            deadlines.append((self.started + handshake, "handshake"))
+        if idle is not None:
+            deadlines.append((self.activity + idle, "idle"))
+        if lifetime is not None:
+            deadlines.append((self.started + lifetime, "lifetime"))
+        return min(deadlines, default=None)
+
+    def _schedule(self) -> None:
+        """
+
+        :return:
+        :rtype: None
+        """
+        if (nearest := self.deadline()) is not None:
+            self.timer = self.wheel.call_at(nearest[0], self._expire)
+
+    def _expire(self) -> None:
+        """
+        Abort the connection if a deadline is passed, or wait for the next one
+        :return:
+        :rtype: None
+        """
+        self.timer = None
+        nearest: Optional[Tuple[int, str]] = self.deadline()
+        if nearest is None or nearest[0] > self.wheel.tick:
+            self._schedule()
+            return
+
+        timeout: str = nearest[1]
+        self.channel.counter_timeouts[timeout].add()
+        self.channel.logger.debug(
+            "[%s] %s timeout", self.transport.get_extra_info("peername"), timeout
+        )
+
+        protocol = cast("ProtocolMixin", self.transport.get_protocol())
+        self.transport.abort()
+        try:
+            protocol.peer_transport.abort()
+        except TransportNotDefinedException:
+            pass
+
+
+__all__ = ["ConnectionTimeouts"]
@@ -0,0 +1,96 @@
+"""
+Latency of the phases of the handshakes
+
+Every handshake on the interface is timed phase by phase, each phase counted in
+the histogram "handshake/<channel>/<phase>" of Stats:
+
+* greeting: the connection is made until its greeting is received
+* auth: the method is selected until the credentials are checked, e.g. by the
+  backend of the authentication
+* request: the previous reply is sent until the request is received
+* resolve: the host of the target is looked up
+* connect: the target is connected
+* first_byte: the request is replied until the first byte from the target
+* total: the connection is made until the request is replied
+
+A phase costs one observation in a histogram of fixed memory.
+"""
+from __future__ import annotations
+
+from asyncio import AbstractEventLoop
+from typing import TYPE_CHECKING, Dict, Mapping, Optional
+
+if TYPE_CHECKING:
+    from bifrost.channels import Channel
+    from bifrost.utils.histogram import Histogram
+
+PREFIX = "handshake/"
+
+PHASES = ("greeting", "auth", "request", "resolve", "connect", "first_byte", "total")
+
+
+class HandshakeTimings:
+    """
+    The start of the current phase of a handshake, shared by the protocols of
+    both transports until the first byte from the target
+    """
+
+    __slots__ = ("histograms", "loop", "started", "mark")
+
+    def __init__(self, channel: Channel, loop: AbstractEventLoop):
+        """
+
+        :param channel:
+        :type channel: Channel
+        :param loop:
+        :type loop: AbstractEventLoop
+        """
+        self.histograms: Dict[str, Histogram] = channel.histogram_phases
+        self.loop: AbstractEventLoop = loop
+        # the loop time the connection is made, and the current phase starts
+        self.started: float = loop.time()
+        self.mark: float = self.started
+
+    def phase(self, name: str) -> None:
+        """
+        A phase ends now, and the next one starts
+        :param name:
+        :type name: str
+        :return:
+        :rtype: None
+        """
+        now: float = self.loop.time()
+        self.histograms[name].observe(now - self.mark)
+        self.mark = now
+
+    def replied(self) -> None:
+        """
+        The request is replied, the handshake is done
+        :return:
+        :rtype: None
+        """
+        now: float = self.loop.time()
+        self.histograms["total"].observe(now - self.started)
+        self.mark = now
+
+
+def summaries(
+    histograms: Mapping[str, Histogram]
+) -> Dict[str, Dict[str, Dict[str, Optional[float]]]]:
+    """
+    The summaries of the phases observed, by the channels
+    :param histograms: the histograms of Stats
+    :type histograms: Mapping[str, Histogram]
+    :return:
+    :rtype: Dict[str, Dict[str, Dict[str, Optional[float]]]]
+    """
+    channels: Dict[str, Dict[str, Dict[str, Optional[float]]]] = {}
+    for key, histogram in histograms.items():
+        if not key.startswith(PREFIX) or not histogram.count:
+            continue
+        channel, _, phase = key[len(PREFIX) :].rpartition("/")
+        channels.setdefault(channel, {})[phase] = histogram.summary()
+    return channels
+
+
+__all__ = ["HandshakeTimings", "PHASES", "summaries"]
@@ -53,3 +53,12 @@ class Socks5NetworkUnreachableException(Socks5Exception):
     """
     The target can't be reached
     """
+
+
+class Socks5AddressTypeNotSupportedException(Socks5Exception):
+    """
+    ATYP is not supported other than:
+    * IP V4 address: X'01'
+    * DOMAINNAME: X'03'
+    * IP V6 address: X'04'
+    """
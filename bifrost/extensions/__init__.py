@@ -2,10 +2,22 @@
 All ready to use extensions
 """
 from bifrost.extensions.logstats import LogStats
+from bifrost.extensions.loop_monitor import LoopMonitor
 from bifrost.extensions.mail import Mail
 from bifrost.extensions.manager import ExtensionManager
+from bifrost.extensions.negative_cache import NegativeCache
 from bifrost.extensions.rpc import RPC
-from bifrost.extensions.stats import Stats
+from bifrost.extensions.stats import SharedMemoryStats, Stats
 from bifrost.extensions.web import Web
 
-__all__ = ["LogStats", "Mail", "ExtensionManager", "RPC", "Stats", "Web"]
+__all__ = [
+    "LogStats",
+    "LoopMonitor",
+    "Mail",
+    "ExtensionManager",
+    "NegativeCache",
+    "RPC",
+    "SharedMemoryStats",
+    "Stats",
+    "Web",
+]
@@ -4,6 +4,7 @@ LogStats
 from asyncio.events import TimerHandle, get_event_loop
 
 from bifrost.base import BaseComponent, LoggerMixin, StatsMixin
+from bifrost.channels.timings import summaries
 from bifrost.utils.unit_converter import convert_unit
 
 
@@ -76,6 +77,18 @@ class LogStats(BaseComponent, StatsMixin, LoggerMixin):
             ),
         )
 
+        for channel, phases in summaries(self.stats.histograms).items():
+            self.logger.info(
+                "Handshakes of [%s] p50/p99 in ms: %s",
+                channel,
+                # the histograms summarized are not empty, their percentiles are not None
+                ", ".join(
+                    f"{phase} "
+                    f"{summary['p50'] * 1000:,.3f}/{summary['p99'] * 1000:,.3f}"  # type: ignore
+                    for phase, summary in phases.items()
+                ),
+            )
+
         self._data_sent = self.stats["data/sent"]
         self._data_received = self.stats["data/received"]
 
@@ -0,0 +1,233 @@
+"""
+LoopMonitor
+
+Anything blocking the loop, e.g. a query of the SQLite backend, smtplib in Mail
+or a pprint of a large structure, delays every connection of the worker. This
+extension measures it in two ways:
+
+* the lag: a timer scheduled every INTERVAL seconds records how late it runs in
+  the histogram "loop/lag" of Stats
+* the slow callbacks: a watchdog thread checks the timer keeps running; once the
+  loop is stuck for SLOW_CALLBACK seconds, it captures the stack of the loop
+  thread, which is in the callback blocking it. The last SLOW_CALLBACKS of them
+  are kept with their callbacks, stacks and lags, counted in
+  "loop/slow_callbacks" and logged.
+
+The loop is not hooked, so it works with uvloop as well as asyncio.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from asyncio import AbstractEventLoop, TimerHandle
+from asyncio.events import get_event_loop
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from bifrost.base import BaseComponent, LoggerMixin, StatsMixin
+from bifrost.extensions.stats import Counter
+from bifrost.utils.histogram import Histogram
+
+# the frames of asyncio are skipped to find the callback, e.g. the step of a task
+ASYNCIO_PATH = os.path.dirname(asyncio.__file__)
+
+
+def frame_depth(frame) -> int:
+    """
+    The number of the frames up to the frame
+    :param frame:
+    :type frame: FrameType
+    :return:
+    :rtype: int
+    """
+    depth = 0
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+class LoopMonitor(  # pylint: disable=too-many-instance-attributes
+    BaseComponent, LoggerMixin, StatsMixin
+):
+    """
+    Measure the lag of the loop, and capture the callbacks blocking it
+    """
+
+    name: str = "LoopMonitor"
+    setting_prefix: str = "LOOP_MONITOR_"
+
+    def __init__(
+        self, service, name: Optional[str] = None, setting_prefix: Optional[str] = None
+    ):
+        """
+
+        :param service:
+        :type service: Service
+        :param name:
+        :type name: Optional[str]
+        :param setting_prefix:
+        :type setting_prefix: Optional[str]
+        """
+        super().__init__(service, name, setting_prefix)
+
+        self.interval: float = self.config["INTERVAL"]
+        self.threshold: float = self.config["SLOW_CALLBACK"]
+        self.slow_callbacks: Deque[Dict[str, Any]] = deque(
+            maxlen=self.config["SLOW_CALLBACKS"]
+        )
+
+        # Stats may be loaded after this extension, the handles are resolved
+        # when the service starts
+        self.histogram_lag: Histogram = Histogram()
+        self.counter_slow_callbacks: Counter = Counter()
+
+        self.loop: Optional[AbstractEventLoop] = None
+        self.timer_handle: Optional[TimerHandle] = None
+        # the loop time the timer is scheduled at
+        self._expected: float = 0.0
+        # the monotonic time of the last run of the timer, read by the watchdog
+        self._heartbeat: float = 0.0
+        # the depth of the frames of the callbacks run by the loop
+        self._depth: Optional[int] = None
+
+        self._thread_id: int = 0
+        self._stall: Optional[Dict[str, Any]] = None
+        self._stopping: threading.Event = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    async def start(self) -> None:
+        """
+
+        :return:
+        :rtype: None
+        """
+        self.histogram_lag = self.stats.histogram("loop/lag")
+        self.counter_slow_callbacks = self.stats.counter("loop/slow_callbacks")
+
+        self.loop = get_event_loop()
+        self._thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._schedule()
+
+        self._stopping.clear()
+        self._watchdog = threading.Thread(
+            target=self._watch, name=f"{self.name}Watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """
+
+        :return:
+        :rtype: None
+        """
+        if self.timer_handle:
+            self.timer_handle.cancel()
+            self.timer_handle = None
+
+        self._stopping.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def report(self) -> Dict[str, Any]:
+        """
+        The lag and the slow callbacks of this worker
+        :return:
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "lag": self.histogram_lag.summary(),
+            "slow_callbacks": list(self.slow_callbacks),
+        }
+
+    def _schedule(self) -> None:
+        """
+
+        :return:
+        :rtype: None
+        """
+        self._expected = self.loop.time() + self.interval  # type: ignore
+        self.timer_handle = self.loop.call_at(  # type: ignore
+            self._expected, self._sample
+        )
+
+    def _sample(self) -> None:
+        """
+        Record the lag of the timer, and the callback blocking the loop if the
+        watchdog captured one
+        :return:
+        :rtype: None
+        """
+        lag: float = max(0.0, self.loop.time() - self._expected)  # type: ignore
+        self.histogram_lag.observe(lag)
+        self._heartbeat = time.monotonic()
+
+        if self._depth is None:
+            # this timer is a callback like the others
+            self._depth = frame_depth(
+                sys._getframe()  # pylint: disable=protected-access
+            )
+
+        if (stall := self._stall) is not None:
+            self._stall = None
+            stall["lag"] = lag
+            self.slow_callbacks.append(stall)
+            self.counter_slow_callbacks.add()
+            self.logger.warning(
+                "The loop was blocked for %.3f seconds by %s:\n%s",
+                lag,
+                stall["callback"],
+                "".join(stall["stack"]),
+            )
+
+        self._schedule()
+
+    def _watch(self) -> None:
+        """
+        Capture the stack of the loop thread when the timer is late for the
+        threshold, once for every stall; it runs in the watchdog thread
+        :return:
+        :rtype: None
+        """
+        while not self._stopping.wait(self.threshold / 2):
+            heartbeat: float = self._heartbeat
+            late: float = time.monotonic() - heartbeat - self.interval
+            if late < self.threshold or self._stall is not None:
+                continue
+
+            frame = sys._current_frames().get(  # pylint: disable=protected-access
+                self._thread_id
+            )
+            if frame is None:
+                continue
+            stack: traceback.StackSummary = traceback.extract_stack(frame)
+            del frame
+            if heartbeat != self._heartbeat:
+                # the loop runs again, the stack is not the stall's
+                continue
+
+            self._stall = {
+                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "callback": self._callback(stack),
+                "stack": stack.format(),
+            }
+
+    def _callback(self, stack: List[traceback.FrameSummary]) -> str:
+        """
+        The first frame out of asyncio from the depth of the callbacks
+        :param stack:
+        :type stack: List[FrameSummary]
+        :return:
+        :rtype: str
+        """
+        frames = stack[(self._depth or 1) - 1 :] or stack[-1:]
+        frame = next(
+            (frame for frame in frames if not frame.filename.startswith(ASYNCIO_PATH)),
+            frames[-1],
+        )
+        return f"{frame.name} ({frame.filename}:{frame.lineno})"
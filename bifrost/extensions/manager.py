@@ -34,6 +34,19 @@ class ExtensionManager(
             "Enabled extensions: \n%s", pprint.pformat(self.cls_extensions)
         )
 
+    def is_enabled(self, cls: str) -> bool:
+        """
+        The singleton extensions are only loaded in the designated worker
+        :param cls:
+        :type cls: str
+        :return:
+        :rtype: bool
+        """
+        return (
+            cls not in self.settings["SINGLETON_EXTENSIONS"]
+            or self.settings["WORKER_ID"] == self.settings["SINGLETON_WORKER"]
+        )
+
     @property
     def cls_extensions(self) -> Dict[str, int]:
         """
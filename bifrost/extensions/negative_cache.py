@@ -0,0 +1,168 @@
+"""
+NegativeCache
+
+The targets failing to connect are kept with the REP code of the failure, so
+the following requests to a dead target are replied at once without a lookup
+or a connection. A target is kept for TTL after its first failure, and the time
+doubles with every failure following, up to MAX_TTL; a successful connection
+forgets it.
+
+Every worker has its own cache.
+"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from bifrost.base import BaseComponent, LoggerMixin, StatsMixin
+from bifrost.extensions.stats import Counter
+
+
+class Entry:  # pylint: disable=too-few-public-methods
+    """
+    The last failure of a target
+    """
+
+    __slots__ = ("rep", "failures", "expires")
+
+    def __init__(self, rep: int, failures: int, expires: float):
+        """
+
+        :param rep:
+        :type rep: int
+        :param failures: the number of the failures in a row
+        :type failures: int
+        :param expires:
+        :type expires: float
+        """
+        self.rep: int = rep
+        self.failures: int = failures
+        self.expires: float = expires
+
+
+class NegativeCache(BaseComponent, LoggerMixin, StatsMixin):
+    """
+    Remember the targets failing to connect
+    """
+
+    name: str = "NegativeCache"
+    setting_prefix: str = "NEGATIVE_CACHE_"
+
+    def __init__(
+        self, service, name: Optional[str] = None, setting_prefix: Optional[str] = None
+    ):
+        """
+
+        :param service:
+        :type service: Service
+        :param name:
+        :type name: Optional[str]
+        :param setting_prefix:
+        :type setting_prefix: Optional[str]
+        """
+        super().__init__(service, name, setting_prefix)
+
+        self.cache: LRUCache = LRUCache(maxsize=self.config["SIZE"])
+        self.replies: frozenset = frozenset(self.config["REPLIES"])
+
+        # Stats may be loaded after this extension, the counters are resolved
+        # when the service starts
+        self.counter_hits: Counter = Counter()
+        self.counter_failures: Counter = Counter()
+
+    async def start(self) -> None:
+        """
+
+        :return:
+        :rtype: None
+        """
+        self.counter_hits = self.stats.counter("negative_cache/hits")
+        self.counter_failures = self.stats.counter("negative_cache/failures")
+
+    def get(self, host: str, port: int) -> Optional[int]:
+        """
+        Get the REP code of a target failing recently
+        :param host:
+        :type host: str
+        :param port:
+        :type port: int
+        :return: None if the target is not failing
+        :rtype: Optional[int]
+        """
+        entry: Optional[Entry] = self.cache.get((host, port))
+        if entry is None or time.monotonic() >= entry.expires:
+            return None
+        self.counter_hits.add()
+        return entry.rep
+
+    def add(self, host: str, port: int, rep: int) -> None:
+        """
+        Record a failure of a target; only the REP codes of REPLIES are kept
+        :param host:
+        :type host: str
+        :param port:
+        :type port: int
+        :param rep:
+        :type rep: int
+        :return:
+        :rtype: None
+        """
+        if rep not in self.replies:
+            return
+        self.counter_failures.add()
+
+        now: float = time.monotonic()
+        entry: Optional[Entry] = self.cache.get((host, port))
+        # the failures in a row, unless the target has been forgotten for long
+        failures: int = (
+            entry.failures + 1
+            if entry is not None and now < entry.expires + self.config["MAX_TTL"]
+            else 1
+        )
+        ttl: float = min(
+            self.config["TTL"] * 2 ** min(failures - 1, 32), self.config["MAX_TTL"]
+        )
+        self.cache[(host, port)] = Entry(rep, failures, now + ttl)
+
+    def discard(self, host: str, port: int) -> None:
+        """
+        Forget a target connected successfully
+        :param host:
+        :type host: str
+        :param port:
+        :type port: int
+        :return:
+        :rtype: None
+        """
+        self.cache.pop((host, port), None)
+
+    def clear(self) -> int:
+        """
+        Forget all targets
+        :return: the number of the targets forgotten
+        :rtype: int
+        """
+        size: int = len(self.cache)
+        self.cache.clear()
+        return size
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Get the targets failing now
+        :return:
+        :rtype: List[Dict[str, Any]]
+        """
+        now: float = time.monotonic()
+        key: Tuple[str, int]
+        entry: Entry
+        return [
+            {
+                "host": key[0],
+                "port": key[1],
+                "rep": entry.rep,
+                "failures": entry.failures,
+                "ttl": round(entry.expires - now, 3),
+            }
+            for key, entry in list(self.cache.items())
+            if now < entry.expires
+        ]
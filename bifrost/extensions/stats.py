@@ -1,12 +1,44 @@
 """
 Statistic Collector
 """
+import atexit
 import pprint
 from collections import UserDict
 from datetime import datetime
-from typing import Any
+from typing import Any, Dict, Iterator, Optional
 
 from bifrost.base import BaseComponent, LoggerMixin
+from bifrost.utils.histogram import Histogram
+from bifrost.utils.shared_stats import SharedStatsSegment
+
+
+class Counter:  # pylint: disable=too-few-public-methods
+    """
+    A handle of a counter in Stats
+
+    Resolve it once with Stats.counter, then increase it with a single
+    attribute increment instead of looking up the key every time
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: int = 0):
+        """
+
+        :param value:
+        :type value: int
+        """
+        self.value: int = value
+
+    def add(self, count: int = 1) -> None:
+        """
+
+        :param count:
+        :type count: int
+        :return:
+        :rtype: None
+        """
+        self.value += count
 
 
 class Stats(BaseComponent, UserDict, LoggerMixin):  # pylint: disable=too-many-ancestors
@@ -17,23 +49,50 @@ class Stats(BaseComponent, UserDict, LoggerMixin):  # pylint: disable=too-many-a
     name: str = "Stats"
     setting_prefix: str = "STATS_"
 
-    def __init__(self, service, name: str = None, setting_prefix: str = None):
+    def __init__(
+        self, service, name: Optional[str] = None, setting_prefix: Optional[str] = None
+    ):
         """
 
         :param service:
         :type service:
         :param name:
-        :type name: str
+        :type name: Optional[str]
         :param setting_prefix:
-        :type setting_prefix: str
+        :type setting_prefix: Optional[str]
         """
         BaseComponent.__init__(self, service, name, setting_prefix)
         UserDict.__init__(self)
 
+        self.counters: Dict[str, Counter] = {}
+        # the histograms of durations, kept in this process
+        self.histograms: Dict[str, Histogram] = {}
+
     def __missing__(self, key):
         self[key] = 0
         return self[key]
 
+    def __getitem__(self, key):
+        if (counter := self.counters.get(key)) is not None:
+            return counter.value
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value) -> None:
+        if (counter := self.counters.get(key)) is not None:
+            counter.value = value
+        else:
+            self.data[key] = value
+
+    def __contains__(self, key) -> bool:
+        return key in self.counters or key in self.data
+
+    def __iter__(self) -> Iterator:
+        yield from self.counters
+        yield from self.data
+
+    def __len__(self) -> int:
+        return len(self.counters) + len(self.data)
+
     async def stop(self) -> None:
         """
 
@@ -47,8 +106,15 @@ class Stats(BaseComponent, UserDict, LoggerMixin):  # pylint: disable=too-many-a
         self["time/start"] = self["time/start"].strftime("%Y-%m-%d %H:%M:%S")
 
         self.logger.info(
-            "Stats is dumped:\n%s", pprint.pformat(self),
+            "Stats is dumped:\n%s", pprint.pformat(dict(self)),
         )
+        if self.histograms:
+            self.logger.info(
+                "Histograms are dumped:\n%s",
+                pprint.pformat(
+                    {key: value.summary() for key, value in self.histograms.items()}
+                ),
+            )
 
     def increase(  # pylint: disable=unused-argument
         self, key: str, count: int = 1, start: int = 0, sender: Any = None
@@ -66,4 +132,119 @@ class Stats(BaseComponent, UserDict, LoggerMixin):  # pylint: disable=too-many-a
         :return:
         :rtype: None
         """
-        self[key] = self.setdefault(key, start) + count
+        try:
+            counter = self.counters[key]
+        except KeyError:
+            counter = self.counter(key, start)
+        counter.add(count)
+
+    def counter(self, key: str, start: int = 0) -> Counter:
+        """
+        Resolve the handle of a counter, the value kept by the key is moved
+        into the counter
+        :param key:
+        :type key: str
+        :param start:
+        :type start: int
+        :return:
+        :rtype: Counter
+        """
+        try:
+            return self.counters[key]
+        except KeyError:
+            counter = self.counters[key] = self._create_counter(
+                key, self.data.pop(key, start)
+            )
+            return counter
+
+    def histogram(self, key: str) -> Histogram:
+        """
+        Resolve the handle of a histogram, created at the first time
+        :param key:
+        :type key: str
+        :return:
+        :rtype: Histogram
+        """
+        try:
+            return self.histograms[key]
+        except KeyError:
+            histogram = self.histograms[key] = Histogram()
+            return histogram
+
+    def _create_counter(  # pylint: disable=unused-argument
+        self, key: str, value: int
+    ) -> Counter:
+        """
+
+        :param key:
+        :type key: str
+        :param value:
+        :type value: int
+        :return:
+        :rtype: Counter
+        """
+        return Counter(value)
+
+
+class SharedMemoryStats(Stats):  # pylint: disable=too-many-ancestors
+    """
+    Stats Extension keeping the counters in a shared memory segment
+
+    Every worker owns the segment "<STATS_SHM_NAME>.<WORKER_ID>" and increases
+    its counters without any lock; the counters of all workers can be summed
+    from other processes with bifrost.utils.shared_stats.read_stats. The other
+    values, and the counters not fitting in the segment, stay in this process.
+    """
+
+    def __init__(
+        self, service, name: Optional[str] = None, setting_prefix: Optional[str] = None
+    ):
+        """
+
+        :param service:
+        :type service:
+        :param name:
+        :type name: Optional[str]
+        :param setting_prefix:
+        :type setting_prefix: Optional[str]
+        """
+        super().__init__(service, name, setting_prefix)
+
+        self.segment: SharedStatsSegment = SharedStatsSegment.create(
+            f"{self.config['SHM_NAME']}.{self.settings['WORKER_ID']}",
+            self.config["SHM_SLOTS"],
+            self.config["SHM_KEY_SIZE"],
+        )
+        # the counters left by a previous process of this worker
+        for index in range(self.segment.used):
+            key: str = self.segment.key(index)
+            self.counters[key] = self.segment.counter(index)  # type: ignore
+
+        # the handles stay valid until the process exits
+        atexit.register(self.segment.close)
+
+    async def stop(self) -> None:
+        """
+        Remove the segment; the counters can be still increased in this
+        process during the shutdown
+        :return:
+        :rtype: None
+        """
+        await super().stop()
+
+        self.segment.unlink()
+
+    def _create_counter(self, key: str, value: int) -> Counter:
+        """
+
+        :param key:
+        :type key: str
+        :param value:
+        :type value: int
+        :return:
+        :rtype: Counter
+        """
+        if (index := self.segment.allocate(key, value)) is None:
+            # no slot for this key, keep it in this process
+            return Counter(value)
+        return self.segment.counter(index)  # type: ignore
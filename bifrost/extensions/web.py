@@ -7,14 +7,37 @@ Refer:
 * https://sanic.readthedocs.io/en/latest/
 * https://github.com/huge-success/sanic
 """
+import itertools
 import ssl
-from typing import Optional
+from functools import cached_property
+from typing import Any, Optional
 
+import orjson
 from sanic.app import Sanic
 from sanic.request import Request
-from sanic.response import HTTPResponse, json
+from sanic.response import HTTPResponse, json, raw
 
 from bifrost.base import BaseComponent, LoggerMixin
+from bifrost.channels.timings import summaries
+from bifrost.utils.prometheus import CONTENT_TYPE, Exposition
+
+# the connections encoded and sent at once in a listing
+STREAM_BATCH = 1000
+
+
+def orjson_response(body: Any, status: int = 200) -> HTTPResponse:
+    """
+    A JSON response encoded with orjson; the objects not serializable, e.g. a
+    timedelta, are encoded as strings
+    :param body:
+    :type body: Any
+    :param status:
+    :type status: int
+    :return:
+    :rtype: HTTPResponse
+    """
+    data: bytes = orjson.dumps(body, default=str)  # pylint: disable=no-member
+    return raw(data, status=status, content_type="application/json")
 
 
 class Web(BaseComponent, LoggerMixin):
@@ -42,9 +65,32 @@ class Web(BaseComponent, LoggerMixin):
 
         # configure normal route
         self.app.add_route(self.home, "/")
+        self.app.add_route(
+            self.negative_cache, "/negative-cache", methods=["GET", "DELETE"]
+        )
+        self.app.add_route(self.loop_monitor, "/loop")
+        self.app.add_route(self.handshakes, "/handshakes")
+        self.app.add_route(self.metrics, "/metrics")
+        self.app.add_route(self.stats, "/stats")
+        self.app.add_route(self.channels, "/channels")
+        self.app.add_route(self.connections, "/connections")
 
         self.server = None  # type: ignore
 
+    @cached_property
+    def exposition(self) -> Exposition:
+        """
+        The exposition of the stats of the service, made at the first scrape as
+        Stats may be loaded after this extension
+        :return:
+        :rtype: Exposition
+        """
+        return Exposition(
+            self.service.stats,
+            gauges=self.config["METRICS_GAUGES"],
+            cache=self.config["METRICS_CACHE"],
+        )
+
     async def start(self) -> None:
         """
         start this extension
@@ -92,3 +138,195 @@ class Web(BaseComponent, LoggerMixin):
         :rtype: HTTPResponse
         """
         return json({"hello": "world"})
+
+    async def negative_cache(self, request: Request) -> HTTPResponse:
+        """
+        List the failing targets of this worker with GET, and forget all of them
+        or the one given by the arguments host and port with DELETE
+        :param request:
+        :type request: Request
+        :return:
+        :rtype: HTTPResponse
+        """
+        negative_cache = self.service.extension_manager.extensions.get("NegativeCache")
+        if negative_cache is None:
+            return json({"error": "NegativeCache is not enabled"}, status=404)
+
+        if request.method == "DELETE":
+            host: Optional[str] = request.args.get("host")
+            if host is None:
+                return json({"flushed": negative_cache.clear()})
+            try:
+                port: int = int(request.args.get("port", ""))
+            except ValueError:
+                return json({"error": "The argument port is required"}, status=400)
+            negative_cache.discard(host.lower(), port)
+            return json({"flushed": 1})
+
+        return json({"entries": negative_cache.entries()})
+
+    async def loop_monitor(  # pylint: disable=unused-argument
+        self, request: Request
+    ) -> HTTPResponse:
+        """
+        The lag of the loop and the slow callbacks of this worker
+        :param request:
+        :type request: Request
+        :return:
+        :rtype: HTTPResponse
+        """
+        loop_monitor = self.service.extension_manager.extensions.get("LoopMonitor")
+        if loop_monitor is None:
+            return json({"error": "LoopMonitor is not enabled"}, status=404)
+        return json(loop_monitor.report())
+
+    async def handshakes(  # pylint: disable=unused-argument
+        self, request: Request
+    ) -> HTTPResponse:
+        """
+        The latency of the phases of the handshakes of this worker, by the
+        channels
+        :param request:
+        :type request: Request
+        :return:
+        :rtype: HTTPResponse
+        """
+        return json(summaries(self.service.stats.histograms))
+
+    async def metrics(  # pylint: disable=unused-argument
+        self, request: Request
+    ) -> HTTPResponse:
+        """
+        The stats of this worker in the Prometheus text format
+        :param request:
+        :type request: Request
+        :return:
+        :rtype: HTTPResponse
+        """
+        return raw(await self.exposition.render(), content_type=CONTENT_TYPE)
+
+    async def stats(self, request: Request) -> HTTPResponse:
+        """
+        The stats and the histograms of this worker, the ones with the keys
+        starting with the argument prefix
+        :param request:
+        :type request: Request
+        :return:
+        :rtype: HTTPResponse
+        """
+        prefix: str = request.args.get("prefix", "")
+        stats = self.service.stats
+        return orjson_response(
+            {
+                "stats": {key: stats[key] for key in stats if key.startswith(prefix)},
+                "histograms": {
+                    key: histogram.summary()
+                    for key, histogram in stats.histograms.items()
+                    if key.startswith(prefix)
+                },
+            }
+        )
+
+    async def channels(  # pylint: disable=unused-argument
+        self, request: Request
+    ) -> HTTPResponse:
+        """
+        The address, the connections, the data and the handshakes of every
+        channel of this worker
+        :param request:
+        :type request: Request
+        :return:
+        :rtype: HTTPResponse
+        """
+        middleware = self.service.middleware_manager.middlewares.get(
+            "RegistryMiddleware"
+        )
+        handshakes = summaries(self.service.stats.histograms)
+        return orjson_response(
+            {
+                name: {
+                    "address": channel.config.get("INTERFACE_ADDRESS"),
+                    "port": channel.config.get("INTERFACE_PORT"),
+                    "active": channel.counter_active.value,
+                    "rejected": channel.counter_rejected.value,
+                    "registered": None
+                    if middleware is None
+                    else len(middleware.registry.indexes["channel"].get(name, ())),
+                    "sent": channel.counter_channel_data_sent.value,
+                    "received": channel.counter_channel_data_received.value,
+                    "handshakes": handshakes.get(name, {}),
+                }
+                for name, channel in self.service.channels.items()
+            }
+        )
+
+    async def connections(self, request: Request) -> Optional[HTTPResponse]:
+        """
+        The live connections of this worker in the order they are made, filtered
+        by the arguments channel, user, destination and min_bytes, from the
+        argument cursor, the "next" of the previous page, up to the argument
+        limit; the listing is streamed in batches, yielding to the loop in
+        between
+        :param request:
+        :type request: Request
+        :return:
+        :rtype: Optional[HTTPResponse]
+        """
+        middleware = self.service.middleware_manager.middlewares.get(
+            "RegistryMiddleware"
+        )
+        if middleware is None:
+            return orjson_response(
+                {"error": "RegistryMiddleware is not enabled"}, status=404
+            )
+
+        args = request.args
+        try:
+            after: int = int(args.get("cursor", 0))
+            limit: int = min(
+                int(args.get("limit", self.config["CONNECTIONS_LIMIT"])),
+                self.config["CONNECTIONS_LIMIT_MAX"],
+            )
+            min_bytes: int = int(args.get("min_bytes", 0))
+            if min(after, limit, min_bytes) < 0:
+                raise ValueError
+        except ValueError:
+            return orjson_response(
+                {
+                    "error": (
+                        "The arguments cursor, limit and min_bytes are integers"
+                        " not negative"
+                    )
+                },
+                status=400,
+            )
+
+        connections = itertools.islice(
+            middleware.registry.select(
+                after,
+                min_bytes,
+                channel=args.get("channel"),
+                user=args.get("user"),
+                destination=args.get("destination"),
+            ),
+            limit,
+        )
+
+        response = await request.respond(content_type="application/json")
+        await response.send(b'{"connections":[')
+        count: int = 0
+        last: Optional[int] = None
+        while batch := [
+            connection.report()
+            for connection in itertools.islice(connections, STREAM_BATCH)
+        ]:
+            data: bytes = orjson.dumps(batch)  # pylint: disable=no-member
+            await response.send((b"," if count else b"") + data[1:-1])
+            count += len(batch)
+            last = batch[-1]["id"]
+        cursor: bytes = orjson.dumps(  # pylint: disable=no-member
+            last if count == limit else None
+        )
+        await response.send(b'],"next":' + cursor + b"}")
+        await response.eof()
+        return None
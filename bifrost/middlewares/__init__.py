@@ -1,6 +1,16 @@
 """
 Base Middleware
 """
-from bifrost.middlewares.manager import MiddlewareManager, middlewares
+from bifrost.middlewares.log import LogMiddleware
+from bifrost.middlewares.manager import MiddlewareManager
+from bifrost.middlewares.registry import RegistryMiddleware
+from bifrost.middlewares.signals import SignalsMiddleware
+from bifrost.middlewares.stats import StatsMiddleware
 
-__all__ = ["MiddlewareManager", "middlewares"]
+__all__ = [
+    "LogMiddleware",
+    "MiddlewareManager",
+    "RegistryMiddleware",
+    "SignalsMiddleware",
+    "StatsMiddleware",
+]
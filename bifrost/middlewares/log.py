@@ -0,0 +1,77 @@
+"""
+Log the connections and the flow control of protocols
+"""
+from bifrost.base import BaseComponent
+
+
+class LogMiddleware(BaseComponent):
+    """
+    Log with the logger of the protocol in debug level
+    """
+
+    name: str = "LogMiddleware"
+    setting_prefix: str = "MIDDLEWARE_LOG_"
+
+    def interface_connection_made(self, protocol, transport) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param transport:
+        :type transport: Transport
+        :return:
+        :rtype: None
+        """
+        if cipher := transport.get_extra_info("cipher"):
+            protocol.logger.debug(
+                "[%s] [CONN] [%s:%s] connected with name [%s], "
+                "version [%s], "
+                "secret bits [%s]",
+                hex(id(protocol))[-4:],
+                *transport.get_extra_info("peername")[:2],
+                *cipher,
+            )
+        else:
+            protocol.logger.debug(
+                "[%s] [CONN] [%s:%s] connected",
+                hex(id(protocol))[-4:],
+                *transport.get_extra_info("peername")[:2],
+            )
+
+    def client_connection_made(self, protocol, transport) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param transport:
+        :type transport: Transport
+        :return:
+        :rtype: None
+        """
+        if cipher := transport.get_extra_info("cipher"):
+            protocol.logger.debug(
+                "[CONN] [%s:%s] connected with name [%s], "
+                "version [%s], "
+                "secret bits [%s]",
+                *transport.get_extra_info("peername")[:2],
+                *cipher,
+            )
+        else:
+            protocol.logger.debug(
+                "[CONN] [%s:%s] connected", *transport.get_extra_info("peername")[:2],
+            )
+
+    def pause_writing(self, protocol) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :return:
+        :rtype: None
+        """
+        protocol.logger.debug(
+            "[%s] [FLOW] [%s] paused with %s bytes buffered",
+            hex(id(protocol))[-4:],
+            protocol.role,
+            protocol.transport.get_write_buffer_size(),
+        )
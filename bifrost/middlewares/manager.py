@@ -1,114 +1,58 @@
 """
 Middleware Manager
+
+A middleware is a component with the hooks of protocols as its methods, called
+with the protocol and the arguments of the hook before the hook of the
+protocol. A hook named "<role>_<hook>", e.g. "interface_data_received", is only
+called for the protocols in that role, instead of the one named "<hook>".
+
+The manager compiles a subclass for each protocol class and role once, in which
+every hook calls the chain of its middlewares and then the hook of the protocol,
+and the role is set. A hook without any middleware is left as the bare method of
+the protocol.
 """
+import functools
 import pprint
-from typing import Callable, Dict
+from typing import Callable, Dict, Tuple, Type
 
 from bifrost.base import BaseComponent, LoggerMixin, ManagerMixin, SingletonMeta
-from bifrost.signals import (
-    connection_lost,
-    connection_made,
-    data_received,
-    data_sent,
-    eof_received,
-    pause_writing,
-    resume_writing,
+
+HOOKS = (
+    "connection_made",
+    "connection_lost",
+    "pause_writing",
+    "resume_writing",
+    "data_received",
+    "buffer_updated",
+    "eof_received",
 )
 
 
-def middlewares(func: Callable) -> Callable:
+def compile_hook(hook: Callable, chain: Tuple[Callable, ...]) -> Callable:
     """
-    A decorator for middlewares
-    :param func:
+    Build a hook calling the chain of middlewares and then the hook
+    :param hook:
+    :type hook: Callable
+    :param chain:
+    :type chain: Tuple[Callable, ...]
     :return:
+    :rtype: Callable
     """
+    if len(chain) == 1:
+        (middleware,) = chain
 
-    def _connection_made(protocol, *args, **kwargs):
-        protocol.signal_manager.send(connection_made)
-        transport = args[0]
-        protocol.transport = transport
-        protocol.stats.increase(f"connections/{protocol.channel.name}/{protocol.name}")
-        if protocol.role == "interface":
-            if protocol.config["INTERFACE_SSL_CERT_FILE"]:
-                protocol.logger.debug(
-                    "[%s] [CONN] [%s:%s] connected with name [%s], "
-                    "version [%s], "
-                    "secret bits [%s]",
-                    hex(id(protocol))[-4:],
-                    *protocol.info_peername,
-                    *transport.get_extra_info("cipher"),
-                )
-            else:
-                protocol.logger.debug(
-                    "[%s] [CONN] [%s:%s] connected",
-                    hex(id(protocol))[-4:],
-                    *protocol.info_peername,
-                )
-        elif protocol.role == "client":
-            if cipher := transport.get_extra_info("cipher"):
-                protocol.logger.debug(
-                    "[CONN] [%s:%s] connected with name [%s], "
-                    "version [%s], "
-                    "secret bits [%s]",
-                    *transport.get_extra_info("peername")[:2],
-                    *cipher,
-                )
-            else:
-                protocol.logger.debug(
-                    "[CONN] [%s:%s] connected",
-                    *transport.get_extra_info("peername")[:2],
-                )
-        return protocol, args, kwargs
-
-    def _connection_lost(protocol, *args, **kwargs):
-        protocol.signal_manager.send(connection_lost)
-        return protocol, args, kwargs
-
-    def _pause_writing(protocol, *args, **kwargs):
-        protocol.signal_manager.send(pause_writing)
-        return protocol, args, kwargs
-
-    def _resume_writing(protocol, *args, **kwargs):
-        protocol.signal_manager.send(resume_writing)
-        return protocol, args, kwargs
-
-    def _data_received(protocol, *args, **kwargs):
-        data = args[0]
-        if protocol.role == "interface":
-            protocol.signal_manager.send(data_sent)
-            protocol.stats.increase("data/sent", len(data))
-            protocol.stats.increase(f"data/{protocol.channel.name}/sent", len(data))
-        elif protocol.role == "client":
-            protocol.signal_manager.send(data_received)
-            protocol.stats.increase("data/received", len(data))
-            protocol.stats.increase(f"data/{protocol.channel.name}/received", len(data))
-        return protocol, args, kwargs
-
-    def _eof_received(protocol, *args, **kwargs):
-        protocol.signal_manager.send(eof_received)
-        return protocol, args, kwargs
-
-    process = {
-        "connection_made": _connection_made,
-        "connection_lost": _connection_lost,
-        "pause_writing": _pause_writing,
-        "resume_writing": _resume_writing,
-        "data_received": _data_received,
-        "eof_received": _eof_received,
-    }
-
-    def process_middlewares(protocol, *args, **kwargs):
-        """
+        def compiled(protocol, *args):
+            middleware(protocol, *args)
+            return hook(protocol, *args)
 
-        :param protocol:
-        :param args:
-        :param kwargs:
-        :return:
-        """
-        protocol, args, kwargs = process[func.__name__](protocol, *args, **kwargs)
-        return func(protocol, *args, **kwargs)
+    else:
 
-    return process_middlewares
+        def compiled(protocol, *args):
+            for middleware in chain:
+                middleware(protocol, *args)
+            return hook(protocol, *args)
+
+    return functools.update_wrapper(compiled, hook)
 
 
 class MiddlewareManager(
@@ -134,6 +78,11 @@ class MiddlewareManager(
         """
         super(MiddlewareManager, self).__init__(service, name, setting_prefix)
 
+        # the compiled protocol classes by the protocol classes and roles
+        self._compiled: Dict[Tuple[Type, str], Type] = {}
+        # the middlewares by the protocol classes, roles and hooks
+        self.chains: Dict[Tuple[Type, str, str], Tuple[Callable, ...]] = {}
+
         self.logger.info(
             "Enabled middlewares: \n%s", pprint.pformat(self.cls_middlewares)
         )
@@ -165,3 +114,50 @@ class MiddlewareManager(
         :rtype: object
         """
         return self.middlewares[name]
+
+    def compile(self, cls: Type, role: str) -> Type:
+        """
+        Get the protocol class running the middlewares in its hooks for a role
+        :param cls:
+        :type cls: Type
+        :param role:
+        :type role: str
+        :return:
+        :rtype: Type
+        """
+        try:
+            return self._compiled[(cls, role)]
+        except KeyError:
+            pass
+
+        hooks: Dict[str, Callable] = {}
+        for hook in HOOKS:
+            if (bare := getattr(cls, hook, None)) is None:
+                continue
+
+            chain: Tuple[Callable, ...] = tuple(
+                method
+                for method in (
+                    getattr(middleware, f"{role}_{hook}", None)
+                    or getattr(middleware, hook, None)
+                    for middleware in self.middlewares.values()
+                )
+                if method is not None
+            )
+            self.chains[(cls, role, hook)] = chain
+            if chain:
+                hooks[hook] = compile_hook(bare, chain)
+
+        compiled: Type = (
+            type(
+                cls.__name__,
+                (cls,),
+                dict(hooks, role=role, __module__=cls.__module__, __slots__=()),
+            )
+            if hooks or role != cls.role
+            else cls
+        )
+
+        # the compiled class is compiled to itself
+        self._compiled[(cls, role)] = self._compiled[(compiled, role)] = compiled
+        return compiled
@@ -0,0 +1,117 @@
+"""
+Register the live connections to be inspected, e.g. in Web
+"""
+from typing import Optional
+
+from bifrost.base import BaseComponent
+from bifrost.channels.registry import ConnectionRegistry
+
+
+class RegistryMiddleware(BaseComponent):
+    """
+    Register the connections made on the interfaces in a ConnectionRegistry of
+    this worker, and count the bytes relayed by every connection; the data
+    received by the interface is counted as sent, and by the client as received
+    """
+
+    name: str = "RegistryMiddleware"
+    setting_prefix: str = "MIDDLEWARE_REGISTRY_"
+
+    def __init__(
+        self, service, name: Optional[str] = None, setting_prefix: Optional[str] = None
+    ):
+        """
+
+        :param service:
+        :type service:
+        :param name:
+        :type name: Optional[str]
+        :param setting_prefix:
+        :type setting_prefix: Optional[str]
+        """
+        super().__init__(service, name, setting_prefix)
+
+        self.registry: ConnectionRegistry = ConnectionRegistry()
+
+    def interface_connection_made(self, protocol, transport) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param transport:
+        :type transport: Transport
+        :return:
+        :rtype: None
+        """
+        host, port = transport.get_extra_info("peername")[:2]
+        protocol.connection = self.registry.register(
+            protocol.channel.name, f"{host}:{port}"
+        )
+
+    def interface_connection_lost(  # pylint: disable=unused-argument
+        self, protocol, exc
+    ) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param exc:
+        :type exc: Optional[Exception]
+        :return:
+        :rtype: None
+        """
+        if (connection := protocol.connection) is not None:
+            protocol.connection = None
+            self.registry.unregister(connection)
+
+    def interface_data_received(self, protocol, data) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param data:
+        :type data: bytes
+        :return:
+        :rtype: None
+        """
+        if (connection := protocol.connection) is not None:
+            connection.sent += len(data)
+
+    def client_data_received(self, protocol, data) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param data:
+        :type data: bytes
+        :return:
+        :rtype: None
+        """
+        if (connection := protocol.connection) is not None:
+            connection.received += len(data)
+
+    def interface_buffer_updated(self, protocol, nbytes) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param nbytes:
+        :type nbytes: int
+        :return:
+        :rtype: None
+        """
+        if (connection := protocol.connection) is not None:
+            connection.sent += nbytes
+
+    def client_buffer_updated(self, protocol, nbytes) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param nbytes:
+        :type nbytes: int
+        :return:
+        :rtype: None
+        """
+        if (connection := protocol.connection) is not None:
+            connection.received += nbytes
@@ -0,0 +1,128 @@
+"""
+Send the signals of protocols
+"""
+from bifrost.base import BaseComponent
+from bifrost.signals import (
+    connection_lost,
+    connection_made,
+    data_received,
+    data_sent,
+    eof_received,
+    pause_writing,
+    resume_writing,
+)
+
+
+class SignalsMiddleware(BaseComponent):
+    """
+    Send a signal for every hook of protocols; the data received by the
+    interface is sent as data_sent, and by the client as data_received, with
+    its size in bytes
+    """
+
+    name: str = "SignalsMiddleware"
+    setting_prefix: str = "MIDDLEWARE_SIGNALS_"
+
+    def connection_made(  # pylint: disable=unused-argument
+        self, protocol, transport
+    ) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param transport:
+        :type transport: Transport
+        :return:
+        :rtype: None
+        """
+        protocol.signal_manager.send(connection_made)
+
+    def connection_lost(self, protocol, exc) -> None:  # pylint: disable=unused-argument
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param exc:
+        :type exc: Optional[Exception]
+        :return:
+        :rtype: None
+        """
+        protocol.signal_manager.send(connection_lost)
+
+    def pause_writing(self, protocol) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :return:
+        :rtype: None
+        """
+        protocol.signal_manager.send(pause_writing)
+
+    def resume_writing(self, protocol) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :return:
+        :rtype: None
+        """
+        protocol.signal_manager.send(resume_writing)
+
+    def interface_data_received(self, protocol, data) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param data:
+        :type data: bytes
+        :return:
+        :rtype: None
+        """
+        protocol.signal_manager.send(data_sent, size=len(data))
+
+    def client_data_received(self, protocol, data) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param data:
+        :type data: bytes
+        :return:
+        :rtype: None
+        """
+        protocol.signal_manager.send(data_received, size=len(data))
+
+    def interface_buffer_updated(self, protocol, nbytes) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param nbytes:
+        :type nbytes: int
+        :return:
+        :rtype: None
+        """
+        protocol.signal_manager.send(data_sent, size=nbytes)
+
+    def client_buffer_updated(self, protocol, nbytes) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param nbytes:
+        :type nbytes: int
+        :return:
+        :rtype: None
+        """
+        protocol.signal_manager.send(data_received, size=nbytes)
+
+    def eof_received(self, protocol) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :return:
+        :rtype: None
+        """
+        protocol.signal_manager.send(eof_received)
@@ -0,0 +1,100 @@
+"""
+Count the connections, the data and the flow control of protocols
+"""
+from bifrost.base import BaseComponent
+
+
+class StatsMiddleware(BaseComponent):
+    """
+    Increase the counters resolved by the channel of the protocol; the data
+    received by the interface is counted as sent, and by the client as received
+    """
+
+    name: str = "StatsMiddleware"
+    setting_prefix: str = "MIDDLEWARE_STATS_"
+
+    def connection_made(  # pylint: disable=unused-argument
+        self, protocol, transport
+    ) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param transport:
+        :type transport: Transport
+        :return:
+        :rtype: None
+        """
+        protocol.channel.counter_connections(protocol.name).add()
+
+    def pause_writing(self, protocol) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :return:
+        :rtype: None
+        """
+        protocol.channel.counter_paused.add()
+
+    def resume_writing(self, protocol) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :return:
+        :rtype: None
+        """
+        protocol.channel.counter_resumed.add()
+
+    def interface_data_received(self, protocol, data) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param data:
+        :type data: bytes
+        :return:
+        :rtype: None
+        """
+        protocol.channel.counter_data_sent.add(len(data))
+        protocol.channel.counter_channel_data_sent.add(len(data))
+
+    def client_data_received(self, protocol, data) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param data:
+        :type data: bytes
+        :return:
+        :rtype: None
+        """
+        protocol.channel.counter_data_received.add(len(data))
+        protocol.channel.counter_channel_data_received.add(len(data))
+
+    def interface_buffer_updated(self, protocol, nbytes) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param nbytes:
+        :type nbytes: int
+        :return:
+        :rtype: None
+        """
+        protocol.channel.counter_data_sent.add(nbytes)
+        protocol.channel.counter_channel_data_sent.add(nbytes)
+
+    def client_buffer_updated(self, protocol, nbytes) -> None:
+        """
+
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :param nbytes:
+        :type nbytes: int
+        :return:
+        :rtype: None
+        """
+        protocol.channel.counter_data_received.add(nbytes)
+        protocol.channel.counter_channel_data_received.add(nbytes)
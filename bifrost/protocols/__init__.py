@@ -4,6 +4,7 @@ https://docs.python.org/3/library/asyncio-protocol.html
 """
 from bifrost.protocols.client import Client
 from bifrost.protocols.interface import Interface
+from bifrost.protocols.relay import Relay
 from bifrost.protocols.socks5 import Socks5Protocol
 
-__all__ = ["Client", "Interface", "Socks5Protocol"]
+__all__ = ["Client", "Interface", "Relay", "Socks5Protocol"]
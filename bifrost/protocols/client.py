@@ -5,7 +5,6 @@ from asyncio.protocols import Protocol
 from typing import Optional
 
 from bifrost.base import LoggerMixin, ProtocolMixin, StatsMixin
-from bifrost.middlewares import middlewares
 
 
 class Client(ProtocolMixin, Protocol, LoggerMixin, StatsMixin):
@@ -13,11 +12,12 @@ class Client(ProtocolMixin, Protocol, LoggerMixin, StatsMixin):
     The simple client of proxy
     """
 
+    __slots__ = ()
+
     name = "Client"
     role = "client"
     setting_prefix = "PROTOCOL_CLIENT_"
 
-    @middlewares
     def connection_made(self, transport) -> None:
         """
 
@@ -26,8 +26,9 @@ class Client(ProtocolMixin, Protocol, LoggerMixin, StatsMixin):
         :return:
         :rtype: None
         """
+        self.transport = transport
+        self.set_write_buffer_limits(transport)
 
-    @middlewares
     def data_received(self, data: bytes) -> None:
         """
 
@@ -42,9 +43,9 @@ class Client(ProtocolMixin, Protocol, LoggerMixin, StatsMixin):
             len(data),
         )
 
+        self.data_relayed()
         self.server_transport.write(data)
 
-    @middlewares
     def connection_lost(self, exc: Optional[Exception]) -> None:
         """
 
@@ -53,4 +54,23 @@ class Client(ProtocolMixin, Protocol, LoggerMixin, StatsMixin):
         :return:
         :rtype: None
         """
+        self.release_buffered()
+        if self.timeouts is not None:
+            self.timeouts.cancel()
         self.server_transport.close()
+
+    def pause_writing(self) -> None:
+        """
+        Stop reading from the interface until the target drains the buffer
+        :return:
+        :rtype: None
+        """
+        self.pause_peer_reading()
+
+    def resume_writing(self) -> None:
+        """
+
+        :return:
+        :rtype: None
+        """
+        self.resume_peer_reading()
@@ -9,7 +9,7 @@ import ssl
 from asyncio.events import get_event_loop
 from asyncio.protocols import Protocol
 from asyncio.transports import Transport
-from typing import Dict, Optional, Tuple, Union
+from typing import Any, Dict, Optional, Tuple, Union
 
 from bifrost.base import LoggerMixin, ProtocolMixin, StatsMixin
 from bifrost.utils.misc import load_object
@@ -20,9 +20,39 @@ class Interface(ProtocolMixin, Protocol, LoggerMixin, StatsMixin):
     A socks5 proxy server side
     """
 
+    __slots__ = ()
+
     name = "Interface"
     setting_prefix = "PROTOCOL_INTERFACE_"
 
+    @classmethod
+    def build_config(cls, channel, setting_prefix: str) -> Dict[str, Any]:
+        """
+        Resolve the client class and the SSL context to the server
+        :param channel:
+        :type channel: Channel
+        :param setting_prefix:
+        :type setting_prefix: str
+        :return:
+        :rtype: Dict[str, Any]
+        """
+        config: Dict[str, Any] = super(Interface, cls).build_config(
+            channel, setting_prefix
+        )
+
+        config["CLS_CLIENT_PROTOCOL"] = load_object(config["CLIENT_PROTOCOL"])
+
+        ssl_context: Optional[ssl.SSLContext]
+        if config.get("CLIENT_SSL_CERT_FILE"):
+            ssl_context = ssl.create_default_context(
+                purpose=ssl.Purpose.SERVER_AUTH, cafile=config["CLIENT_SSL_CERT_FILE"],
+            )
+        else:
+            ssl_context = None
+        config["CLIENT_SSL_CONTEXT"] = ssl_context
+
+        return config
+
     def connection_made(self, transport) -> None:
         """
         Called when a connection is made.
@@ -41,6 +71,9 @@ class Interface(ProtocolMixin, Protocol, LoggerMixin, StatsMixin):
         self.stats.increase(f"{self.name}/connect")
 
         self.transport = transport
+        self.set_write_buffer_limits(transport)
+
+        self.timeouts = self.channel.track(transport, handshake=False)
 
     def connection_lost(self, exc: Optional[Exception]) -> None:
         """
@@ -55,8 +88,30 @@ class Interface(ProtocolMixin, Protocol, LoggerMixin, StatsMixin):
         :return:
         :rtype: None
         """
+        self.release_buffered()
+        self.release_source()
+        if self.timeouts is not None:
+            self.timeouts.cancel()
         self.transport.close()
 
+    def pause_writing(self) -> None:
+        """
+        Called when the transport's buffer goes over the high watermark.
+
+        :return:
+        :rtype: None
+        """
+        self.pause_peer_reading()
+
+    def resume_writing(self) -> None:
+        """
+        Called when the transport's buffer drains below the low watermark.
+
+        :return:
+        :rtype: None
+        """
+        self.resume_peer_reading()
+
     def data_received(self, data: bytes) -> None:
         """
         Called when some data is received. data is a non-empty bytes object
@@ -67,8 +122,8 @@ class Interface(ProtocolMixin, Protocol, LoggerMixin, StatsMixin):
         :return:
         :rtype: None
         """
-        self.stats.increase("data/sent", len(data))
-        self.stats.increase(f"data/{self.name}/sent", len(data))
+        if (timeouts := self.timeouts) is not None:
+            timeouts.touch()
 
         client_addr: str
         client_port: int
@@ -93,26 +148,19 @@ class Interface(ProtocolMixin, Protocol, LoggerMixin, StatsMixin):
         :rtype: None
         """
         if self.client_transport is None:
-            ssl_context: Optional[ssl.SSLContext]
-            if self.config["CLIENT_SSL_CERT_FILE"]:
-                ssl_context = ssl.create_default_context(
-                    purpose=ssl.Purpose.SERVER_AUTH,
-                    cafile=self.config["CLIENT_SSL_CERT_FILE"],
-                )
-            else:
-                ssl_context = None
-
-            cls_client = load_object(self.config["CLIENT_PROTOCOL"])
+            cls_client = self.config["CLS_CLIENT_PROTOCOL"]
 
             loop = get_event_loop()
 
             transport: Transport
             client: Protocol
             transport, client = await loop.create_connection(
-                protocol_factory=lambda: cls_client.from_channel(self.channel),
+                protocol_factory=lambda: cls_client.from_channel(
+                    self.channel, role="client"
+                ),
                 host=self.config.get("CLIENT_ADDRESS"),
                 port=self.config.get("CLIENT_PORT"),
-                ssl=ssl_context,
+                ssl=self.config["CLIENT_SSL_CONTEXT"],
             )
 
             cert: Dict[str, Union[Tuple, int, str]]
@@ -126,6 +174,11 @@ class Interface(ProtocolMixin, Protocol, LoggerMixin, StatsMixin):
                 self.stats.increase("certificates")
 
             client.server_transport = self.transport
+            client.timeouts = self.timeouts
+            client.connection = self.connection
             self.client_transport = transport
 
+            if self.writing_paused:
+                transport.pause_reading()
+
         self.client_transport.write(data)
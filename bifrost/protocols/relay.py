@@ -0,0 +1,171 @@
+"""
+Relay protocol for the data phase
+
+It is built on asyncio.BufferedProtocol: the transport reads directly into a
+preallocated buffer of this protocol, and the filled part of the buffer is
+written to the peer transport, so no bytes object is created per chunk.
+
+Refer to:
+https://docs.python.org/3/library/asyncio-protocol.html#buffered-streaming-protocols
+"""
+from __future__ import annotations
+
+from asyncio.protocols import BufferedProtocol
+from typing import Optional, cast
+
+from bifrost.base import LoggerMixin, ProtocolMixin, StatsMixin
+
+
+class Relay(ProtocolMixin, BufferedProtocol, LoggerMixin, StatsMixin):
+    """
+    Relay the data between the transport and its peer transport once a
+    connection is established
+    """
+
+    __slots__ = ("buffer_size", "buffer", "view", "_underused")
+
+    name = "Relay"
+    setting_prefix = "PROTOCOL_RELAY_"
+
+    def __init__(self, channel):
+        """
+
+        :param channel:
+        :type channel:
+        """
+        super().__init__(channel)
+
+        self.buffer_size: int = self.config["BUFFER_SIZE"]
+        self.buffer: bytearray = bytearray(self.buffer_size)
+        self.view: memoryview = memoryview(self.buffer)
+
+        # the number of continuous reads using less than a quarter of the buffer
+        self._underused: int = 0
+
+    @classmethod
+    def take_over(cls, protocol) -> Relay:
+        """
+        Replace the protocol of a connected transport with a relay in the same
+        role, keeping the transports and the flow control status
+        :param protocol:
+        :type protocol: ProtocolMixin
+        :return:
+        :rtype: Relay
+        """
+        relay = cast(Relay, cls.from_channel(protocol.channel, role=protocol.role))
+
+        relay.transport = protocol.transport
+        relay.peer_transport = protocol.peer_transport
+
+        relay.timeouts = protocol.timeouts
+        relay.timings = protocol.timings
+        relay.connection = protocol.connection
+        relay.source, protocol.source = protocol.source, None
+
+        relay.writing_paused = protocol.writing_paused
+        relay.buffered, protocol.buffered = protocol.buffered, 0
+
+        relay.transport.set_protocol(relay)
+
+        return relay
+
+    def _allocate(self, size: int) -> None:
+        """
+        Allocate a new buffer for reading
+
+        :param size:
+        :type size: int
+        :return:
+        :rtype: None
+        """
+        self.buffer_size = size
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """
+        Called to allocate a new receive buffer.
+
+        :param sizehint:
+        :type sizehint: int
+        :return:
+        :rtype: memoryview
+        """
+        return self.view
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """
+        Called when the buffer was updated with the received data.
+
+        The filled part of the buffer is written to the peer transport. If the
+        peer transport can't send it at once, the transport may keep a reference
+        to the buffer instead of a copy, so the buffer is handed over and a new
+        one is allocated for the next read.
+
+        :param nbytes:
+        :type nbytes: int
+        :return:
+        :rtype: None
+        """
+        peer_transport = self.peer_transport
+        peer_transport.write(self.view[:nbytes])
+        self.data_relayed()
+
+        size: int = self.buffer_size
+        if nbytes == size:
+            # the buffer is full, there might be more data waiting to be read
+            size = min(size * 2, self.config["BUFFER_SIZE_MAX"])
+            self._underused = 0
+        elif nbytes < size >> 2:
+            self._underused += 1
+            if self._underused >= 8:
+                size = max(size >> 1, self.config["BUFFER_SIZE_MIN"])
+                self._underused = 0
+        else:
+            self._underused = 0
+
+        if size != self.buffer_size or peer_transport.get_write_buffer_size():
+            self._allocate(size)
+
+    def eof_received(self) -> Optional[bool]:
+        """
+        Called when the other end signals it won't send any more data.
+
+        :return:
+        :rtype: Optional[bool]
+        """
+        return None
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """
+        Called when the connection is lost or closed.
+
+        :param exc:
+        :type exc: Optional[Exception]
+        :return:
+        :rtype: None
+        """
+        self.release_buffered()
+        self.release_source()
+        if self.timeouts is not None:
+            self.timeouts.cancel()
+        self.peer_transport.close()
+
+    def pause_writing(self) -> None:
+        """
+        Stop reading from the peer until the buffer of this transport drains
+        :return:
+        :rtype: None
+        """
+        self.pause_peer_reading()
+
+    def resume_writing(self) -> None:
+        """
+
+        :return:
+        :rtype: None
+        """
+        self.resume_peer_reading()
+
+
+__all__ = ["Relay"]
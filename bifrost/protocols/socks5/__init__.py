@@ -6,95 +6,125 @@ https://datatracker.ietf.org/doc/rfc1928/
 
 RFC 3089 - A SOCKS-based IPv6/IPv4 Gateway Mechanism
 https://datatracker.ietf.org/doc/rfc3089/
+
+The states hold no data of a connection: every state is one handler shared by
+all protocols and called with the protocol, which keeps its state as an index of
+STATES.
 """
 from __future__ import annotations
 
 import asyncio
 import pprint
-import socket
 from asyncio.events import get_event_loop
 from asyncio.protocols import Protocol
-from functools import cached_property
-from struct import pack, unpack
-from typing import List, Optional, Tuple
+from asyncio.transports import Transport
+from struct import pack
+from typing import Any, Dict, Generic, Optional, Tuple, Type, TypeVar, cast
 
 from bifrost.base import LoggerMixin, ProtocolMixin, SignalManagerMixin, StatsMixin
+from bifrost.channels.timings import HandshakeTimings
 from bifrost.exceptions.protocol import (
     ProtocolVersionNotSupportedException,
+    Socks5AddressTypeNotSupportedException,
     Socks5AuthenticationFailed,
     Socks5CMDNotSupportedException,
     Socks5NetworkUnreachableException,
     Socks5NoAcceptableMethodsException,
     TransportNotDefinedException,
 )
-from bifrost.middlewares import middlewares
+from bifrost.protocols.socks5 import replies
+from bifrost.protocols.socks5.parser import (
+    VERSION,
+    Event,
+    Greeting,
+    Request,
+    Socks5Parser,
+)
+from bifrost.utils.connect import create_connection
 from bifrost.utils.misc import load_object, to_str
 
-VERSION = 0x05  # Socks version
+INIT, AUTH, HOST, DATA = range(4)
+
+STATE_NAMES: Tuple[str, ...] = ("INIT", "AUTH", "HOST", "DATA")
 
+# the event handled by a state
+E = TypeVar("E", bound=Event)
 
-class Socks5State(LoggerMixin, SignalManagerMixin, StatsMixin):
+
+class Socks5State(LoggerMixin, Generic[E]):
     """
-    Base state for Socks5 protocol
+    Base state for Socks5 protocol, handling the events of type E
     """
 
-    def __init__(self, protocol):
-        """
+    # the event type of the message expected in this state
+    message: Optional[Type] = None
 
+    def expect(
+        self, protocol: Socks5Protocol  # pylint: disable=unused-argument
+    ) -> Optional[Type]:
+        """
+        The event type of the message expected by a protocol in this state
         :param protocol:
         :type protocol: Socks5Protocol
+        :return:
+        :rtype: Optional[Type]
         """
-        self.protocol = protocol
+        return self.message
 
-    def _switch(self, state: str) -> None:
+    @staticmethod
+    def _switch(protocol: Socks5Protocol, state: str) -> None:
         """
 
+        :param protocol:
+        :type protocol: Socks5Protocol
         :param state:
         :type state: str
         :return:
         :rtype: None
         """
-        self.protocol.state = self.protocol.states[state]
+        protocol.state = STATE_NAMES.index(state)
 
-    async def data_received(self, data: bytes) -> None:
+    def switch(self, protocol: Socks5Protocol) -> None:
         """
 
-        :param data:
-        :type data: bytes
+        :param protocol:
+        :type protocol: Socks5Protocol
         :return:
         :rtype: None
         """
         raise NotImplementedError
 
-    @staticmethod
-    def validate(data: bytes) -> bool:
+    async def event_received(self, protocol: Socks5Protocol, event: E) -> None:
         """
 
-        :param data:
-        :type data: bytes
+        :param protocol:
+        :type protocol: Socks5Protocol
+        :param event:
+        :type event: E
         :return:
-        :rtype: bool
+        :rtype: None
         """
-        ver: int = data[0]
-        return ver == VERSION
+        raise NotImplementedError
 
 
-class Socks5StateInit(Socks5State):
+class Socks5StateInit(Socks5State[Greeting]):
     """
     INIT state
     """
 
-    def switch(self) -> None:
+    message = Greeting
+
+    def switch(self, protocol: Socks5Protocol) -> None:
         """
         Switch to Auth state
+        :param protocol:
+        :type protocol: Socks5Protocol
         :return:
         :rtype: None
         """
-        return super(Socks5StateInit, self)._switch(
-            self.protocol.cls_auth_method.next_state
-        )
+        self._switch(protocol, protocol.cls_auth_method.next_state)
 
-    async def data_received(self, data: bytes) -> None:
+    async def event_received(self, protocol: Socks5Protocol, event: Greeting) -> None:
         """
         A version identifier/method selection message:
 
@@ -104,101 +134,120 @@ class Socks5StateInit(Socks5State):
         | 1  |    1     | 1 to 255 |
         +----+----------+----------+
 
-        :param data:
-        :type data: bytes
+        :param protocol:
+        :type protocol: Socks5Protocol
+        :param event:
+        :type event: Greeting
         :return:
         :rtype: None
         """
-        if not self.validate(data):
-            raise ProtocolVersionNotSupportedException
-
         self.logger.debug(
             "[%s] [INIT] [%s:%s] received: %s",
-            hex(id(self.protocol))[-4:],
-            *self.protocol.info_peername,
-            repr(data),
+            hex(id(protocol))[-4:],
+            *protocol.info_peername,
+            event,
         )
+        if (timings := protocol.timings) is not None:
+            timings.phase("greeting")
 
-        nmethods: int = data[1]
-        methods: List[int] = list(data[2 : 2 + nmethods])
-
-        available_auth_methods = sorted(
-            set(self.protocol.config["AUTH_METHODS"]).intersection(set(methods)),
-            key=lambda x: list(self.protocol.config["AUTH_METHODS"]).index(x),
+        auth_method: Optional[int] = next(
+            (
+                method
+                for method in protocol.config["AUTH_METHODS_ORDER"]
+                if method in event.methods
+            ),
+            None,
         )
 
-        try:
-            auth_method = available_auth_methods[0]
-        except IndexError:
+        if auth_method is None:
             self.logger.debug(
                 "No acceptable methods found. "
                 "The following methods are supported:\n%s",
-                pprint.pformat(self.protocol.config["AUTH_METHODS"]),
+                pprint.pformat(protocol.config["AUTH_METHODS"]),
             )
-            self.protocol.transport.write(
+            protocol.transport.write(
                 pack("!BB", VERSION, 0xFF)
             )  # NO ACCEPTABLE METHODS
             raise Socks5NoAcceptableMethodsException
-        else:
-            self.protocol.transport.write(pack("!BB", VERSION, auth_method))
-            self.protocol.cls_auth_method = load_object(
-                self.protocol.config["AUTH_METHODS"][auth_method]
-            )
 
+        protocol.transport.write(pack("!BB", VERSION, auth_method))
+        protocol.cls_auth_method = protocol.config["CLS_AUTH_METHODS"][auth_method]
 
-class Socks5StateAuth(Socks5State):
+
+class Socks5StateAuth(Socks5State[Event]):
     """
     AUTH state
     """
 
-    def switch(self) -> None:
+    def expect(self, protocol: Socks5Protocol) -> Optional[Type]:
+        """
+        The message of the sub-negotiation of the selected method
+        :param protocol:
+        :type protocol: Socks5Protocol
+        :return:
+        :rtype: Optional[Type]
+        """
+        return protocol.cls_auth_method.expect
+
+    def switch(self, protocol: Socks5Protocol) -> None:
         """
         Switch to HOST state
+        :param protocol:
+        :type protocol: Socks5Protocol
         :return:
         :rtype: None
         """
-        return super(Socks5StateAuth, self)._switch("HOST")
+        self._switch(protocol, "HOST")
 
-    async def data_received(self, data: bytes) -> None:
+    async def event_received(self, protocol: Socks5Protocol, event: Event) -> None:
         """
 
-        :param data:
-        :type data: bytes
+        :param protocol:
+        :type protocol: Socks5Protocol
+        :param event:
+        :type event: Event
         :return:
         :rtype: None
         """
         self.logger.debug(
             "[%s] [AUTH] [%s:%s] received: %s",
-            hex(id(self.protocol))[-4:],
-            *self.protocol.info_peername,
-            repr(data),
+            hex(id(protocol))[-4:],
+            *protocol.info_peername,
+            event,
         )
         # self.stats.increase(f"Authentication/{self.name}")
-        auth_method = self.protocol.cls_auth_method.from_protocol(self.protocol)
-        await auth_method.auth(data)
+        auth_method = protocol.cls_auth_method.from_protocol(protocol)
+        await auth_method.auth(event)
+        if (timings := protocol.timings) is not None:
+            timings.phase("auth")
 
 
-class Socks5StateHost(Socks5State):
+class Socks5StateHost(Socks5State[Request]):
     """
     HOST State
     """
 
+    message = Request
+
     supported_cmd = (
         0x01,  # connect
         # 0x02,  # TODO: bind
         # 0x03,  # TODO: udp associate
     )
 
-    def switch(self) -> None:
+    def switch(self, protocol: Socks5Protocol) -> None:
         """
-        Switch to DATA state
+        Switch to DATA state, and hand both transports over to the relay
+        protocol if the channel configures one
+        :param protocol:
+        :type protocol: Socks5Protocol
         :return:
         :rtype: None
         """
-        return super(Socks5StateHost, self)._switch("DATA")
+        self._switch(protocol, "DATA")
+        protocol.relay()
 
-    @staticmethod
-    async def parse_host_data(data: bytes) -> Tuple[int, int, int, int, bytes, int]:
+    async def event_received(self, protocol: Socks5Protocol, event: Request) -> None:
         """
         SOCKS request
 
@@ -208,143 +257,219 @@ class Socks5StateHost(Socks5State):
         | 1  |  1  | X'00' |  1   | Variable |    2     |
         +----+-----+-------+------+----------+----------+
 
-        :param data:
-        :type data: bytes
-        :return:
-        :rtype: Tuple[int, int, int, int, bytes, int]
-        """
-        ver: int = data[0]
-        cmd: int = data[1]
-        rsv: int = data[2]
-        atyp: int = data[3]
-
-        dst_addr: bytes
-        nxt: int
-        if atyp == 1:  # ipv4
-            dst_addr, nxt = socket.inet_ntop(socket.AF_INET, data[4:8]), 8
-        elif atyp == 3:  # domain
-            length = data[4]
-            dst_addr, nxt = data[5 : 5 + length], 5 + length
-        elif atyp == 4:  # ipv6
-            dst_addr, nxt = socket.inet_ntop(socket.AF_INET6, data[4:20]), 20
-
-        dst_port: int = unpack("!H", data[nxt : nxt + 2])[0]
-
-        return ver, cmd, rsv, atyp, dst_addr, dst_port
-
-    async def data_received(self, data: bytes) -> None:
-        """
-
-        :param data:
-        :type data: bytes
+        :param protocol:
+        :type protocol: Socks5Protocol
+        :param event:
+        :type event: Request
         :return:
         :rtype: None
         """
-        if not self.validate(data):
-            raise ProtocolVersionNotSupportedException
+        if (timings := protocol.timings) is not None:
+            timings.phase("request")
 
-        (
-            ver,  # pylint: disable=unused-variable
-            cmd,
-            rsv,  # pylint: disable=unused-variable
-            atyp,
-            dst_addr,
-            dst_port,
-        ) = await self.parse_host_data(data)
-
-        if cmd not in self.supported_cmd:
+        if event.cmd not in self.supported_cmd:
+            self.reply(protocol, replies.COMMAND_NOT_SUPPORTED)
             raise Socks5CMDNotSupportedException
 
         self.logger.debug(
             "[%s] [HOST] [%s:%s] [%s:%s] received: %s",
-            hex(id(self.protocol))[-4:],
-            *self.protocol.info_peername,
-            to_str(dst_addr),
-            dst_port,
-            repr(data),
+            hex(id(protocol))[-4:],
+            *protocol.info_peername,
+            to_str(event.dst_addr),
+            event.dst_port,
+            event,
         )
 
-        cls_client = load_object(self.protocol.config["CLIENT_PROTOCOL"])
+        host: str = to_str(event.dst_addr).lower()
+        if (connection := protocol.connection) is not None:
+            connection.registry.update(
+                connection, destination=host, port=event.dst_port
+            )
+
+        # a target failing recently is replied without touching the network
+        negative_cache = protocol.config["NEGATIVE_CACHE"]
+        if negative_cache is not None and (
+            (rep := negative_cache.get(host, event.dst_port)) is not None
+        ):
+            self.logger.debug(
+                "The target %s:%s is failing, replied [%s]",
+                host,
+                event.dst_port,
+                replies.REPLIES[rep],
+            )
+            self.reply(protocol, rep)
+            raise Socks5NetworkUnreachableException
 
         try:
-            (
-                client_transport,
-                client_protocol,
-            ) = await self.protocol.loop.create_connection(
-                lambda: cls_client.from_channel(self.protocol.channel, role="client"),
-                dst_addr,
-                dst_port,
+            client_transport, client_protocol = await self.connect(protocol, event)
+        except (asyncio.TimeoutError, OSError) as exc:
+            rep = replies.reply_code(exc)
+            if rep == replies.TTL_EXPIRED:
+                protocol.channel.counter_connect_timeouts.add()
+            self.logger.error(
+                "Failed to connect the target %s:%s, replied [%s]: %r",
+                to_str(event.dst_addr),
+                event.dst_port,
+                replies.REPLIES[rep],
+                exc,
             )
-        except OSError as exc:
-            if exc.args == (101, "Network is unreachable"):
-                self.logger.error(
-                    "The target is unreachable: %s:%s", dst_addr, dst_port,
-                )
-                # self.stats.increase(f"Error/{self.name}/{exc.strerror}")
-                self.protocol.transport.write(
-                    pack(
-                        "!BBBBIH", VERSION, 0x03, 0x00, atyp, 0xFF, 0xFF
-                    )  # Network unreachable
-                )
-                raise Socks5NetworkUnreachableException
-            raise exc
+            if negative_cache is not None:
+                negative_cache.add(host, event.dst_port, rep)
+            self.reply(protocol, rep)
+            raise Socks5NetworkUnreachableException from exc
+
+        if negative_cache is not None:
+            negative_cache.discard(host, event.dst_port)
 
-        client_protocol.server_transport = self.protocol.transport
-        self.protocol.client_transport = client_transport
+        family: int = self.hand_over(protocol, client_transport, client_protocol)
 
-        bnd_addr_: str
+        bnd_addr: str
         bnd_port: int
-        bnd_addr_, bnd_port = client_transport.get_extra_info("sockname")
-
-        bnd_addr: bytes = socket.inet_pton(self.protocol.socket.family, bnd_addr_)
-
-        atyp_: int
-        if self.protocol.socket.family == socket.AF_INET:
-            atyp_ = 0x01
-        elif self.protocol.socket.family == socket.AF_INET6:
-            atyp_ = 0x03
-
-        self.protocol.transport.write(
-            pack(
-                f"!BBBB{len(bnd_addr)}sH",
-                VERSION,
-                0x00,
-                0x00,
-                atyp_,
-                bnd_addr,
-                bnd_port,
-            )
+        bnd_addr, bnd_port = client_transport.get_extra_info("sockname")[:2]
+
+        self.reply(protocol, replies.SUCCEEDED, family, bnd_addr, bnd_port)
+        if timings is not None:
+            timings.replied()
+
+    @staticmethod
+    async def connect(
+        protocol: Socks5Protocol, event: Request
+    ) -> Tuple[Transport, ProtocolMixin]:
+        """
+        Connect the target of a request, and count the latency
+        :param protocol:
+        :type protocol: Socks5Protocol
+        :param event:
+        :type event: Request
+        :return:
+        :rtype: Tuple[Transport, ProtocolMixin]
+        """
+        config = protocol.config
+        cls_client = config["CLS_CLIENT_PROTOCOL"]
+        channel = protocol.channel
+        timings: Optional[HandshakeTimings] = protocol.timings
+
+        start: float = protocol.loop.time()
+        client_transport, client_protocol = await create_connection(
+            lambda: cls_client.from_channel(channel, role="client"),
+            event.dst_addr,
+            event.dst_port,
+            delay=config["HAPPY_EYEBALLS_DELAY"],
+            timeout=config["CONNECT_TIMEOUT"],
+            loop=protocol.loop,
+            resolver=channel.resolver,
+            resolved=None if timings is None else lambda: timings.phase("resolve"),
         )
 
+        channel.counter_connect_latency.add(
+            int((protocol.loop.time() - start) * 1_000_000)
+        )
+        if timings is not None:
+            timings.phase("connect")
+        return (
+            cast(Transport, client_transport),
+            cast(ProtocolMixin, client_protocol),
+        )
 
-class Socks5StateData(Socks5State):
+    @staticmethod
+    def hand_over(
+        protocol: Socks5Protocol,
+        client_transport: Transport,
+        client_protocol: ProtocolMixin,
+    ) -> int:
+        """
+        Share the transport, the timeouts, the timings and the connection of
+        the interface with the client connected to the target
+        :param protocol:
+        :type protocol: Socks5Protocol
+        :param client_transport:
+        :type client_transport: Transport
+        :param client_protocol:
+        :type client_protocol: ProtocolMixin
+        :return: the family of the connection to the target
+        :rtype: int
+        """
+        family: int = client_transport.get_extra_info("socket").family
+        if counter := protocol.channel.counter_connect_families.get(family):
+            counter.add()
+
+        client_protocol.server_transport = protocol.transport
+        client_protocol.timeouts = protocol.timeouts
+        # the first byte from the target is timed by the client side
+        client_protocol.timings, protocol.timings = protocol.timings, None
+        client_protocol.connection = protocol.connection
+        protocol.client_transport = client_transport
+
+        # the interface is already over its high watermark
+        if protocol.writing_paused:
+            client_transport.pause_reading()
+
+        return family
+
+    @staticmethod
+    def reply(
+        protocol: Socks5Protocol,
+        rep: int,
+        family: Optional[int] = None,
+        address: Optional[str] = None,
+        port: int = 0,
+    ) -> None:
+        """
+        Reply the request and count the reply
+        :param protocol:
+        :type protocol: Socks5Protocol
+        :param rep:
+        :type rep: int
+        :param family:
+        :type family: Optional[int]
+        :param address:
+        :type address: Optional[str]
+        :param port:
+        :type port: int
+        :return:
+        :rtype: None
+        """
+        protocol.config["COUNTER_REPLIES"][rep].add()
+        protocol.transport.write(replies.pack_reply(rep, family, address, port))
+
+
+class Socks5StateData(Socks5State[Event]):
     """
     DATA state
+
+    The data is forwarded by Socks5Protocol.data_received directly, or by the
+    relay protocol
     """
 
-    def switch(self) -> None:
+    def switch(self, protocol: Socks5Protocol) -> None:
         """
-        Switch to DATA state
+        Stay in DATA state, the last one
+        :param protocol:
+        :type protocol: Socks5Protocol
         :return:
         :rtype: None
         """
-        return super(Socks5StateData, self)._switch("DATA")
 
-    async def data_received(self, data: bytes) -> None:
+    async def event_received(self, protocol: Socks5Protocol, event: Event) -> None:
         """
-
-        :param data:
-        :type data: bytes
+        No message is expected in DATA state, the handshake stops once DATA
+        state is reached
+        :param protocol:
+        :type protocol: Socks5Protocol
+        :param event:
+        :type event: Event
         :return:
         :rtype: None
         """
-        self.logger.debug(
-            "[%s] [DATA] [%s:%s] received: %s bytes",
-            hex(id(self.protocol))[-4:],
-            *self.protocol.info_peername,
-            len(data),
-        )
-        self.protocol.client_transport.write(data)
+
+
+# the handlers of the states shared by all protocols, by the states
+STATES: Tuple[Socks5State[Any], ...] = (
+    Socks5StateInit(),
+    Socks5StateAuth(),
+    Socks5StateHost(),
+    Socks5StateData(),
+)
 
 
 class Socks5Protocol(
@@ -354,34 +479,68 @@ class Socks5Protocol(
     A socks5 proxy server side
     """
 
+    __slots__ = ("loop", "state", "parser", "handshake", "cls_auth_method")
+
     name = "Socks5"
     role = "interface"
     setting_prefix = "PROTOCOL_SOCKS5_"
 
-    def __init__(
-        self, channel, name: str = None, role: str = None, setting_prefix: str = None
-    ):
-        super(Socks5Protocol, self).__init__(channel, name, role, setting_prefix)
+    def __init__(self, channel):
+        """
 
-        self.loop = get_event_loop()
+        :param channel:
+        :type channel: Channel
+        """
+        super(Socks5Protocol, self).__init__(channel)
 
-        self.init = Socks5StateInit(self)
-        self.auth = Socks5StateAuth(self)
-        self.host = Socks5StateHost(self)
-        self.data = Socks5StateData(self)
+        self.loop = get_event_loop()
 
-        self.states = {
-            "INIT": self.init,
-            "AUTH": self.auth,
-            "HOST": self.host,
-            "DATA": self.data,
-        }
+        # the index of the state in STATES
+        self.state: int = INIT
 
-        self.state = self.init
+        # the parser buffering the handshake, and the task processing it
+        self.parser = Socks5Parser()
+        self.handshake: Optional[asyncio.Task] = None
 
         self.cls_auth_method = None
 
-    @middlewares
+    @classmethod
+    def build_config(cls, channel, setting_prefix: str) -> Dict[str, Any]:
+        """
+        Resolve the client, relay and authentication method classes, and the
+        preference order of the authentication methods
+        :param channel:
+        :type channel: Channel
+        :param setting_prefix:
+        :type setting_prefix: str
+        :return:
+        :rtype: Dict[str, Any]
+        """
+        config: Dict[str, Any] = super(Socks5Protocol, cls).build_config(
+            channel, setting_prefix
+        )
+
+        config["CLS_CLIENT_PROTOCOL"] = load_object(config["CLIENT_PROTOCOL"])
+        config["CLS_RELAY_PROTOCOL"] = (
+            load_object(config["RELAY_PROTOCOL"])
+            if config.get("RELAY_PROTOCOL")
+            else None
+        )
+        config["CLS_AUTH_METHODS"] = {
+            method: load_object(cls_method)
+            for method, cls_method in config["AUTH_METHODS"].items()
+        }
+        config["AUTH_METHODS_ORDER"] = tuple(config["AUTH_METHODS"])
+        config["NEGATIVE_CACHE"] = channel.service.extension_manager.extensions.get(
+            "NegativeCache"
+        )
+        config["COUNTER_REPLIES"] = {
+            rep: channel.stats.counter(f"socks5/{channel.name}/replies/{name}")
+            for rep, name in replies.REPLIES.items()
+        }
+
+        return config
+
     def connection_made(self, transport) -> None:
         """
         Called when a connection is made.
@@ -394,8 +553,12 @@ class Socks5Protocol(
         :return:
         :rtype: None
         """
+        self.transport = transport
+        self.set_write_buffer_limits(transport)
+
+        self.timeouts = self.channel.track(transport)
+        self.timings = HandshakeTimings(self.channel, self.loop)
 
-    @middlewares
     def connection_lost(self, exc: Optional[Exception]) -> None:
         """
         Called when the connection is lost or closed.
@@ -409,51 +572,130 @@ class Socks5Protocol(
         :return:
         :rtype: None
         """
+        self.release_buffered()
+        self.release_source()
+        if self.timeouts is not None:
+            self.timeouts.cancel()
+        # stop the handshake, e.g. connecting the target
+        if self.handshake is not None:
+            self.handshake.cancel()
         try:
             self.client_transport.close()
         except TransportNotDefinedException:
             pass
 
-    @middlewares
+    def pause_writing(self) -> None:
+        """
+        Called when the transport's buffer goes over the high watermark.
+
+        Stop reading from the target until the client drains the buffer.
+
+        :return:
+        :rtype: None
+        """
+        self.pause_peer_reading()
+
+    def resume_writing(self) -> None:
+        """
+        Called when the transport's buffer drains below the low watermark.
+
+        :return:
+        :rtype: None
+        """
+        self.resume_peer_reading()
+
     def data_received(self, data: bytes) -> None:
         """
         Called when some data is received. data is a non-empty bytes object
         containing the incoming data.
 
+        In DATA state the data is forwarded to the target at once; in the
+        handshake states it is fed to the parser, and the complete messages are
+        processed in order by a task.
+
         :param data:
         :type data: bytes
         :return:
         :rtype: None
         """
-        self.loop.create_task(self._data_received(data))
+        if (timeouts := self.timeouts) is not None:
+            timeouts.touch()
 
-    async def _data_received(self, data: bytes) -> None:
-        (result,) = await asyncio.gather(
-            self.state.data_received(data), return_exceptions=True
-        )
-        if result is None:
-            previous_state = self._get_state()
-            self.state.switch()
-            self.logger.debug(
-                "[%s] [%s] State switched to [%s]",
-                hex(id(self))[-4:],
-                previous_state,
-                self._get_state(),
-            )
-        elif isinstance(
-            result,
-            (
-                Socks5AuthenticationFailed,
-                Socks5NetworkUnreachableException,
-                ProtocolVersionNotSupportedException,
-            ),
-        ):
-            self.transport.close()
-        elif isinstance(result, Exception):
-            self.logger.exception(result)
-            self.transport.close()
+        if self.state == DATA:
+            self.client_transport.write(data)
+            return
+
+        self.parser.receive_data(data)
+        if self.handshake is None:
+            self.handshake = self.loop.create_task(self._handshake())
+
+    async def _handshake(self) -> None:
+        """
+        Process the parsed messages one by one until more data is needed or DATA
+        state is reached; the bytes left in the parser are forwarded to the
+        target then, so a pipelined client finishes the handshake in one round
+        trip
+        :return:
+        :rtype: None
+        """
+        try:
+            while True:
+                state: Socks5State = STATES[self.state]
+                try:
+                    event = self.parser.next_event(state.expect(self))
+                    if event is None:
+                        return
+                    await state.event_received(self, event)
+                except Socks5AddressTypeNotSupportedException as exc:
+                    Socks5StateHost.reply(self, replies.reply_code(exc))
+                    self.transport.close()
+                    return
+                except (
+                    Socks5AuthenticationFailed,
+                    Socks5CMDNotSupportedException,
+                    Socks5NetworkUnreachableException,
+                    Socks5NoAcceptableMethodsException,
+                    ProtocolVersionNotSupportedException,
+                ):
+                    self.transport.close()
+                    return
+                except Exception as exc:  # pylint: disable=broad-except
+                    self.logger.exception(exc)
+                    self.transport.close()
+                    return
+
+                previous_state = self._get_state()
+                state.switch(self)
+                self.logger.debug(
+                    "[%s] [%s] State switched to [%s]",
+                    hex(id(self))[-4:],
+                    previous_state,
+                    self._get_state(),
+                )
+
+                if self.state == DATA:
+                    if self.timeouts is not None:
+                        self.timeouts.handshake_done()
+                    if data := self.parser.trailing_data():
+                        self.client_transport.write(data)
+                    return
+        finally:
+            self.handshake = None
+
+    def relay(self) -> None:
+        """
+        Replace the protocols of both transports with RELAY_PROTOCOL of the
+        channel for the DATA state
+        :return:
+        :rtype: None
+        """
+        if (cls_relay := self.config["CLS_RELAY_PROTOCOL"]) is None:
+            return
 
-    @cached_property
+        cls_relay.take_over(self.client_transport.get_protocol())
+        cls_relay.take_over(self)
+
+    @property
     def info_peername(self) -> Tuple[str, int]:
         """
 
@@ -462,15 +704,15 @@ class Socks5Protocol(
         """
         return self.transport.get_extra_info("peername")[:2]
 
-    def _get_state(self, state=None) -> str:
+    def _get_state(self, state: Optional[int] = None) -> str:
         """
 
+        :param state:
+        :type state: Optional[int]
         :return:
         :rtype: str
         """
-        keys = list(self.states.keys())
-        index = list(self.states.values()).index(state if state else self.state)
-        return keys[index]
+        return STATE_NAMES[self.state if state is None else state]
 
 
 __all__ = ["Socks5Protocol"]
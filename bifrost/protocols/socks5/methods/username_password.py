@@ -13,6 +13,7 @@ from bifrost.exceptions.protocol import (
     ProtocolNotDefinedException,
     Socks5AuthenticationFailed,
 )
+from bifrost.protocols.socks5.parser import UsernamePassword
 from bifrost.utils.misc import load_object, to_str
 
 
@@ -152,6 +153,7 @@ class UsernamePasswordAuth(LoggerMixin, SignalManagerMixin, metaclass=SingletonM
 
     value = 0x02
     next_state = "AUTH"
+    expect = UsernamePassword
 
     def __init__(self):
         """
@@ -213,23 +215,22 @@ class UsernamePasswordAuth(LoggerMixin, SignalManagerMixin, metaclass=SingletonM
             self._backend = cls_backend.from_auth(self)
         return self._backend
 
-    async def auth(self, data: bytes) -> None:
+    async def auth(self, event: UsernamePassword) -> None:
         """
 
-        :param data:
-        :type data:
+        :param event:
+        :type event: UsernamePassword
         :return:
         :rtype: None
         """
-        ver: int = data[0]
-        ulen: int = data[1]
-        uname: bytes = data[2 : 2 + ulen]
-        plen: int = data[2 + ulen]
-        passwd: bytes = data[2 + ulen + 1 : 2 + ulen + 1 + plen]
-
-        if await self.backend.authenticate(uname, passwd):
-            self.protocol.transport.write(pack("!BB", ver, 0x00))
+        # the instance is shared, another handshake may set the protocol while
+        # the backend is awaited
+        protocol = self.protocol
+        if await self.backend.authenticate(event.uname, event.passwd):
+            protocol.transport.write(pack("!BB", event.ver, 0x00))
+            if (connection := protocol.connection) is not None:
+                connection.registry.update(connection, user=to_str(event.uname))
         else:
-            self.protocol.transport.write(pack("!BB", ver, 0xFF))
-            self.logger.debug("Authentication failed: [%s]", to_str(uname))
+            protocol.transport.write(pack("!BB", event.ver, 0xFF))
+            self.logger.debug("Authentication failed: [%s]", to_str(event.uname))
             raise Socks5AuthenticationFailed
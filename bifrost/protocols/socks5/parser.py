@@ -0,0 +1,208 @@
+"""
+Incremental parser of the Socks5 handshake
+
+The parser does no I/O: bytes are fed in as they are received, and complete
+messages come out as events. A message split across several reads is kept in
+the buffer until it is complete, and several messages received in one read are
+returned one by one, so the bytes following the handshake stay in the buffer
+for the DATA state.
+
+RFC 1928 - SOCKS Protocol Version 5
+https://datatracker.ietf.org/doc/rfc1928/
+
+RFC 1929 - Username/Password Authentication for SOCKS V5
+https://datatracker.ietf.org/doc/rfc1929/
+"""
+from __future__ import annotations
+
+import socket
+from collections import namedtuple
+from struct import unpack_from
+from typing import Callable, Dict, Optional, Tuple, Type, Union
+
+from bifrost.exceptions.protocol import (
+    ProtocolVersionNotSupportedException,
+    Socks5AddressTypeNotSupportedException,
+)
+
+VERSION = 0x05  # Socks version
+
+# The version identifier/method selection message
+Greeting = namedtuple("Greeting", ["ver", "methods"])
+# The username/password request of RFC 1929
+UsernamePassword = namedtuple("UsernamePassword", ["ver", "uname", "passwd"])
+# The SOCKS request
+Request = namedtuple("Request", ["ver", "cmd", "rsv", "atyp", "dst_addr", "dst_port"])
+
+Event = Union[Greeting, UsernamePassword, Request]
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def parse_greeting(data: Buffer) -> Optional[Tuple[Greeting, int]]:
+    """
+    +----+----------+----------+
+    |VER | NMETHODS | METHODS  |
+    +----+----------+----------+
+    | 1  |    1     | 1 to 255 |
+    +----+----------+----------+
+
+    :param data:
+    :type data: Buffer
+    :return: the event and the size of the message, or None if incomplete
+    :rtype: Optional[Tuple[Greeting, int]]
+    """
+    if len(data) < 2:
+        return None
+    if data[0] != VERSION:
+        raise ProtocolVersionNotSupportedException
+
+    size: int = 2 + data[1]
+    if len(data) < size:
+        return None
+
+    return Greeting(data[0], bytes(data[2:size])), size
+
+
+def parse_username_password(data: Buffer) -> Optional[Tuple[UsernamePassword, int]]:
+    """
+    +----+------+----------+------+----------+
+    |VER | ULEN |  UNAME   | PLEN |  PASSWD  |
+    +----+------+----------+------+----------+
+    | 1  |  1   | 1 to 255 |  1   | 1 to 255 |
+    +----+------+----------+------+----------+
+
+    :param data:
+    :type data: Buffer
+    :return: the event and the size of the message, or None if incomplete
+    :rtype: Optional[Tuple[UsernamePassword, int]]
+    """
+    if len(data) < 2:
+        return None
+
+    ulen: int = data[1]
+    if len(data) < 3 + ulen:
+        return None
+
+    size: int = 3 + ulen + data[2 + ulen]
+    if len(data) < size:
+        return None
+
+    return (
+        UsernamePassword(
+            data[0], bytes(data[2 : 2 + ulen]), bytes(data[3 + ulen : size])
+        ),
+        size,
+    )
+
+
+def parse_request(data: Buffer) -> Optional[Tuple[Request, int]]:
+    """
+    +----+-----+-------+------+----------+----------+
+    |VER | CMD |  RSV  | ATYP | DST.ADDR | DST.PORT |
+    +----+-----+-------+------+----------+----------+
+    | 1  |  1  | X'00' |  1   | Variable |    2     |
+    +----+-----+-------+------+----------+----------+
+
+    :param data:
+    :type data: Buffer
+    :return: the event and the size of the message, or None if incomplete
+    :rtype: Optional[Tuple[Request, int]]
+    """
+    if len(data) < 5:
+        return None
+    if data[0] != VERSION:
+        raise ProtocolVersionNotSupportedException
+
+    atyp: int = data[3]
+
+    dst_addr: Union[str, bytes]
+    size: int
+    if atyp == 0x01:  # ipv4
+        size = 10
+        if len(data) < size:
+            return None
+        dst_addr = socket.inet_ntop(socket.AF_INET, bytes(data[4:8]))
+    elif atyp == 0x03:  # domain
+        size = 7 + data[4]
+        if len(data) < size:
+            return None
+        dst_addr = bytes(data[5 : size - 2])
+    elif atyp == 0x04:  # ipv6
+        size = 22
+        if len(data) < size:
+            return None
+        dst_addr = socket.inet_ntop(socket.AF_INET6, bytes(data[4:20]))
+    else:
+        raise Socks5AddressTypeNotSupportedException
+
+    dst_port: int = unpack_from("!H", data, size - 2)[0]
+
+    return Request(data[0], data[1], data[2], atyp, dst_addr, dst_port), size
+
+
+class Socks5Parser:
+    """
+    Buffer the received bytes and parse the expected message from them
+    """
+
+    parsers: Dict[Type, Callable[[Buffer], Optional[Tuple[Event, int]]]] = {
+        Greeting: parse_greeting,
+        UsernamePassword: parse_username_password,
+        Request: parse_request,
+    }
+
+    def __init__(self):
+        self.buffer: bytearray = bytearray()
+
+    def receive_data(self, data: Buffer) -> None:
+        """
+        Feed the received bytes
+
+        :param data:
+        :type data: Buffer
+        :return:
+        :rtype: None
+        """
+        self.buffer += data
+
+    def next_event(self, expect: Type) -> Optional[Event]:
+        """
+        Parse the expected message from the buffer and consume its bytes
+
+        :param expect: the event type of the expected message
+        :type expect: Type
+        :return: the event, or None if more data is needed
+        :rtype: Optional[Event]
+        """
+        if not self.buffer:
+            return None
+
+        result = self.parsers[expect](self.buffer)
+        if result is None:
+            return None
+
+        event, size = result
+        del self.buffer[:size]
+        return event
+
+    def trailing_data(self) -> bytes:
+        """
+        Take the bytes received after the last message
+
+        :return:
+        :rtype: bytes
+        """
+        data, self.buffer = bytes(self.buffer), bytearray()
+        return data
+
+
+__all__ = [
+    "Greeting",
+    "Request",
+    "Socks5Parser",
+    "UsernamePassword",
+    "VERSION",
+    "parse_greeting",
+    "parse_request",
+    "parse_username_password",
+]
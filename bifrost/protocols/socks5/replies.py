@@ -0,0 +1,110 @@
+"""
+Replies of the Socks5 requests
+
++----+-----+-------+------+----------+----------+
+|VER | REP |  RSV  | ATYP | BND.ADDR | BND.PORT |
++----+-----+-------+------+----------+----------+
+| 1  |  1  | X'00' |  1   | Variable |    2     |
++----+-----+-------+------+----------+----------+
+
+A failed request is replied with the REP code matching the error, so the client
+fails at once instead of waiting for its own timeout.
+
+RFC 1928 - SOCKS Protocol Version 5
+https://datatracker.ietf.org/doc/rfc1928/
+"""
+from __future__ import annotations
+
+import asyncio
+import errno
+import socket
+from struct import pack
+from typing import Dict, Optional
+
+from bifrost.exceptions.protocol import (
+    Socks5AddressTypeNotSupportedException,
+    Socks5CMDNotSupportedException,
+)
+from bifrost.protocols.socks5.parser import VERSION
+
+SUCCEEDED = 0x00
+GENERAL_FAILURE = 0x01
+NOT_ALLOWED = 0x02
+NETWORK_UNREACHABLE = 0x03
+HOST_UNREACHABLE = 0x04
+CONNECTION_REFUSED = 0x05
+TTL_EXPIRED = 0x06
+COMMAND_NOT_SUPPORTED = 0x07
+ADDRESS_TYPE_NOT_SUPPORTED = 0x08
+
+REPLIES: Dict[int, str] = {
+    SUCCEEDED: "succeeded",
+    GENERAL_FAILURE: "general_failure",
+    NOT_ALLOWED: "not_allowed",
+    NETWORK_UNREACHABLE: "network_unreachable",
+    HOST_UNREACHABLE: "host_unreachable",
+    CONNECTION_REFUSED: "connection_refused",
+    TTL_EXPIRED: "ttl_expired",
+    COMMAND_NOT_SUPPORTED: "command_not_supported",
+    ADDRESS_TYPE_NOT_SUPPORTED: "address_type_not_supported",
+}
+
+ERRNO_REPLIES: Dict[int, int] = {
+    errno.EACCES: NOT_ALLOWED,
+    errno.EPERM: NOT_ALLOWED,
+    errno.ENETUNREACH: NETWORK_UNREACHABLE,
+    errno.ENETDOWN: NETWORK_UNREACHABLE,
+    errno.EHOSTUNREACH: HOST_UNREACHABLE,
+    errno.EHOSTDOWN: HOST_UNREACHABLE,
+    errno.ECONNREFUSED: CONNECTION_REFUSED,
+    errno.ETIMEDOUT: TTL_EXPIRED,
+}
+
+
+def reply_code(exc: BaseException) -> int:
+    """
+    Map an error of a request to its REP code; a name not resolved is an
+    unreachable host, and a connection timed out is replied as TTL expired
+    :param exc:
+    :type exc: BaseException
+    :return:
+    :rtype: int
+    """
+    if isinstance(exc, Socks5CMDNotSupportedException):
+        return COMMAND_NOT_SUPPORTED
+    if isinstance(exc, Socks5AddressTypeNotSupportedException):
+        return ADDRESS_TYPE_NOT_SUPPORTED
+    if isinstance(exc, socket.gaierror):
+        return HOST_UNREACHABLE
+    if isinstance(exc, asyncio.TimeoutError):
+        return TTL_EXPIRED
+    if isinstance(exc, OSError):
+        return ERRNO_REPLIES.get(exc.errno, GENERAL_FAILURE)  # type: ignore
+    return GENERAL_FAILURE
+
+
+def pack_reply(
+    rep: int,
+    family: Optional[int] = None,
+    address: Optional[str] = None,
+    port: int = 0,
+) -> bytes:
+    """
+    Pack a reply; a failure is replied with the IPv4 address 0.0.0.0:0
+    :param rep:
+    :type rep: int
+    :param family: the family of the bound address
+    :type family: Optional[int]
+    :param address: the bound address
+    :type address: Optional[str]
+    :param port: the bound port
+    :type port: int
+    :return:
+    :rtype: bytes
+    """
+    if family is None or address is None:
+        return pack("!BBBB4sH", VERSION, rep, 0x00, 0x01, bytes(4), 0)
+
+    bnd_addr: bytes = socket.inet_pton(family, address)
+    atyp: int = 0x04 if family == socket.AF_INET6 else 0x01
+    return pack(f"!BBBB{len(bnd_addr)}sH", VERSION, rep, 0x00, atyp, bnd_addr, port)
@@ -0,0 +1,15 @@
+"""
+All ready to use resolvers
+"""
+from bifrost.resolvers.base import Answer, BaseResolver
+from bifrost.resolvers.cache import CachingResolver
+from bifrost.resolvers.dns import DNSResolver
+from bifrost.resolvers.system import SystemResolver
+
+__all__ = [
+    "Answer",
+    "BaseResolver",
+    "CachingResolver",
+    "DNSResolver",
+    "SystemResolver",
+]
@@ -0,0 +1,66 @@
+"""
+Base class for resolvers
+"""
+from __future__ import annotations
+
+import socket
+from collections import namedtuple
+from typing import List, Union
+
+from bifrost.base import BaseComponent, LoggerMixin, StatsMixin
+from bifrost.utils.connect import AddrInfo, literal
+
+# The addresses of a name as (family, address) pairs in the order to try them,
+# and the time to live in seconds, None if unknown
+Answer = namedtuple("Answer", ["addresses", "ttl"])
+
+
+class BaseResolver(BaseComponent, LoggerMixin, StatsMixin):
+    """
+    Resolve the names of the targets; a resolver implements lookup, and stop
+    if it holds any resource
+    """
+
+    name: str = "Resolver"
+    setting_prefix: str = "RESOLVER_"
+
+    async def stop(self) -> None:
+        """
+        Release the resources of the resolver when the service stops
+        :return:
+        :rtype: None
+        """
+
+    async def resolve(self, host: Union[str, bytes], port: int) -> List[AddrInfo]:
+        """
+        Get the addresses of a host as getaddrinfo does; an IP address is
+        returned as it is without a lookup
+        :param host:
+        :type host: Union[str, bytes]
+        :param port:
+        :type port: int
+        :return:
+        :rtype: List[AddrInfo]
+        """
+        if isinstance(host, bytes):
+            host = host.decode("idna")
+
+        if (infos := literal(host, port)) is not None:
+            return infos
+
+        answer: Answer = await self.lookup(host)
+        return [
+            (family, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (address, port))
+            for family, address in answer.addresses
+        ]
+
+    async def lookup(self, host: str) -> Answer:
+        """
+        Look up the addresses of a name
+        :param host:
+        :type host: str
+        :return:
+        :rtype: Answer
+        :raise socket.gaierror: if the name can't be resolved
+        """
+        raise NotImplementedError
@@ -0,0 +1,192 @@
+"""
+A resolver caching the answers of another one
+
+The answers are kept in a bounded LRU cache for their time to live, capped by
+TTL. An expired answer is still served for STALE_TTL while it is looked up
+again in the background, so a hot name never waits for a lookup. A failed
+lookup is cached for NEGATIVE_TTL. The concurrent lookups of a name share one
+lookup of the backend.
+"""
+from __future__ import annotations
+
+import asyncio
+from asyncio.events import get_event_loop
+from typing import Dict, Optional
+
+from cachetools import LRUCache
+
+from bifrost.extensions.stats import Counter
+from bifrost.resolvers.base import Answer, BaseResolver
+from bifrost.utils.misc import load_object
+
+
+class Entry:  # pylint: disable=too-few-public-methods
+    """
+    An answer or an error cached for a name
+    """
+
+    __slots__ = ("answer", "error", "expires", "stale")
+
+    def __init__(
+        self,
+        answer: Optional[Answer],
+        error: Optional[OSError],
+        expires: float,
+        stale: float,
+    ):
+        """
+
+        :param answer:
+        :type answer: Optional[Answer]
+        :param error:
+        :type error: Optional[OSError]
+        :param expires: the time to look the name up again
+        :type expires: float
+        :param stale: the time to stop serving the answer
+        :type stale: float
+        """
+        self.answer: Optional[Answer] = answer
+        self.error: Optional[OSError] = error
+        self.expires: float = expires
+        self.stale: float = stale
+
+
+class CachingResolver(BaseResolver):  # pylint: disable=too-many-instance-attributes
+    """
+    Cache the answers of the resolver BACKEND
+    """
+
+    name: str = "CachingResolver"
+    setting_prefix: str = "RESOLVER_CACHE_"
+
+    def __init__(
+        self, service, name: Optional[str] = None, setting_prefix: Optional[str] = None
+    ):
+        """
+
+        :param service:
+        :type service: Service
+        :param name:
+        :type name: Optional[str]
+        :param setting_prefix:
+        :type setting_prefix: Optional[str]
+        """
+        super().__init__(service, name, setting_prefix)
+
+        self.backend: BaseResolver = load_object(self.config["BACKEND"]).from_service(
+            service
+        )
+
+        self.cache: LRUCache = LRUCache(maxsize=self.config["SIZE"])
+        # the lookups of the backend in flight by name
+        self.lookups: Dict[str, asyncio.Task] = {}
+
+        self.counter_hits: Counter = self.stats.counter("resolver/hits")
+        self.counter_stale_hits: Counter = self.stats.counter("resolver/stale_hits")
+        self.counter_negative_hits: Counter = self.stats.counter(
+            "resolver/negative_hits"
+        )
+        self.counter_misses: Counter = self.stats.counter("resolver/misses")
+        self.counter_coalesced: Counter = self.stats.counter("resolver/coalesced")
+        self.counter_errors: Counter = self.stats.counter("resolver/errors")
+
+    async def stop(self) -> None:
+        """
+        Cancel the lookups in flight, and stop the backend
+        :return:
+        :rtype: None
+        """
+        for task in list(self.lookups.values()):
+            task.cancel()
+        await self.backend.stop()
+
+    async def lookup(self, host: str) -> Answer:
+        """
+
+        :param host:
+        :type host: str
+        :return:
+        :rtype: Answer
+        """
+        entry: Optional[Entry] = self.cache.get(host)
+        if entry is not None:
+            now: float = get_event_loop().time()
+            if now < entry.expires:
+                if entry.error is not None:
+                    self.counter_negative_hits.add()
+                    raise type(entry.error)(*entry.error.args)
+                self.counter_hits.add()
+                return entry.answer  # type: ignore
+            if entry.error is None and now < entry.stale:
+                self.counter_stale_hits.add()
+                self._lookup(host)
+                return entry.answer  # type: ignore
+
+        # a lookup joining the one in flight is counted as coalesced instead
+        if host not in self.lookups:
+            self.counter_misses.add()
+        # a caller giving up doesn't cancel the lookup shared with the others
+        return await asyncio.shield(self._lookup(host))
+
+    def _lookup(self, host: str) -> asyncio.Task:
+        """
+        Look the name up with the backend, or join the lookup in flight
+        :param host:
+        :type host: str
+        :return:
+        :rtype: asyncio.Task
+        """
+        try:
+            task = self.lookups[host]
+        except KeyError:
+            task = self.lookups[host] = get_event_loop().create_task(self._fetch(host))
+            task.add_done_callback(lambda t: self._done(host, t))
+        else:
+            self.counter_coalesced.add()
+        return task
+
+    def _done(self, host: str, task: asyncio.Task) -> None:
+        """
+
+        :param host:
+        :type host: str
+        :param task:
+        :type task: asyncio.Task
+        :return:
+        :rtype: None
+        """
+        del self.lookups[host]
+        # nobody waits for a refresh in the background
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, host: str) -> Answer:
+        """
+        Look the name up with the backend and cache the answer or the error
+        :param host:
+        :type host: str
+        :return:
+        :rtype: Answer
+        """
+        try:
+            answer: Answer = await self.backend.lookup(host)
+        except OSError as exc:
+            self.counter_errors.add()
+            now: float = get_event_loop().time()
+
+            # keep serving a stale answer if the refresh fails
+            entry: Optional[Entry] = self.cache.get(host)
+            if entry is None or entry.error is not None or now >= entry.stale:
+                expires: float = now + self.config["NEGATIVE_TTL"]
+                self.cache[host] = Entry(None, exc, expires, expires)
+            raise
+
+        ttl: float = self.config["TTL"]
+        if answer.ttl is not None:
+            ttl = min(answer.ttl, ttl)
+
+        expires = get_event_loop().time() + ttl
+        self.cache[host] = Entry(
+            answer, None, expires, expires + self.config["STALE_TTL"]
+        )
+        return answer
@@ -0,0 +1,410 @@
+"""
+A stub resolver speaking DNS over UDP on the event loop
+
+The queries to a server are sent over one UDP socket and matched with their
+responses by ID, so many of them are in flight at once without any thread. The
+A and AAAA queries of a name are sent in parallel; a query is sent again to the
+next server after TIMEOUT, and sent over TCP if its response is truncated.
+
+RFC 1035 - Domain Names - Implementation and Specification
+https://datatracker.ietf.org/doc/rfc1035/
+
+RFC 3596 - DNS Extensions to Support IP Version 6
+https://datatracker.ietf.org/doc/rfc3596/
+"""
+from __future__ import annotations
+
+import asyncio
+import secrets
+import socket
+import struct
+from asyncio.events import get_event_loop
+from asyncio.protocols import DatagramProtocol
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from bifrost.extensions.stats import Counter
+from bifrost.resolvers.base import Answer, BaseResolver
+
+HEADER = struct.Struct("!HHHHHH")
+RECORD = struct.Struct("!HHIH")
+
+FLAG_QR = 0x8000  # response
+FLAG_TC = 0x0200  # truncated
+FLAG_RD = 0x0100  # recursion desired
+
+TYPE_A = 1
+TYPE_AAAA = 28
+CLASS_IN = 1
+
+RCODE_NXDOMAIN = 3
+
+FAMILIES: Dict[int, int] = {TYPE_A: socket.AF_INET, TYPE_AAAA: socket.AF_INET6}
+
+# The response of a query: the answer records as (type, ttl, data)
+Response = namedtuple("Response", ["id", "truncated", "rcode", "records"])
+
+
+def parse_server(server: str) -> Tuple[str, int]:
+    """
+    Parse a server given as "host", "host:port" or "[ipv6]:port"
+    :param server:
+    :type server: str
+    :return:
+    :rtype: Tuple[str, int]
+    """
+    port: str = ""
+    if server.startswith("["):
+        server, _, port = server[1:].partition("]")
+        port = port.lstrip(":")
+    elif server.count(":") == 1:
+        server, port = server.split(":")
+    return server, int(port or 53)
+
+
+def read_resolv_conf(path: str = "/etc/resolv.conf") -> List[str]:
+    """
+    Get the name servers of the system
+    :param path:
+    :type path: str
+    :return:
+    :rtype: List[str]
+    """
+    servers: List[str] = []
+    try:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == "nameserver":
+                    # drop the zone of a link-local address
+                    servers.append(fields[1].split("%")[0])
+    except OSError:
+        pass
+    return servers
+
+
+def encode_question(name: str, qtype: int) -> bytes:
+    """
+    +------+-------+--------+
+    | NAME | QTYPE | QCLASS |
+    +------+-------+--------+
+    |  var |   2   |   2    |
+    +------+-------+--------+
+
+    :param name:
+    :type name: str
+    :param qtype:
+    :type qtype: int
+    :return:
+    :rtype: bytes
+    """
+    labels: List[bytes] = [
+        label for label in name.encode("idna").lower().split(b".") if label
+    ]
+    return (
+        b"".join(bytes((len(label),)) + label for label in labels)
+        + b"\x00"
+        + struct.pack("!HH", qtype, CLASS_IN)
+    )
+
+
+def skip_name(data: bytes, offset: int) -> int:
+    """
+    Get the offset after a name, which may end with a pointer
+    :param data:
+    :type data: bytes
+    :param offset:
+    :type offset: int
+    :return:
+    :rtype: int
+    """
+    while True:
+        length: int = data[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        if length == 0:
+            return offset + 1
+        offset += length + 1
+
+
+def parse_response(data: bytes) -> Response:
+    """
+    Parse the header and the A and AAAA records of the answer section
+    :param data:
+    :type data: bytes
+    :return:
+    :rtype: Response
+    :raise ValueError: if the response is malformed
+    """
+    try:
+        qid, flags, qdcount, ancount, _, _ = HEADER.unpack_from(data)
+
+        offset: int = HEADER.size
+        for _ in range(qdcount):
+            offset = skip_name(data, offset) + 4
+
+        records: List[Tuple[int, int, str]] = []
+        for _ in range(ancount):
+            offset = skip_name(data, offset)
+            rtype, rclass, ttl, rdlength = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            rdata: bytes = data[offset : offset + rdlength]
+            offset += rdlength
+            if rclass == CLASS_IN and rtype in FAMILIES:
+                records.append((rtype, ttl, socket.inet_ntop(FAMILIES[rtype], rdata)))
+    except (IndexError, struct.error) as exc:
+        raise ValueError("Malformed DNS response") from exc
+
+    return Response(qid, bool(flags & FLAG_TC), flags & 0x0F, records)
+
+
+class DNSProtocol(DatagramProtocol):
+    """
+    Hand the datagrams received from a server over to the resolver
+    """
+
+    def __init__(self, resolver: DNSResolver):
+        """
+
+        :param resolver:
+        :type resolver: DNSResolver
+        """
+        self.resolver: DNSResolver = resolver
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        """
+
+        :param data:
+        :type data: bytes
+        :param addr:
+        :type addr: Tuple[str, int]
+        :return:
+        :rtype: None
+        """
+        self.resolver.response_received(data)
+
+    def error_received(self, exc: Exception) -> None:
+        """
+        An ICMP error of a query, the query times out then
+        :param exc:
+        :type exc: Exception
+        :return:
+        :rtype: None
+        """
+        self.resolver.logger.debug("DNS server error: %s", exc)
+
+
+class DNSResolver(BaseResolver):
+    """
+    Look up the names with the servers of SERVERS, or of /etc/resolv.conf
+    """
+
+    name: str = "DNSResolver"
+    setting_prefix: str = "RESOLVER_DNS_"
+
+    def __init__(
+        self, service, name: Optional[str] = None, setting_prefix: Optional[str] = None
+    ):
+        """
+
+        :param service:
+        :type service: Service
+        :param name:
+        :type name: Optional[str]
+        :param setting_prefix:
+        :type setting_prefix: Optional[str]
+        """
+        super().__init__(service, name, setting_prefix)
+
+        self.servers: List[Tuple[str, int]] = [
+            parse_server(server)
+            for server in self.config["SERVERS"] or read_resolv_conf() or ["127.0.0.1"]
+        ]
+
+        # the UDP endpoints by server, created at the first query
+        self.endpoints: Dict[Tuple[str, int], asyncio.Task] = {}
+        # the queries in flight by ID, with the questions to match
+        self.pending: Dict[int, Tuple[bytes, asyncio.Future]] = {}
+
+        self.counter_queries: Counter = self.stats.counter("resolver/dns/queries")
+        # the queries timed out or failed, to be sent again
+        self.counter_failures: Counter = self.stats.counter("resolver/dns/failures")
+        self.counter_truncated: Counter = self.stats.counter("resolver/dns/truncated")
+
+    async def stop(self) -> None:
+        """
+        Close the endpoints and cancel the queries in flight
+        :return:
+        :rtype: None
+        """
+        for _, future in self.pending.values():
+            future.cancel()
+
+        for task in self.endpoints.values():
+            if task.done() and not task.cancelled() and not task.exception():
+                transport, _ = task.result()
+                transport.close()
+            else:
+                task.cancel()
+        self.endpoints.clear()
+
+    async def lookup(self, host: str) -> Answer:
+        """
+        Query AAAA and A in parallel
+        :param host:
+        :type host: str
+        :return:
+        :rtype: Answer
+        """
+        results = await asyncio.gather(
+            self.query(host, TYPE_AAAA),
+            self.query(host, TYPE_A),
+            return_exceptions=True,
+        )
+
+        addresses: List[Tuple[int, str]] = []
+        ttl: Optional[int] = None
+        errors: List[BaseException] = []
+        for result in results:
+            if isinstance(result, BaseException):
+                errors.append(result)
+                continue
+            for rtype, ttl_, address in result.records:
+                addresses.append((FAMILIES[rtype], address))
+                ttl = ttl_ if ttl is None else min(ttl, ttl_)
+
+        if addresses:
+            return Answer(addresses, ttl)
+        for error in errors:
+            if not isinstance(error, socket.gaierror):
+                raise error
+        if errors:
+            raise errors[0]
+        raise socket.gaierror(socket.EAI_NONAME, "No address associated with name")
+
+    async def query(self, host: str, qtype: int) -> Response:
+        """
+        Send a query to the servers in turn until one of them responds
+        :param host:
+        :type host: str
+        :param qtype:
+        :type qtype: int
+        :return:
+        :rtype: Response
+        """
+        try:
+            question: bytes = encode_question(host, qtype)
+        except UnicodeError as exc:
+            raise socket.gaierror(socket.EAI_NONAME, str(exc)) from exc
+
+        loop = get_event_loop()
+        for _ in range(self.config["ATTEMPTS"]):
+            for server in self.servers:
+                qid: int = self._new_id()
+                message: bytes = HEADER.pack(qid, FLAG_RD, 1, 0, 0, 0) + question
+                future: asyncio.Future = loop.create_future()
+                self.pending[qid] = (question, future)
+                try:
+                    transport = await self._endpoint(server)
+                    transport.sendto(message)
+                    self.counter_queries.add()
+                    data: bytes = await asyncio.wait_for(future, self.config["TIMEOUT"])
+                    if parse_response(data).truncated:
+                        self.counter_truncated.add()
+                        data = await asyncio.wait_for(
+                            self._query_tcp(server, message), self.config["TIMEOUT"]
+                        )
+                    response: Response = parse_response(data)
+                    if response.id != qid:
+                        raise ValueError("Mismatched DNS response")
+                except (asyncio.TimeoutError, OSError, ValueError) as exc:
+                    self.counter_failures.add()
+                    self.logger.debug(
+                        "DNS query of [%s] to [%s:%s] failed: %r", host, *server, exc
+                    )
+                    continue
+                finally:
+                    self.pending.pop(qid, None)
+
+                if response.rcode == RCODE_NXDOMAIN:
+                    raise socket.gaierror(
+                        socket.EAI_NONAME, "Name or service not known"
+                    )
+                if response.rcode:
+                    # SERVFAIL, REFUSED...: ask the next server
+                    continue
+                return response
+
+        raise socket.gaierror(socket.EAI_AGAIN, "Temporary failure in name resolution")
+
+    def response_received(self, data: bytes) -> None:
+        """
+        Match a response with its query by ID and question; the others are
+        dropped
+        :param data:
+        :type data: bytes
+        :return:
+        :rtype: None
+        """
+        if len(data) < HEADER.size:
+            return
+        qid, flags = struct.unpack_from("!HH", data)
+        try:
+            question, future = self.pending[qid]
+        except KeyError:
+            return
+        end: int = HEADER.size + len(question)
+        if (
+            not flags & FLAG_QR
+            or data[HEADER.size : end].lower() != question
+            or future.done()
+        ):
+            return
+        future.set_result(data)
+
+    def _new_id(self) -> int:
+        """
+        A random ID not used by the queries in flight
+        :return:
+        :rtype: int
+        """
+        while (qid := secrets.randbits(16)) in self.pending:
+            pass
+        return qid
+
+    async def _endpoint(self, server: Tuple[str, int]) -> asyncio.DatagramTransport:
+        """
+        Get the UDP endpoint connected to a server
+        :param server:
+        :type server: Tuple[str, int]
+        :return:
+        :rtype: asyncio.DatagramTransport
+        """
+        task: Optional[asyncio.Task] = self.endpoints.get(server)
+        if task is None or (task.done() and (task.cancelled() or task.exception())):
+            task = self.endpoints[server] = get_event_loop().create_task(
+                get_event_loop().create_datagram_endpoint(
+                    lambda: DNSProtocol(self), remote_addr=server
+                )
+            )
+        transport, _ = await asyncio.shield(task)
+        return transport
+
+    @staticmethod
+    async def _query_tcp(server: Tuple[str, int], message: bytes) -> bytes:
+        """
+        Send a query over TCP, with the length of the message before it
+        :param server:
+        :type server: Tuple[str, int]
+        :param message:
+        :type message: bytes
+        :return:
+        :rtype: bytes
+        """
+        reader, writer = await asyncio.open_connection(*server)
+        try:
+            writer.write(struct.pack("!H", len(message)) + message)
+            length: int = struct.unpack("!H", await reader.readexactly(2))[0]
+            return await reader.readexactly(length)
+        finally:
+            writer.close()
@@ -0,0 +1,37 @@
+"""
+The resolver of the system
+"""
+from __future__ import annotations
+
+import socket
+from asyncio.events import get_event_loop
+from typing import List, Tuple
+
+from bifrost.resolvers.base import Answer, BaseResolver
+
+
+class SystemResolver(BaseResolver):
+    """
+    Look up the names with getaddrinfo in the default executor of the loop
+    """
+
+    name: str = "SystemResolver"
+    setting_prefix: str = "RESOLVER_SYSTEM_"
+
+    async def lookup(self, host: str) -> Answer:
+        """
+        getaddrinfo tells nothing about the time to live
+        :param host:
+        :type host: str
+        :return:
+        :rtype: Answer
+        """
+        infos = await get_event_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+
+        # keep the order of getaddrinfo, without the duplicates
+        addresses: List[Tuple[int, str]] = list(
+            dict.fromkeys(
+                (family, str(sockaddr[0])) for family, _, _, _, sockaddr in infos
+            )
+        )
+        return Answer(addresses, None)
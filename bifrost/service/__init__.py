@@ -2,5 +2,6 @@
 Service module
 """
 from bifrost.service.bifrost import Bifrost
+from bifrost.service.supervisor import Supervisor
 
-__all__ = ["Bifrost"]
+__all__ = ["Bifrost", "Supervisor"]
@@ -20,11 +20,14 @@ if TYPE_CHECKING:
     from bifrost.channels import Channel
     from bifrost.extensions import ExtensionManager
     from bifrost.middlewares import MiddlewareManager
+    from bifrost.resolvers import BaseResolver
     from bifrost.settings import Settings
     from bifrost.signals import SignalManager
 
 
-class Bifrost(LoggerMixin, StatsMixin, metaclass=SingletonMeta):
+class Bifrost(  # pylint: disable=too-many-instance-attributes
+    LoggerMixin, StatsMixin, metaclass=SingletonMeta
+):
     """
     The abstract class of Service
     """
@@ -64,8 +67,14 @@ class Bifrost(LoggerMixin, StatsMixin, metaclass=SingletonMeta):
             settings["CLS_MIDDLEWARE_MANAGER"]
         ).from_service(self)
 
+        self.resolver: BaseResolver = load_object(
+            settings["CLS_RESOLVER"]
+        ).from_service(self)
+
         self.channels: Dict[str, Channel] = self._get_channels()
 
+        self.stopping: bool = False
+
     @classmethod
     def from_settings(cls, settings: Settings) -> Bifrost:
         """
@@ -118,16 +127,25 @@ class Bifrost(LoggerMixin, StatsMixin, metaclass=SingletonMeta):
             )
 
     async def _stop(self, signal=None):  # pylint: disable=unused-argument
+        # a worker may receive the same signal from the terminal and from the
+        # supervisor
+        if self.stopping:
+            return
+        self.stopping = True
+
         self.signal_manager.send(service_stopped, sender=self)
 
         await asyncio.sleep(1)
 
+        # the resolver closes its endpoints while its queries are still tracked
+        await self.resolver.stop()
+
         tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
 
         for task in tasks:
             task.cancel()
 
-        await asyncio.gather(*tasks)
+        await asyncio.gather(*tasks, return_exceptions=True)
 
         self.loop.stop()
 
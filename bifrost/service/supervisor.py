@@ -0,0 +1,179 @@
+"""
+The supervisor of Bifrost workers
+
+With WORKERS greater than 1, the supervisor forks the workers before any event
+loop is created. Every worker runs its own service, and its channels bind the
+interfaces with SO_REUSEPORT, so the kernel spreads the connections across the
+workers. The supervisor restarts the crashed workers and forwards the stop
+signals to all of them.
+"""
+from __future__ import annotations
+
+import os
+import signal
+import time
+from typing import TYPE_CHECKING, Dict
+
+from bifrost.base import LoggerMixin
+from bifrost.utils.misc import load_object
+
+if TYPE_CHECKING:
+    from bifrost.settings import Settings
+
+SIGNALS = (signal.SIGHUP, signal.SIGQUIT, signal.SIGTERM, signal.SIGINT)
+
+
+class Supervisor(LoggerMixin):
+    """
+    Fork, watch and stop the workers
+    """
+
+    def __init__(self, settings: Settings):
+        """
+
+        :param settings:
+        :type settings: Settings
+        """
+        self.settings: Settings = settings
+
+        # worker id by pid
+        self.workers: Dict[int, int] = {}
+        self.stopping: bool = False
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Supervisor:
+        """
+
+        :param settings:
+        :type settings: Settings
+        :return:
+        :rtype: Supervisor
+        """
+        obj = cls(settings)
+        return obj
+
+    def start(self) -> None:
+        """
+        Run the service in this process with one worker, or fork the workers
+        and watch them until all of them are stopped
+        :return:
+        :rtype: None
+        """
+        if self.settings["WORKERS"] <= 1:
+            self._run()
+            return
+
+        for sig in SIGNALS:
+            signal.signal(sig, self._handle_signal)
+
+        for worker_id in range(self.settings["WORKERS"]):
+            self._spawn(worker_id)
+
+        self._supervise()
+
+        self.logger.info("All workers are stopped.")
+
+    def stop(self, sig: int = signal.SIGTERM) -> None:
+        """
+        Forward the signal to all workers for a coordinated shutdown
+        :param sig:
+        :type sig: int
+        :return:
+        :rtype: None
+        """
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def _handle_signal(self, sig, frame) -> None:  # pylint: disable=unused-argument
+        """
+
+        :param sig:
+        :param frame:
+        :return:
+        :rtype: None
+        """
+        self.logger.info("Received signal [%s], stopping workers...", sig)
+        self.stop(sig)
+
+    def _run(self) -> None:
+        """
+        Run the service in this process
+        :return:
+        :rtype: None
+        """
+        load_object(self.settings["CLS_SERVICE"]).from_settings(self.settings).start()
+
+    def _spawn(self, worker_id: int) -> None:
+        """
+        Fork a worker with the given id
+        :param worker_id:
+        :type worker_id: int
+        :return:
+        :rtype: None
+        """
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = worker_id
+            self.logger.info("Worker [%s] is started with pid [%s]", worker_id, pid)
+            return
+
+        # in the worker: never return to the loop of the supervisor
+        code = 0
+        try:
+            for sig in SIGNALS:
+                signal.signal(sig, signal.SIG_DFL)
+
+            with self.settings.unfreeze(priority="cmd") as settings:
+                settings["WORKER_ID"] = worker_id
+
+            self._run()
+        except BaseException as exc:  # pylint: disable=broad-except
+            self.logger.exception(exc)
+            code = 1
+        finally:
+            os._exit(code)  # pylint: disable=protected-access
+
+    def _supervise(self) -> None:
+        """
+        Wait for the workers to exit, and restart the crashed ones unless the
+        supervisor is stopping
+        :return:
+        :rtype: None
+        """
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+            worker_id = self.workers.pop(pid, None)
+            if worker_id is None:
+                continue
+
+            crashed: bool
+            if os.WIFSIGNALED(status):
+                crashed = os.WTERMSIG(status) not in SIGNALS
+                self.logger.info(
+                    "Worker [%s] is killed by signal [%s]",
+                    worker_id,
+                    os.WTERMSIG(status),
+                )
+            else:
+                crashed = os.WEXITSTATUS(status) != 0
+                self.logger.info(
+                    "Worker [%s] exited with code [%s]",
+                    worker_id,
+                    os.WEXITSTATUS(status),
+                )
+
+            if crashed and not self.stopping:
+                time.sleep(self.settings["WORKER_RESTART_DELAY"])
+                if not self.stopping:
+                    self._spawn(worker_id)
+
+
+__all__ = ["Supervisor"]
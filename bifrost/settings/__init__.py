@@ -1,5 +1,12 @@
 """
 Define Settings class
+
+Once frozen, the settings are read through a snapshot: a flat read-only mapping
+of the values, built at the first read and kept until the next mutation. The
+views of the settings with a prefix, used by the components to get their
+configuration, are indexed in the snapshot too, so a prefix is looked up once
+instead of scanning all settings every time. Unfreezing the settings drops the
+snapshot and its views, and they are built again from the new values.
 """
 from __future__ import annotations
 
@@ -8,8 +15,8 @@ from collections import namedtuple
 from collections.abc import Mapping, MutableMapping
 from contextlib import contextmanager
 from importlib import import_module
-from types import ModuleType
-from typing import Any, Dict, Generator, Union
+from types import MappingProxyType, ModuleType
+from typing import Any, Dict, Generator, Optional, Union
 
 from bifrost.exceptions.settings import (
     SettingsFrozenException,
@@ -61,6 +68,11 @@ class BaseSettings(MutableMapping):
         self._data: Dict[str, Setting] = {}
         self._frozen: bool = False
         self._priority = priority
+
+        self._snapshot: Optional[Dict[str, Any]] = None
+        # the views with prefixes in the snapshot, by prefix
+        self._prefixes: Dict[str, Mapping[str, Any]] = {}
+
         if settings:
             self.update(settings)
 
@@ -83,12 +95,69 @@ class BaseSettings(MutableMapping):
         _priority, self._priority = self._priority, priority
         status: bool
         status, self._frozen = self._frozen, False
+        self._invalidate()
         try:
             yield self
         finally:
             self._priority = _priority
             self._frozen = status
 
+    def _invalidate(self) -> None:
+        """
+        Drop the snapshot and its views
+        :return:
+        :rtype: None
+        """
+        self._snapshot = None
+        self._prefixes = {}
+
+    def _compile(self) -> Dict[str, Any]:
+        """
+        Get the flat mapping of the values, cached only while frozen
+        :return:
+        :rtype: Dict[str, Any]
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = {key: setting.value for key, setting in self._data.items()}
+            if self._frozen:
+                self._snapshot = snapshot
+        return snapshot
+
+    def snapshot(self) -> Mapping[str, Any]:
+        """
+        Get a read-only mapping of all values
+        :return:
+        :rtype: Mapping[str, Any]
+        """
+        return MappingProxyType(self._compile())
+
+    def prefixed(self, prefix: str) -> Mapping[str, Any]:
+        """
+        Get a read-only mapping of the values with the given prefix, keyed
+        without the prefix
+        :param prefix:
+        :type prefix: str
+        :return:
+        :rtype: Mapping[str, Any]
+        """
+        try:
+            return self._prefixes[prefix]
+        except KeyError:
+            pass
+
+        size: int = len(prefix)
+        view: Mapping[str, Any] = MappingProxyType(
+            {
+                key[size:]: value
+                for key, value in self._compile().items()
+                if key.startswith(prefix)
+            }
+        )
+        if self._frozen:
+            self._prefixes[prefix] = view
+        return view
+
     def update(  # pylint: disable = arguments-differ
         self, m: Mapping = None, **kwargs
     ) -> None:
@@ -119,7 +188,12 @@ class BaseSettings(MutableMapping):
         :return:
         :rtype: Any
         """
-        return self._data[k].value
+        snapshot = self._snapshot
+        if snapshot is None:
+            if not self._frozen:
+                return self._data[k].value
+            snapshot = self._compile()
+        return snapshot[k]
 
     @frozen_check
     def __setitem__(self, k: str, v: Any) -> None:
@@ -141,6 +215,7 @@ class BaseSettings(MutableMapping):
                 raise SettingsLowPriorityException
 
         self._data[k] = setting
+        self._invalidate()
 
     @frozen_check
     def __delitem__(self, k: str) -> None:
@@ -152,6 +227,7 @@ class BaseSettings(MutableMapping):
         :rtype: None
         """
         del self._data[k]
+        self._invalidate()
 
     def __iter__(self):
         """
@@ -2,7 +2,7 @@
 Default settings
 """
 import logging
-from typing import Dict, Optional, Union
+from typing import Any, Dict, List, Optional
 
 # ==== LOG CONFIGURATION ======================================================
 
@@ -13,20 +13,46 @@ LOG_FORMATTER_DATEFMT = "%Y-%m-%d %H:%M:%S"
 # ==== CORE MODULES ===========================================================
 
 CLS_SERVICE = "bifrost.service.bifrost.Bifrost"
+CLS_SUPERVISOR = "bifrost.service.supervisor.Supervisor"
 
 CLS_SIGNAL_MANAGER = "bifrost.signals.SignalManager"
+# The names of the signals dispatched once per loop iteration with the keyword
+# arguments aggregated, e.g. ["data_sent", "data_received"]
+SIGNAL_MANAGER_COALESCE: List[str] = []
 
 CLS_EXTENSION_MANAGER = "bifrost.extensions.ExtensionManager"
 CLS_MIDDLEWARE_MANAGER = "bifrost.middlewares.MiddlewareManager"
 
 CLS_CHANNEL = "bifrost.channels.channel.Channel"
 
+CLS_RESOLVER = "bifrost.resolvers.CachingResolver"
+
 LOOP = "uvloop"
 
+# ==== WORKERS ================================================================
+
+# With more than one worker, the supervisor forks the workers and every worker
+# binds the channels with SO_REUSEPORT
+WORKERS = 1
+# Set by the supervisor in every worker
+WORKER_ID = 0
+WORKER_RESTART_DELAY = 1  # in seconds
+
+# The extensions listening on a fixed address only run in the singleton worker
+SINGLETON_EXTENSIONS = ["bifrost.extensions.RPC", "bifrost.extensions.Web"]
+SINGLETON_WORKER = 0
+
 # ==== Extensions =============================================================
 
 LOGSTATS_INTERVAL = 60  # in seconds
 
+# LoopMonitor samples the lag of the loop every INTERVAL seconds, and captures
+# the stack of a callback blocking the loop for SLOW_CALLBACK seconds; the last
+# SLOW_CALLBACKS of them are kept
+LOOP_MONITOR_INTERVAL = 0.1
+LOOP_MONITOR_SLOW_CALLBACK = 0.1
+LOOP_MONITOR_SLOW_CALLBACKS = 32
+
 MAIL_SERVER: Optional[str] = None
 MAIL_PORT: Optional[int] = None
 MAIL_USERNAME: Optional[str] = None
@@ -36,16 +62,39 @@ MAIL_TO: Optional[str] = None
 MAIL_SUBJECT: Optional[str] = None
 MAIL_CONTENT: Optional[str] = None
 
+# A target failing with a REP code of REPLIES (network or host unreachable,
+# connection refused, TTL expired) is replied at once for TTL seconds, doubled
+# with every failure in a row up to MAX_TTL
+NEGATIVE_CACHE_SIZE = 4096  # the number of targets
+NEGATIVE_CACHE_TTL = 5
+NEGATIVE_CACHE_MAX_TTL = 300
+NEGATIVE_CACHE_REPLIES = [0x03, 0x04, 0x05, 0x06]
+
 RPC_ADDRESS = "127.0.0.1:50051"
 RPC_SERVER_CREDENTIALS_PRIVATE_KEYS: Optional[str] = None
 RPC_SERVER_CREDENTIALS_CERTIFICATES: Optional[str] = None
 RPC_SERVER_CREDENTIALS_CLIENT_AUTH: bool = False
 RPC_STOP_GRACE: Optional[float] = None
 
+# The segments of SharedMemoryStats are named "<STATS_SHM_NAME>.<WORKER_ID>"; a
+# slot takes STATS_SHM_KEY_SIZE (a multiple of 8) + 8 bytes
+STATS_SHM_NAME = "bifrost_stats"
+STATS_SHM_SLOTS = 1024
+STATS_SHM_KEY_SIZE = 120
+
 WEB_ADDRESS = "127.0.0.1"
 WEB_PORT = 8000
 WEB_DEBUG = False
 
+# /metrics: the keys of the counters going up and down, exposed as gauges, and
+# the seconds a scrape is cached for
+WEB_METRICS_GAUGES: List[str] = ["admission/*/active", "flow/buffered"]
+WEB_METRICS_CACHE = 1
+
+# /connections: the connections listed in a page by default and at most
+WEB_CONNECTIONS_LIMIT = 1000
+WEB_CONNECTIONS_LIMIT_MAX = 100000
+
 # Refer to:
 # https://docs.python.org/3/library/ssl.html#ssl.create_default_context
 # https://docs.python.org/3/library/ssl.html#ssl.SSLContext.load_cert_chain
@@ -55,12 +104,22 @@ WEB_SSL_PASSWORD = None
 
 # ==== MODE ===================================================================
 
-MIDDLEWARES: Dict[str, int] = {}
+# The middlewares are called in the order of their priorities before the hooks
+# of protocols; a hook without any middleware runs without any overhead
+MIDDLEWARES: Dict[str, int] = {
+    "bifrost.middlewares.SignalsMiddleware": 0,
+    "bifrost.middlewares.StatsMiddleware": 10,
+    "bifrost.middlewares.LogMiddleware": 20,
+    # "bifrost.middlewares.RegistryMiddleware": 30,  # to inspect the connections
+}
 
 EXTENSIONS: Dict[str, int] = {
     "bifrost.extensions.LogStats": 0,
+    # "bifrost.extensions.LoopMonitor": 0,  # to diagnose the loop
     "bifrost.extensions.Mail": 0,
+    "bifrost.extensions.NegativeCache": 0,
     "bifrost.extensions.RPC": 0,
+    # "bifrost.extensions.SharedMemoryStats": 0,  # to share the counters
     "bifrost.extensions.Stats": 0,
     "bifrost.extensions.Web": 0,
 }
@@ -75,7 +134,7 @@ EXTENSIONS: Dict[str, int] = {
                (BIFROST CLIENT)              (BIFROST SERVER)
 """
 
-CHANNELS: Dict[str, Dict[str, Optional[Union[str, int]]]] = {
+CHANNELS: Dict[str, Dict[str, Any]] = {
     # "client": {  # MODE: CLIENT
     #     "INTERFACE_PROTOCOL": "bifrost.protocols.Interface",
     #     "INTERFACE_ADDRESS": "127.0.0.1",
@@ -86,6 +145,12 @@ CHANNELS: Dict[str, Dict[str, Optional[Union[str, int]]]] = {
     #     "CLIENT_SSL_CERT_FILE": None,
     #     "CLIENT_SSL_KEY_FILE": None,
     #     "CLIENT_SSL_PASSWORD": None,
+    #     "INTERFACE_WRITE_BUFFER_HIGH": None,
+    #     "INTERFACE_WRITE_BUFFER_LOW": None,
+    #     "CLIENT_WRITE_BUFFER_HIGH": None,
+    #     "CLIENT_WRITE_BUFFER_LOW": None,
+    #     "IDLE_TIMEOUT": 300,
+    #     "LIFETIME_TIMEOUT": None,
     # },
     "server": {  # MODE: SERVER
         "INTERFACE_PROTOCOL": "bifrost.protocols.Socks5Protocol",
@@ -95,9 +160,56 @@ CHANNELS: Dict[str, Dict[str, Optional[Union[str, int]]]] = {
         "INTERFACE_SSL_KEY_FILE": None,
         "INTERFACE_SSL_PASSWORD": None,
         "CLIENT_PROTOCOL": "bifrost.protocols.Client",
+        # The protocol relaying the data once the handshake is done; None to
+        # keep the interface and client protocols
+        "RELAY_PROTOCOL": "bifrost.protocols.Relay",
+        # Flow control: when the write buffer of one side goes over the high
+        # watermark, the other side stops reading until it drains below the low
+        # watermark; None for the defaults of the event loop
+        "INTERFACE_WRITE_BUFFER_HIGH": None,
+        "INTERFACE_WRITE_BUFFER_LOW": None,
+        "CLIENT_WRITE_BUFFER_HIGH": None,
+        "CLIENT_WRITE_BUFFER_LOW": None,
+        # Outbound connections: the addresses of the target are raced with Happy
+        # Eyeballs (RFC 8305), starting the next attempt after the delay in
+        # seconds, and given up after the timeout in seconds (None to wait)
+        "HAPPY_EYEBALLS_DELAY": 0.25,
+        "CONNECT_TIMEOUT": 10,
+        # The connections are aborted when the handshake is not done, no data is
+        # received on either side, or they are open for the timeout in seconds;
+        # None to disable it
+        "HANDSHAKE_TIMEOUT": 10,
+        "IDLE_TIMEOUT": 300,
+        "LIFETIME_TIMEOUT": None,
+        # Admission: the pending connections in the backlog of the listening
+        # sockets; at MAX_CONNECTIONS open the channel stops accepting and the
+        # new connections wait in the backlog. The connections of a source over
+        # MAX_CONNECTIONS_PER_SOURCE are closed once accepted, a source being
+        # the network of the address with the prefix, or a network of
+        # SOURCE_LIMITS ({"10.0.0.0/8": 100}) limited as a whole. The accepts
+        # are paced to ACCEPT_RATE per second with bursts of ACCEPT_BURST. None
+        # to disable a limit
+        "BACKLOG": 100,
+        "MAX_CONNECTIONS": None,
+        "MAX_CONNECTIONS_PER_SOURCE": None,
+        "SOURCE_PREFIX_V4": 32,
+        "SOURCE_PREFIX_V6": 64,
+        "SOURCE_LIMITS": {},
+        "ACCEPT_RATE": None,
+        "ACCEPT_BURST": None,
     }
 }
 
+# The timeouts of all connections in a worker are checked by one timer wheel
+# ticking every RESOLUTION seconds, so a timeout fires up to one tick late
+TIMER_WHEEL_RESOLUTION = 1
+
+# The read buffer of the relay starts with BUFFER_SIZE, grows when a read fills
+# it and shrinks when reads keep using less than a quarter of it
+PROTOCOL_RELAY_BUFFER_SIZE = 64 * 1024
+PROTOCOL_RELAY_BUFFER_SIZE_MIN = 4 * 1024
+PROTOCOL_RELAY_BUFFER_SIZE_MAX = 1024 * 1024
+
 PROTOCOL_SOCKS5_AUTH_METHODS = {
     0x00: "bifrost.protocols.socks5.methods.NoAuth",  # NO AUTHENTICATION REQUIRED
     # 0x01: "bifrost.protocols.socks5.methods.GSSAPI",  # GSSAPI
@@ -119,3 +231,23 @@ PROTOCOL_SOCKS5_USERNAMEPASSWORD_USERS = {
 
 # PROTOCOL_SOCKS5_USERNAMEPASSWORD_SQLITE_URI = ":memory:"
 PROTOCOL_SOCKS5_USERNAMEPASSWORD_SQLITE_URI = "db.sqlite3"
+
+# ==== RESOLVERS ==============================================================
+
+# The resolver looking up the names missing in the cache: getaddrinfo in the
+# default executor, or DNS over UDP on the loop
+RESOLVER_CACHE_BACKEND = "bifrost.resolvers.SystemResolver"
+# RESOLVER_CACHE_BACKEND = "bifrost.resolvers.DNSResolver"
+RESOLVER_CACHE_SIZE = 4096  # the number of names
+# The time in seconds to keep an answer, or the time to live of the answer if
+# shorter; an expired answer is still served for STALE_TTL while it is looked up
+# again, and a failed lookup is kept for NEGATIVE_TTL
+RESOLVER_CACHE_TTL = 300
+RESOLVER_CACHE_STALE_TTL = 60
+RESOLVER_CACHE_NEGATIVE_TTL = 30
+
+# The servers as "host", "host:port" or "[ipv6]:port"; empty for the name servers
+# of /etc/resolv.conf
+RESOLVER_DNS_SERVERS: List[str] = []
+RESOLVER_DNS_TIMEOUT = 2  # in seconds, before sending a query to the next server
+RESOLVER_DNS_ATTEMPTS = 2  # the rounds over all servers
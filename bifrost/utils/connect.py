@@ -0,0 +1,268 @@
+"""
+Outbound connections with Happy Eyeballs
+
+The addresses of a host are tried in the order of RFC 8305: the families are
+interleaved, starting with the family of the first address, and a new attempt is
+started when the previous one fails or doesn't succeed within the delay, while
+the previous ones keep going. The first connected socket wins, and the other
+attempts are cancelled and their sockets closed.
+
+RFC 8305 - Happy Eyeballs Version 2: Better Connectivity Using Concurrency
+https://datatracker.ietf.org/doc/rfc8305/
+"""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import itertools
+import socket
+from asyncio import AbstractEventLoop, BaseProtocol, BaseTransport
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+
+if TYPE_CHECKING:
+    from bifrost.resolvers import BaseResolver
+
+# (family, type, proto, canonname, sockaddr) as returned by getaddrinfo
+AddrInfo = Tuple[int, int, int, str, tuple]
+
+HAPPY_EYEBALLS_DELAY = 0.25
+
+
+def interleave(infos: Sequence[AddrInfo]) -> List[AddrInfo]:
+    """
+    Interleave the addresses by family, starting with the family of the first
+    address and keeping the order inside every family
+
+    :param infos:
+    :type infos: Sequence[AddrInfo]
+    :return:
+    :rtype: List[AddrInfo]
+    """
+    families: Dict[int, List[AddrInfo]] = {}
+    for info in infos:
+        families.setdefault(info[0], []).append(info)
+
+    return [
+        info
+        for infos_ in itertools.zip_longest(*families.values())
+        for info in infos_
+        if info is not None
+    ]
+
+
+def literal(host: str, port: int) -> Optional[List[AddrInfo]]:
+    """
+    Get the address of a host given as an IP address without a lookup
+
+    :param host:
+    :type host: str
+    :param port:
+    :type port: int
+    :return: None if the host is not an IP address
+    :rtype: Optional[List[AddrInfo]]
+    """
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return None
+
+    family = socket.AF_INET6 if address.version == 6 else socket.AF_INET
+    return [(family, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (host, port))]
+
+
+async def resolve(
+    host: Union[str, bytes], port: int, loop: Optional[AbstractEventLoop] = None
+) -> List[AddrInfo]:
+    """
+    Get the addresses of a host with getaddrinfo; an IP address is returned as
+    it is without a lookup
+
+    :param host:
+    :type host: Union[str, bytes]
+    :param port:
+    :type port: int
+    :param loop:
+    :type loop: Optional[AbstractEventLoop]
+    :return:
+    :rtype: List[AddrInfo]
+    """
+    if isinstance(host, bytes):
+        host = host.decode("idna")
+
+    if (infos := literal(host, port)) is not None:
+        return infos
+
+    loop = loop or asyncio.get_running_loop()
+    return cast(
+        List[AddrInfo], await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    )
+
+
+async def _connect(loop: AbstractEventLoop, info: AddrInfo) -> socket.socket:
+    """
+    Connect a socket to an address, the socket is closed if it fails or is
+    cancelled
+
+    :param loop:
+    :type loop: AbstractEventLoop
+    :param info:
+    :type info: AddrInfo
+    :return:
+    :rtype: socket.socket
+    """
+    family, type_, proto, _, address = info
+    sock = socket.socket(family, type_, proto)
+    try:
+        sock.setblocking(False)
+        await loop.sock_connect(sock, address)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+async def connect_socket(
+    infos: Sequence[AddrInfo],
+    delay: Optional[float] = HAPPY_EYEBALLS_DELAY,
+    loop: Optional[AbstractEventLoop] = None,
+) -> socket.socket:
+    """
+    Race the connection attempts to the addresses, staggered by the delay
+
+    :param infos:
+    :type infos: Sequence[AddrInfo]
+    :param delay: the delay before the next attempt, None to try the addresses
+        one by one
+    :type delay: Optional[float]
+    :param loop:
+    :type loop: Optional[AbstractEventLoop]
+    :return: the first connected socket
+    :rtype: socket.socket
+    """
+    loop = loop or asyncio.get_running_loop()
+
+    queue = iter(interleave(infos))
+    pending: Set[asyncio.Task] = set()
+    errors: List[BaseException] = []
+    winner: Optional[socket.socket] = None
+
+    try:
+        while True:
+            info = next(queue, None)
+            if info is not None:
+                pending.add(loop.create_task(_connect(loop, info)))
+            if not pending:
+                break
+
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=delay if info is not None else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                if (exc := task.exception()) is not None:
+                    errors.append(exc)
+                elif winner is None:
+                    winner = task.result()
+                else:
+                    task.result().close()
+
+            if winner is not None:
+                return winner
+    finally:
+        for task in pending:
+            task.cancel()
+        # an attempt may connect before it is cancelled
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(result, socket.socket):
+                result.close()
+
+    raise _combine(errors)
+
+
+def _combine(errors: Sequence[BaseException]) -> BaseException:
+    """
+    The exception raised when all attempts failed
+
+    :param errors: the exceptions of the attempts
+    :type errors: Sequence[BaseException]
+    :return:
+    :rtype: BaseException
+    """
+    if not errors:
+        return OSError("No address to connect")
+    if len(errors) == 1 or len({str(exc) for exc in errors}) == 1:
+        return errors[0]
+    message = f"Multiple exceptions: {', '.join(str(exc) for exc in errors)}"
+    # the errno shared by all addresses, e.g. refused on both families, is kept
+    # to be replied and cached as it is
+    errnos = {getattr(exc, "errno", None) for exc in errors}
+    if len(errnos) == 1 and (errno := errnos.pop()) is not None:
+        return OSError(errno, message)
+    return OSError(message)
+
+
+async def create_connection(  # pylint: disable=too-many-arguments
+    protocol_factory: Callable[[], BaseProtocol],
+    host: Union[str, bytes],
+    port: int,
+    *,
+    delay: Optional[float] = HAPPY_EYEBALLS_DELAY,
+    timeout: Optional[float] = None,
+    loop: Optional[AbstractEventLoop] = None,
+    resolver: Optional[BaseResolver] = None,
+    resolved: Optional[Callable[[], None]] = None,
+    **kwargs,
+) -> Tuple[BaseTransport, BaseProtocol]:
+    """
+    Like loop.create_connection, but the addresses of the host are raced with
+    Happy Eyeballs, and the lookup and the connection are given up after the
+    timeout
+
+    :param protocol_factory:
+    :type protocol_factory: Callable[[], BaseProtocol]
+    :param host:
+    :type host: Union[str, bytes]
+    :param port:
+    :type port: int
+    :param delay:
+    :type delay: Optional[float]
+    :param timeout: None to wait until the attempts fail
+    :type timeout: Optional[float]
+    :param loop:
+    :type loop: Optional[AbstractEventLoop]
+    :param resolver: the resolver of the host, getaddrinfo if None
+    :type resolver: Optional[BaseResolver]
+    :param resolved: called when the host is looked up, e.g. to time the lookup
+    :type resolved: Optional[Callable[[], None]]
+    :param kwargs: the other arguments of loop.create_connection
+    :return:
+    :rtype: Tuple[BaseTransport, BaseProtocol]
+    """
+    loop = loop or asyncio.get_running_loop()
+
+    async def connect() -> socket.socket:
+        infos: List[AddrInfo] = await (
+            resolver.resolve(host, port) if resolver else resolve(host, port, loop)
+        )
+        if resolved is not None:
+            resolved()
+        return await connect_socket(infos, delay, loop)
+
+    sock = await asyncio.wait_for(connect(), timeout)
+    try:
+        return await loop.create_connection(protocol_factory, sock=sock, **kwargs)
+    except BaseException:
+        sock.close()
+        raise
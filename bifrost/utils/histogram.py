@@ -0,0 +1,138 @@
+"""
+Log-bucketed histogram of durations
+
+The durations are counted in microseconds in a fixed list of buckets: the
+values under 2 ** SUB_BITS microseconds have a bucket each, and every power of
+two above is split in 2 ** (SUB_BITS - 1) buckets, so a value is known within
+1 / 2 ** (SUB_BITS - 1) of itself, about 6%. An observation finds its bucket with
+bit_length in O(1), and the memory does not grow with the observations.
+
+HdrHistogram (Gil Tene)
+http://hdrhistogram.org/
+"""
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+SUB_BITS = 5
+SUB_BUCKETS = 1 << (SUB_BITS - 1)
+
+# the durations over 2 ** MAX_BITS microseconds, about 3 days, are counted in
+# the last bucket
+MAX_BITS = 38
+
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def bucket_index(value: int) -> int:
+    """
+    The bucket of a value in microseconds
+    :param value:
+    :type value: int
+    :return:
+    :rtype: int
+    """
+    if value < 1 << SUB_BITS:
+        return value
+    shift = value.bit_length() - SUB_BITS
+    return shift * SUB_BUCKETS + (value >> shift)
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """
+    The lowest and highest values in microseconds of a bucket
+    :param index:
+    :type index: int
+    :return:
+    :rtype: Tuple[int, int]
+    """
+    if index < 1 << SUB_BITS:
+        return index, index
+    shift = index // SUB_BUCKETS - 1
+    lowest = (index - shift * SUB_BUCKETS) << shift
+    return lowest, lowest + (1 << shift) - 1
+
+
+class Histogram:
+    """
+    The durations observed, in log buckets
+    """
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    size: int = bucket_index((1 << MAX_BITS) - 1) + 1
+
+    def __init__(self):
+        self.buckets = [0] * self.size
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Count a duration
+        :param value: in seconds
+        :type value: float
+        :return:
+        :rtype: None
+        """
+        index = bucket_index(int(value * 1_000_000)) if value > 0 else 0
+        self.buckets[index if index < self.size else -1] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        The duration under which the fraction of the observations fall, the
+        middle of its bucket
+        :param fraction: e.g. 0.99
+        :type fraction: float
+        :return: in seconds, None without any observation
+        :rtype: Optional[float]
+        """
+        if not self.count:
+            return None
+        rank = max(1, round(fraction * self.count))
+        if rank >= self.count:
+            return self.max
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                lowest, highest = bucket_bounds(index)
+                return min((lowest + highest) / 2_000_000, self.max)
+        return self.max
+
+    def cumulative(self) -> Iterator[Tuple[float, int]]:
+        """
+        The upper bound in seconds of every bucket observed, with the number of
+        the observations up to it
+        :return:
+        :rtype: Iterator[Tuple[float, int]]
+        """
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            if count:
+                seen += count
+                yield (bucket_bounds(index)[1] + 1) / 1_000_000, seen
+
+    def summary(
+        self, percentiles: Sequence[float] = PERCENTILES
+    ) -> Dict[str, Optional[float]]:
+        """
+        The count, the mean, the percentiles and the max, in seconds
+        :param percentiles:
+        :type percentiles: Sequence[float]
+        :return:
+        :rtype: Dict[str, Optional[float]]
+        """
+        summary: Dict[str, Optional[float]] = {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+        }
+        for fraction in percentiles:
+            summary[f"p{fraction * 100:g}"] = self.percentile(fraction)
+        summary["max"] = self.max if self.count else None
+        return summary
+
+
+__all__ = ["Histogram"]
@@ -0,0 +1,305 @@
+"""
+Prometheus text exposition of Stats
+
+Every counter of Stats is a series "bifrost_<key>_total", or "bifrost_<key>" if
+its key matches one of the gauge patterns, e.g. the connections open or the
+bytes buffered; the other numbers kept by Stats are untyped series, and every
+histogram is a series "bifrost_<key>_seconds" with the buckets of BUCKETS. The
+characters of the keys not allowed in a metric name are replaced with "_".
+
+The keys of a channel, e.g. "flow/<channel>/paused", are matched by LABELS and
+exposed as one metric of all channels with the parts varying as labels, e.g.
+bifrost_flow_paused_total{channel="<channel>"}, so they can be aggregated and
+queried by channel. The series of a metric are rendered together after its
+TYPE line.
+
+A scrape must not stall the loop relaying the data, so the rendering is cached:
+
+* the text of every series is kept with the value, or the count of a histogram,
+  it was rendered with, and rendered again only when it changed
+* the series are rendered in batches of BATCH, yielding to the loop in between
+* the body is kept for the cache time, and returned as it is to the scrapes in
+  that time
+
+Exposition formats
+https://prometheus.io/docs/instrumenting/exposition_formats/
+"""
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import math
+import re
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Pattern, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from bifrost.extensions import Stats
+    from bifrost.utils.histogram import Histogram
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+NAMESPACE = "bifrost"
+
+# the upper bounds in seconds of the buckets of every histogram, fixed for the
+# series to be aggregated over time
+BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+
+# the series rendered between two yields to the loop
+BATCH = 500
+
+# the keys holding labels, with the key of their metric formatted with the named
+# groups; the other named groups are the labels
+LABELS: Tuple[Tuple[Pattern[str], str], ...] = tuple(
+    (re.compile(pattern), key)
+    for pattern, key in (
+        (
+            r"data/(?P<channel>[^/]+)/(?P<direction>sent|received)",
+            "channel/data/{direction}",
+        ),
+        (r"flow/(?P<channel>[^/]+)/(?P<event>paused|resumed)", "flow/{event}"),
+        (r"connect/(?P<channel>[^/]+)/(?P<family>ipv4|ipv6)", "connect/wins"),
+        (r"connect/(?P<channel>[^/]+)/(?P<metric>[^/]+)", "connect/{metric}"),
+        (r"admission/(?P<channel>[^/]+)/(?P<metric>[^/]+)", "admission/{metric}"),
+        (r"timeouts/(?P<channel>[^/]+)/(?P<timeout>[^/]+)", "timeouts"),
+        (r"connections/(?P<channel>[^/]+)/(?P<protocol>[^/]+)", "connections"),
+        (r"socks5/(?P<channel>[^/]+)/replies/(?P<reply>[^/]+)", "socks5/replies"),
+        (r"handshake/(?P<channel>[^/]+)/(?P<phase>[^/]+)", "handshake"),
+    )
+)
+
+_INVALID = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def metric_name(key: str, suffix: str = "") -> str:
+    """
+    The name of the metric of a key of Stats
+    :param key:
+    :type key: str
+    :param suffix:
+    :type suffix: str
+    :return:
+    :rtype: str
+    """
+    return f"{NAMESPACE}_{_INVALID.sub('_', key)}{suffix}"
+
+
+def split_key(key: str) -> Tuple[str, Dict[str, str]]:
+    """
+    The key of the metric of a key of Stats, and its labels
+    :param key:
+    :type key: str
+    :return:
+    :rtype: Tuple[str, Dict[str, str]]
+    """
+    for pattern, metric in LABELS:
+        if (match := pattern.fullmatch(key)) is not None:
+            groups: Dict[str, str] = match.groupdict()
+            return (
+                metric.format(**groups),
+                {
+                    label: value
+                    for label, value in groups.items()
+                    if f"{{{label}}}" not in metric
+                },
+            )
+    return key, {}
+
+
+def render_labels(labels: Dict[str, str], **extra: str) -> str:
+    """
+    The labels of a series, with the backslashes, the double quotes and the
+    line feeds of the values escaped
+    :param labels:
+    :type labels: Dict[str, str]
+    :param extra: the labels added, e.g. the bound of a bucket
+    :type extra: str
+    :return:
+    :rtype: str
+    """
+    pairs: List[str] = []
+    for label, value in dict(labels, **extra).items():
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{label}="{value}"')
+    return f"{{{','.join(pairs)}}}" if pairs else ""
+
+
+def render_value(name: str, labels: Dict[str, str], value: Any) -> bytes:
+    """
+    A series of a single value
+    :param name:
+    :type name: str
+    :param labels:
+    :type labels: Dict[str, str]
+    :param value:
+    :type value: Any
+    :return:
+    :rtype: bytes
+    """
+    return f"{name}{render_labels(labels)} {value}\n".encode()
+
+
+def render_histogram(name: str, labels: Dict[str, str], histogram: Histogram) -> bytes:
+    """
+    A series of a histogram, its log buckets summed up in BUCKETS; a log bucket
+    is counted in the first bucket holding all of it
+    :param name:
+    :type name: str
+    :param labels:
+    :type labels: Dict[str, str]
+    :param histogram:
+    :type histogram: Histogram
+    :return:
+    :rtype: bytes
+    """
+    lines: List[str] = []
+
+    cumulative = histogram.cumulative()
+    upper, seen = next(cumulative, (math.inf, 0))
+    count: int = 0
+    for bound in BUCKETS:
+        while upper <= bound:
+            count = seen
+            upper, seen = next(cumulative, (math.inf, seen))
+        lines.append(f"{name}_bucket{render_labels(labels, le=f'{bound:g}')} {count}")
+
+    lines.append(f"{name}_bucket{render_labels(labels, le='+Inf')} {histogram.count}")
+    lines.append(f"{name}_sum{render_labels(labels)} {histogram.total}")
+    lines.append(f"{name}_count{render_labels(labels)} {histogram.count}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+class Exposition:  # pylint: disable=too-few-public-methods
+    """
+    The cached text exposition of a Stats
+    """
+
+    def __init__(self, stats: Stats, gauges: Sequence[str] = (), cache: float = 0):
+        """
+
+        :param stats:
+        :type stats: Stats
+        :param gauges: the patterns of the keys of the counters going up and
+            down, in the syntax of fnmatch
+        :type gauges: Sequence[str]
+        :param cache: the seconds a body is kept
+        :type cache: float
+        """
+        self.stats: Stats = stats
+        self.gauges = re.compile(
+            "|".join(fnmatch.translate(pattern) for pattern in gauges) or "(?!)"
+        )
+        self.cache: float = cache
+
+        # the series by kind and key: the value it was rendered with, its
+        # metric and type, its labels and its text
+        self.series: Dict[
+            Tuple[str, str], Tuple[Any, str, str, Dict[str, str], bytes]
+        ] = {}
+        self.body: bytes = b""
+        self.rendered: float = -math.inf
+
+    async def render(self) -> bytes:
+        """
+        The body of a scrape
+        :return:
+        :rtype: bytes
+        """
+        if time.monotonic() - self.rendered < self.cache:
+            return self.body
+
+        # the keys may be added to Stats while yielding to the loop
+        items: List[Tuple[str, str, Any]] = [
+            ("counter", key, counter) for key, counter in self.stats.counters.items()
+        ]
+        items.extend(
+            ("untyped", key, value)
+            for key, value in self.stats.data.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        )
+        items.extend(
+            ("histogram", key, histogram)
+            for key, histogram in self.stats.histograms.items()
+        )
+
+        series: Dict[Tuple[str, str], Tuple[Any, str, str, Dict[str, str], bytes]] = {}
+        for index, (kind, key, item) in enumerate(items, 1):
+            version: Any
+            if kind == "counter":
+                version = item.value
+            elif kind == "histogram":
+                # a histogram only changes with its count
+                version = item.count
+            else:
+                version = item
+            cached = self.series.get((kind, key))
+            if cached is not None and cached[0] == version:
+                series[(kind, key)] = cached
+            else:
+                name, type_, labels = (
+                    self._metric(kind, key) if cached is None else cached[1:4]
+                )
+                text: bytes = (
+                    render_histogram(name, labels, item)
+                    if kind == "histogram"
+                    else render_value(name, labels, version)
+                )
+                series[(kind, key)] = (version, name, type_, labels, text)
+            if not index % BATCH:
+                await asyncio.sleep(0)
+
+        # the series of a metric are rendered together after its type
+        metrics: Dict[str, Tuple[str, List[bytes]]] = {}
+        for _, name, type_, _, text in series.values():
+            if (metric := metrics.get(name)) is None:
+                metric = metrics[name] = (type_, [])
+            metric[1].append(text)
+
+        self.series = series
+        self.body = b"".join(
+            f"# TYPE {name} {type_}\n".encode() + b"".join(texts)
+            for name, (type_, texts) in metrics.items()
+        )
+        self.rendered = time.monotonic()
+        return self.body
+
+    def _metric(self, kind: str, key: str) -> Tuple[str, str, Dict[str, str]]:
+        """
+        The metric of a series, its type and its labels
+        :param kind: counter, untyped or histogram
+        :type kind: str
+        :param key:
+        :type key: str
+        :return:
+        :rtype: Tuple[str, str, Dict[str, str]]
+        """
+        metric, labels = split_key(key)
+        if kind == "histogram":
+            return metric_name(metric, "_seconds"), kind, labels
+        if kind == "untyped":
+            return metric_name(metric), kind, labels
+        if self.gauges.match(key):
+            return metric_name(metric), "gauge", labels
+        return metric_name(metric, "_total"), kind, labels
+
+
+__all__ = ["CONTENT_TYPE", "Exposition"]
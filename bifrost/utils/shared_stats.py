@@ -0,0 +1,322 @@
+"""
+Counters in shared memory
+
+A segment holds a fixed number of slots, each with a key and a signed 64-bit
+counter, after a small header describing the layout:
+
++-------+---------+-------+----------+------+-----+----------------+---------+
+| MAGIC | VERSION | SLOTS | KEY_SIZE | USED | PAD |      KEYS      | VALUES  |
++-------+---------+-------+----------+------+-----+----------------+---------+
+|   8   |    4    |   4   |    4     |  4   |  8  | SLOTS*KEY_SIZE | SLOTS*8 |
++-------+---------+-------+----------+------+-----+----------------+---------+
+
+Only the process owning a segment writes to it, so no lock is needed: a key is
+written before USED is increased, and readers only look at the first USED
+slots.
+
+Every worker owns the segment named "<name>.<worker id>", and the counters of
+all workers are summed by reading their segments:
+
+    python -m bifrost.utils.shared_stats bifrost_stats --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import pprint
+import struct
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Optional, Set, cast
+
+MAGIC = b"BIFROST\x00"
+VERSION = 1
+
+HEADER = struct.Struct("=8sIIII8x")
+HEADER_SIZE = HEADER.size
+USED = struct.Struct("=I")
+USED_OFFSET = 20
+
+# the segments owned by this process
+_owned: Set[str] = set()
+
+
+def _buffer(shm: SharedMemory) -> memoryview:
+    """
+    The buffer of a segment, only released when it is closed
+    :param shm:
+    :type shm: SharedMemory
+    :return:
+    :rtype: memoryview
+    """
+    return cast(memoryview, shm.buf)
+
+
+class SharedCounter:
+    """
+    A handle of a counter in a segment, working like
+    bifrost.extensions.stats.Counter
+    """
+
+    __slots__ = ("values", "index")
+
+    def __init__(self, values: memoryview, index: int):
+        """
+
+        :param values:
+        :type values: memoryview
+        :param index:
+        :type index: int
+        """
+        self.values: memoryview = values
+        self.index: int = index
+
+    @property
+    def value(self) -> int:
+        """
+
+        :return:
+        :rtype: int
+        """
+        return self.values[self.index]
+
+    @value.setter
+    def value(self, value: int) -> None:
+        """
+
+        :param value:
+        :type value: int
+        :return:
+        :rtype: None
+        """
+        self.values[self.index] = value
+
+    def add(self, count: int = 1) -> None:
+        """
+
+        :param count:
+        :type count: int
+        :return:
+        :rtype: None
+        """
+        self.values[self.index] += count
+
+
+class SharedStatsSegment:
+    """
+    A segment of counters in shared memory
+    """
+
+    def __init__(self, shm: SharedMemory, slots: int, key_size: int):
+        """
+
+        :param shm:
+        :type shm: SharedMemory
+        :param slots:
+        :type slots: int
+        :param key_size:
+        :type key_size: int
+        """
+        self.shm: SharedMemory = shm
+        self.slots: int = slots
+        self.key_size: int = key_size
+
+        offset: int = HEADER_SIZE + slots * key_size
+        self.keys: memoryview = _buffer(shm)[HEADER_SIZE:offset]
+        self.values: memoryview = _buffer(shm)[offset : offset + slots * 8].cast("q")
+
+    @classmethod
+    def create(cls, name: str, slots: int, key_size: int) -> SharedStatsSegment:
+        """
+        Create a segment, or reuse the one left with the same layout by a
+        previous process of this worker; one of another layout is replaced
+        :param name:
+        :type name: str
+        :param slots:
+        :type slots: int
+        :param key_size:
+        :type key_size: int
+        :return:
+        :rtype: SharedStatsSegment
+        """
+        if key_size % 8:
+            raise ValueError("The key size must be a multiple of 8")
+
+        size: int = HEADER_SIZE + slots * (key_size + 8)
+        try:
+            shm = SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            shm = SharedMemory(name=name)
+            if shm.size < size or HEADER.unpack_from(_buffer(shm))[:4] != (
+                MAGIC,
+                VERSION,
+                slots,
+                key_size,
+            ):
+                # a segment of another layout can't be resized, it is replaced
+                shm.close()
+                shm.unlink()
+                shm = SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(
+            _buffer(shm), 0, MAGIC, VERSION, slots, key_size, cls._used(shm)
+        )
+        _owned.add(name)
+
+        return cls(shm, slots, key_size)
+
+    @classmethod
+    def attach(cls, name: str) -> SharedStatsSegment:
+        """
+        Attach to an existing segment for reading
+        :param name:
+        :type name: str
+        :return:
+        :rtype: SharedStatsSegment
+        """
+        shm = SharedMemory(name=name)
+        if name not in _owned:
+            # A reader must not remove the segment of a worker when it exits
+            resource_tracker.unregister(
+                shm._name,  # type: ignore  # pylint: disable=protected-access
+                "shared_memory",
+            )
+
+        magic, version, slots, key_size, _ = HEADER.unpack_from(_buffer(shm))
+        if magic != MAGIC or version != VERSION:
+            shm.close()
+            raise ValueError(f"The segment [{name}] is not a stats segment")
+
+        return cls(shm, slots, key_size)
+
+    @staticmethod
+    def _used(shm: SharedMemory) -> int:
+        return USED.unpack_from(_buffer(shm), USED_OFFSET)[0]
+
+    @property
+    def used(self) -> int:
+        """
+        The number of slots in use
+        :return:
+        :rtype: int
+        """
+        return self._used(self.shm)
+
+    def key(self, index: int) -> str:
+        """
+        Get the key of a slot
+        :param index:
+        :type index: int
+        :return:
+        :rtype: str
+        """
+        offset: int = index * self.key_size
+        return (
+            bytes(self.keys[offset : offset + self.key_size])
+            .rstrip(b"\x00")
+            .decode("utf-8")
+        )
+
+    def allocate(self, key: str, value: int = 0) -> Optional[int]:
+        """
+        Take the next slot for a key
+        :param key:
+        :type key: str
+        :param value:
+        :type value: int
+        :return: the index of the slot, or None if the key doesn't fit in
+        :rtype: Optional[int]
+        """
+        encoded: bytes = key.encode("utf-8")
+        index: int = self.used
+        if index >= self.slots or len(encoded) > self.key_size:
+            return None
+
+        offset: int = index * self.key_size
+        self.keys[offset : offset + self.key_size] = encoded.ljust(
+            self.key_size, b"\x00"
+        )
+        self.values[index] = value
+        # publish the slot after it is written
+        USED.pack_into(_buffer(self.shm), USED_OFFSET, index + 1)
+        return index
+
+    def items(self) -> Dict[str, int]:
+        """
+        Get all counters in this segment
+        :return:
+        :rtype: Dict[str, int]
+        """
+        return {self.key(index): self.values[index] for index in range(self.used)}
+
+    def counter(self, index: int) -> SharedCounter:
+        """
+        Get the handle of the counter in a slot
+        :param index:
+        :type index: int
+        :return:
+        :rtype: SharedCounter
+        """
+        return SharedCounter(self.values, index)
+
+    def close(self) -> None:
+        """
+        Detach from the segment, the handles of its counters are invalid then
+        :return:
+        :rtype: None
+        """
+        self.keys.release()
+        self.values.release()
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """
+        Remove the segment; it is still mapped until closed
+        :return:
+        :rtype: None
+        """
+        if self.shm.name in _owned:
+            self.shm.unlink()
+            _owned.discard(self.shm.name)
+
+
+def read_stats(name: str, workers: int = 1) -> Dict[str, int]:
+    """
+    Sum the counters of all workers; the missing segments are skipped
+    :param name:
+    :type name: str
+    :param workers:
+    :type workers: int
+    :return:
+    :rtype: Dict[str, int]
+    """
+    stats: Dict[str, int] = {}
+    for worker_id in range(workers):
+        try:
+            segment = SharedStatsSegment.attach(f"{name}.{worker_id}")
+        except FileNotFoundError:
+            continue
+        try:
+            for key, value in segment.items().items():
+                stats[key] = stats.get(key, 0) + value
+        finally:
+            segment.close()
+    return stats
+
+
+def main() -> None:
+    """
+    Print the counters summed across the workers
+    :return:
+    :rtype: None
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("name", help="the name of the segments, STATS_SHM_NAME")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="the number of workers, WORKERS"
+    )
+    args = parser.parse_args()
+
+    pprint.pprint(read_stats(args.name, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Hierarchical timer wheel
+
+The timers of all connections in a loop are kept in one wheel driven by one
+loop.call_at handle ticking every RESOLUTION seconds, instead of one handle per
+connection in the heap of the loop. Adding and cancelling a timer is O(1), and a
+tick only visits the timers in its slot: the first level has one slot per tick,
+and every next level has one slot per round of the previous level, whose timers
+are cascaded down when the round comes.
+
+A timer fires within one tick after its deadline, which is fine for the timeouts
+of connections, and the current tick is a cheap clock for them to touch.
+
+Hashed and Hierarchical Timing Wheels (Varghese & Lauck)
+http://www.cs.columbia.edu/~nahum/w6998/papers/sosp87-timing-wheels.pdf
+"""
+from __future__ import annotations
+
+import math
+import weakref
+from asyncio import AbstractEventLoop, TimerHandle
+from asyncio.events import get_event_loop
+from typing import Any, Callable, List, MutableMapping, Optional, Set
+
+TIMER_WHEEL_RESOLUTION = 1.0  # in seconds
+
+# the wheels by loop
+_WHEELS: MutableMapping[AbstractEventLoop, TimerWheel] = weakref.WeakKeyDictionary()
+
+
+class Timer:
+    """
+    A callback scheduled at a tick of a wheel
+    """
+
+    __slots__ = ("wheel", "deadline", "callback", "args", "slot")
+
+    def __init__(
+        self, wheel: TimerWheel, deadline: int, callback: Callable, args: tuple
+    ):
+        """
+
+        :param wheel:
+        :type wheel: TimerWheel
+        :param deadline: the tick to fire at
+        :type deadline: int
+        :param callback:
+        :type callback: Callable
+        :param args:
+        :type args: tuple
+        """
+        self.wheel: TimerWheel = wheel
+        self.deadline: int = deadline
+        self.callback: Callable = callback
+        self.args: tuple = args
+        # the slot keeping this timer, None once fired or cancelled
+        self.slot: Optional[Set[Timer]] = None
+
+    def cancel(self) -> None:
+        """
+        Remove this timer from its slot; a timer fired or cancelled is ignored
+        :return:
+        :rtype: None
+        """
+        if self.slot is not None:
+            self.slot.discard(self)
+            self.slot = None
+            self.wheel.size -= 1
+
+    def cancelled(self) -> bool:
+        """
+        Whether this timer is not pending anymore
+        :return:
+        :rtype: bool
+        """
+        return self.slot is None
+
+
+class TimerWheel:  # pylint: disable=too-many-instance-attributes
+    """
+    The levels of slots of the timers in a loop; it ticks only while there are
+    timers
+    """
+
+    def __init__(
+        self,
+        loop: AbstractEventLoop,
+        resolution: float = TIMER_WHEEL_RESOLUTION,
+        slots: int = 64,
+        levels: int = 4,
+    ):
+        """
+
+        :param loop:
+        :type loop: AbstractEventLoop
+        :param resolution: the seconds of a tick
+        :type resolution: float
+        :param slots: the slots of every level
+        :type slots: int
+        :param levels: the levels, the timers beyond the span of the last level
+            are kept in it and cascaded again until they are within its span
+        :type levels: int
+        """
+        self.loop: AbstractEventLoop = loop
+        self.resolution: float = resolution
+        self.slots: int = slots
+        self.wheels: List[List[Set[Timer]]] = [
+            [set() for _ in range(slots)] for _ in range(levels)
+        ]
+
+        self.origin: float = loop.time()
+        # the last tick processed
+        self.tick: int = 0
+        # the number of the pending timers
+        self.size: int = 0
+        self.handle: Optional[TimerHandle] = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def now(self) -> int:
+        """
+        The current tick; the ticks passed while there was no timer are skipped
+        :return:
+        :rtype: int
+        """
+        if self.handle is None:
+            self.tick = max(
+                self.tick, int((self.loop.time() - self.origin) / self.resolution)
+            )
+        return self.tick
+
+    def ticks(self, delay: float) -> int:
+        """
+        Convert a delay in seconds to ticks, at least one
+        :param delay:
+        :type delay: float
+        :return:
+        :rtype: int
+        """
+        return max(1, math.ceil(delay / self.resolution))
+
+    def call_later(self, delay: float, callback: Callable, *args: Any) -> Timer:
+        """
+        Schedule a callback after the delay in seconds, at the first tick not
+        before it
+        :param delay:
+        :type delay: float
+        :param callback:
+        :type callback: Callable
+        :param args:
+        :type args: Any
+        :return:
+        :rtype: Timer
+        """
+        deadline: int = math.ceil(
+            (self.loop.time() - self.origin + delay) / self.resolution
+        )
+        return self.call_at(deadline, callback, *args)
+
+    def call_at(self, deadline: int, callback: Callable, *args: Any) -> Timer:
+        """
+        Schedule a callback at a tick; a tick passed fires at the next tick
+        :param deadline:
+        :type deadline: int
+        :param callback:
+        :type callback: Callable
+        :param args:
+        :type args: Any
+        :return:
+        :rtype: Timer
+        """
+        if self.handle is None:
+            self.now()
+            self._schedule()
+        timer = Timer(self, max(deadline, self.tick + 1), callback, args)
+        self._insert(timer)
+        self.size += 1
+        return timer
+
+    def close(self) -> None:
+        """
+        Stop ticking and drop all timers
+        :return:
+        :rtype: None
+        """
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        for level in self.wheels:
+            for slot in level:
+                for timer in slot:
+                    timer.slot = None
+                slot.clear()
+        self.size = 0
+
+    def _insert(self, timer: Timer) -> None:
+        """
+        Put a timer in the lowest level whose span covers its deadline
+        :param timer:
+        :type timer: Timer
+        :return:
+        :rtype: None
+        """
+        remaining: int = timer.deadline - self.tick
+        span: int = self.slots
+        scale: int = 1
+        last: int = len(self.wheels) - 1
+        for index, level in enumerate(self.wheels):
+            if remaining < span or index == last:
+                slot = level[(timer.deadline // scale) % self.slots]
+                slot.add(timer)
+                timer.slot = slot
+                return
+            scale = span
+            span *= self.slots
+
+    def _schedule(self) -> None:
+        """
+
+        :return:
+        :rtype: None
+        """
+        self.handle = self.loop.call_at(
+            self.origin + (self.tick + 1) * self.resolution, self._run
+        )
+
+    def _run(self) -> None:
+        """
+        Process the ticks up to now, more than one if the loop was late
+        :return:
+        :rtype: None
+        """
+        now: int = int((self.loop.time() - self.origin) / self.resolution)
+        while self.tick < now and self.size:
+            self.tick += 1
+            self._advance()
+        self.tick = max(self.tick, now)
+
+        self.handle = None
+        if self.size:
+            self._schedule()
+
+    def _advance(self) -> None:
+        """
+        Cascade the slots of the upper levels whose round comes at this tick,
+        then fire the timers of the slot of this tick
+        :return:
+        :rtype: None
+        """
+        tick: int = self.tick
+        slots: int = self.slots
+
+        scale: int = slots ** (len(self.wheels) - 1)
+        for level in reversed(self.wheels[1:]):
+            if tick % scale == 0:
+                index: int = (tick // scale) % slots
+                timers, level[index] = level[index], set()
+                for timer in timers:
+                    self._insert(timer)
+            scale //= slots
+
+        index = tick % slots
+        timers, self.wheels[0][index] = self.wheels[0][index], set()
+        for timer in timers:
+            if timer.deadline > tick:
+                # a timer beyond the span of the last level
+                self._insert(timer)
+                continue
+            timer.slot = None
+            self.size -= 1
+            try:
+                timer.callback(*timer.args)
+            except Exception as exc:  # pylint: disable=broad-except
+                self.loop.call_exception_handler(
+                    {
+                        "message": "Exception in a callback of the timer wheel",
+                        "exception": exc,
+                    }
+                )
+
+
+def get_timer_wheel(
+    loop: Optional[AbstractEventLoop] = None,
+    resolution: float = TIMER_WHEEL_RESOLUTION,
+) -> TimerWheel:
+    """
+    Get the timer wheel of a loop, created at the first time with the resolution
+    :param loop:
+    :type loop: Optional[AbstractEventLoop]
+    :param resolution:
+    :type resolution: float
+    :return:
+    :rtype: TimerWheel
+    """
+    loop = loop or get_event_loop()
+    try:
+        return _WHEELS[loop]
+    except KeyError:
+        wheel = _WHEELS[loop] = TimerWheel(loop, resolution)
+        return wheel
@@ -0,0 +1,102 @@
+"""
+Test ProtocolMixin class
+"""
+from unittest.case import TestCase
+
+from bifrost.protocols import Client, Relay
+from bifrost.protocols.socks5 import Socks5Protocol
+from bifrost.protocols.socks5.methods import NoAuth
+from tests.fakes import FakeTransport, fake_channel
+
+
+class ProtocolMixinFlowControlTest(TestCase):
+    """
+    test the flow control of ProtocolMixin
+    """
+
+    def setUp(self) -> None:
+        self.channel = fake_channel(
+            config={"CLIENT_WRITE_BUFFER_HIGH": 1024, "CLIENT_WRITE_BUFFER_LOW": 256}
+        )
+        self.protocol = Client.from_channel(self.channel, role="client")
+        self.protocol.transport = FakeTransport(buffered=2048)
+        self.protocol.server_transport = FakeTransport()
+
+    def tearDown(self) -> None:
+        del self.protocol
+        del self.channel
+
+    def test_set_write_buffer_limits(self):
+        """
+        test the watermarks are taken from the channel by role
+        :return:
+        """
+        transport = FakeTransport()
+        self.protocol.set_write_buffer_limits(transport)
+        self.assertTupleEqual(transport.limits, (1024, 256))
+
+    def test_pause_resume(self):
+        """
+        test the peer is paused and resumed with the buffered bytes counted
+        :return:
+        """
+        self.protocol.pause_peer_reading()
+        self.assertFalse(self.protocol.server_transport.reading)
+        self.assertTrue(self.protocol.writing_paused)
+        self.assertEqual(self.channel.stats["flow/buffered"], 2048)
+
+        self.protocol.resume_peer_reading()
+        self.assertTrue(self.protocol.server_transport.reading)
+        self.assertFalse(self.protocol.writing_paused)
+        self.assertEqual(self.channel.stats["flow/buffered"], 0)
+
+    def test_release_buffered(self):
+        """
+        test the buffered bytes are released when the connection is lost
+        :return:
+        """
+        self.protocol.pause_peer_reading()
+        self.protocol.release_buffered()
+        self.assertEqual(self.channel.stats["flow/buffered"], 0)
+        self.protocol.release_buffered()
+        self.assertEqual(self.channel.stats["flow/buffered"], 0)
+
+
+class ProtocolMixinConfigTest(TestCase):
+    """
+    test the configuration shared by the protocols in a channel
+    """
+
+    def test_shared(self):
+        """
+        test the configuration is built once and read-only
+        :return:
+        """
+        channel = fake_channel(settings={"PROTOCOL_CLIENT_TIMEOUT": 5})
+        first = Client.from_channel(channel, role="client")
+        second = Client.from_channel(channel, role="client")
+
+        self.assertIs(first.config, second.config)
+        self.assertEqual(first.config["TIMEOUT"], 5)
+        with self.assertRaises(TypeError):
+            first.config["TIMEOUT"] = 1  # type: ignore
+
+    def test_resolved(self):
+        """
+        test the classes used by the connections are resolved in the config
+        :return:
+        """
+        channel = fake_channel(
+            config={
+                "AUTH_METHODS": {
+                    0x02: "bifrost.protocols.socks5.methods.UsernamePasswordAuth",
+                    0x00: "bifrost.protocols.socks5.methods.NoAuth",
+                }
+            }
+        )
+        config = Socks5Protocol.from_channel(channel).config
+
+        self.assertIs(config["CLS_CLIENT_PROTOCOL"], Client)
+        self.assertIs(config["CLS_RELAY_PROTOCOL"], Relay)
+        self.assertIs(config["CLS_AUTH_METHODS"][0x00], NoAuth)
+        self.assertTupleEqual(config["AUTH_METHODS_ORDER"], (0x02, 0x00))
@@ -0,0 +1,141 @@
+"""
+Baselines of the micro-benchmarks
+
+The median time and the memory allocated per call of every benchmark are kept in
+baselines.json. With BENCHMARK_ENFORCE set, a benchmark slower, or allocating
+more, than its baseline by more than THRESHOLD fails; otherwise the comparison is
+only reported in the extra info, as the times are too noisy on a shared machine
+for the plain test run. The times are normalized by a calibration loop of
+plain Python run right after every benchmark, so the baselines stay comparable
+between machines, and runs, of different speeds.
+
+Enforce the baselines with:
+
+    BENCHMARK_ENFORCE=1 pytest tests/benchmarks/test_hot_paths.py
+
+Update the baselines after an intended change with:
+
+    BENCHMARK_SAVE_BASELINES=1 pytest tests/benchmarks/test_hot_paths.py
+
+The memory is measured with tracemalloc, which only traces the blocks alive at
+a time: the peak is the most memory held during a call, including the transient
+objects, and the retained is the memory kept after a call, e.g. by a leak.
+"""
+import json
+import os
+import statistics
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import pytest
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+# the slowdown over the baseline failing a benchmark, e.g. 0.25 for 25%
+THRESHOLD = float(os.environ.get("BENCHMARK_THRESHOLD", "0.25"))
+SAVE = bool(os.environ.get("BENCHMARK_SAVE_BASELINES"))
+ENFORCE = bool(os.environ.get("BENCHMARK_ENFORCE"))
+
+# the bytes allocated over the baseline not failing a benchmark, for the noise
+# of the allocator
+ALLOCATION_SLACK = 64
+
+CALLS = 1000
+
+
+def calibration() -> float:
+    """
+    The median seconds of a loop of dictionary lookups and function calls, the
+    stuff of the hot paths, on this machine now
+    :return:
+    :rtype: float
+    """
+    setup = "table = {i: str(i) for i in range(64)}; get = table.get"
+    statement = "for i in range(64): len(get(i))"
+    return (
+        statistics.median(timeit.repeat(statement, setup, number=100, repeat=51)) / 100
+    )
+
+
+def allocations(function: Callable, *args: Any, **kwargs: Any) -> Dict[str, int]:
+    """
+    The bytes allocated per call of a function
+    :param function:
+    :type function: Callable
+    :param args:
+    :type args: Any
+    :param kwargs:
+    :type kwargs: Any
+    :return:
+    :rtype: Dict[str, int]
+    """
+    function(*args, **kwargs)  # warm up the caches
+
+    peaks = []
+    for _ in range(5):
+        tracemalloc.start()
+        function(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+
+    tracemalloc.start()
+    for _ in range(CALLS):
+        function(*args, **kwargs)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"alloc_peak_bytes": min(peaks), "alloc_retained_bytes": retained // CALLS}
+
+
+def check(benchmark, function: Callable, *args: Any, **kwargs: Any) -> None:
+    """
+    Report the memory allocated per call of the function benchmarked, and its
+    ratios to the baseline; fail if it is slower or allocates more than its
+    baseline with ENFORCE
+    :param benchmark:
+    :type benchmark: BenchmarkFixture
+    :param function:
+    :type function: Callable
+    :param args:
+    :type args: Any
+    :param kwargs:
+    :type kwargs: Any
+    :return:
+    :rtype: None
+    """
+    measured = allocations(function, *args, **kwargs)
+    benchmark.extra_info.update(measured)
+    if benchmark.stats is None:  # --benchmark-disable
+        return
+    measured["median"] = benchmark.stats.stats.median / calibration()
+
+    baselines: Dict[str, Dict[str, float]] = (
+        json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    )
+    if SAVE:
+        baselines[benchmark.name] = measured
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        return
+    if (baseline := baselines.get(benchmark.name)) is None:
+        return
+    benchmark.extra_info["baseline_ratio"] = measured["median"] / baseline["median"]
+    if not ENFORCE:
+        return
+
+    failures = []
+    if measured["median"] > baseline["median"] * (1 + THRESHOLD):
+        failures.append(
+            f"median {measured['median']:.3f} over "
+            f"{baseline['median']:.3f} calibration units"
+        )
+    for key in ("alloc_peak_bytes", "alloc_retained_bytes"):
+        if measured[key] > baseline[key] * (1 + THRESHOLD) + ALLOCATION_SLACK:
+            failures.append(f"{key} {measured[key]} over {baseline[key]}")
+    if failures:
+        pytest.fail(
+            f"{benchmark.name} regressed by more than {THRESHOLD:.0%}: "
+            + "; ".join(failures)
+        )
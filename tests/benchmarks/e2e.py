@@ -0,0 +1,586 @@
+"""
+End-to-end benchmarks of the proxy
+
+A Bifrost service runs in a subprocess with one SOCKS5 channel, in front of the
+local targets: an echo server, a sink reading everything and a source writing
+the bytes requested. An asyncio load generator drives the flows through the
+proxy and measures:
+
+* the handshakes per second: SOCKS5 connections to the echo target, closed once
+  the first byte is echoed
+* the time to first byte, p50 and p99: from opening the connection to the proxy
+  until the first byte echoed by the target
+* the bulk MB/s of one flow, downloading from the source and uploading to the
+  sink
+* the aggregate MB/s of concurrent flows all downloading from the source
+
+Run it for the results in JSON, to compare them between commits:
+
+    python -m tests.benchmarks.e2e --flows 1000 10000 --output e2e.json
+
+Every flow takes two file descriptors in the load generator and two in the
+proxy, so the limits of the processes are raised to their hard limits; the
+flows failing to open are reported in the results. test_e2e.py runs a small
+round of every benchmark with pytest-benchmark.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import uvloop
+
+import bifrost
+from bifrost.utils import get_settings
+from bifrost.utils.log import configure_logging
+from bifrost.utils.misc import load_object
+
+MB = 1024 * 1024
+CHUNK = 256 * 1024
+PAYLOAD = memoryview(b"x" * CHUNK)
+
+# the bytes of the size requested from the source, or sent to the sink
+HEADER = 8
+
+# the connections opened to the proxy at once
+CONCURRENCY = 256
+
+STARTUP_TIMEOUT = 10  # in seconds
+
+# the root of the repository, to run this module in the subprocess
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def raise_nofile_limit() -> int:
+    """
+    Raise the soft limit of the file descriptors of this process to the hard one
+    :return: the limit
+    :rtype: int
+    """
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def free_port() -> int:
+    """
+    A free port of the loopback
+    :return:
+    :rtype: int
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """
+    The nearest-rank percentile of the values
+    :param values:
+    :type values: Sequence[float]
+    :param fraction: e.g. 0.99
+    :type fraction: float
+    :return:
+    :rtype: float
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+# ==== PROXY ==================================================================
+
+
+def serve(port: int, workers: int = 1) -> None:
+    """
+    Run the proxy with one SOCKS5 channel on the port; it is the entry of the
+    subprocess
+    :param port:
+    :type port: int
+    :param workers:
+    :type workers: int
+    :return:
+    :rtype: None
+    """
+    raise_nofile_limit()
+
+    settings = get_settings()
+    with settings.unfreeze(priority="cmd") as _settings:
+        _settings["LOG_LEVEL"] = logging.WARNING
+        _settings["WORKERS"] = workers
+        _settings["EXTENSIONS"] = {
+            "bifrost.extensions.NegativeCache": 0,
+            "bifrost.extensions.Stats": 0,
+        }
+        _settings["CHANNELS"] = {
+            "server": dict(
+                _settings["CHANNELS"]["server"], INTERFACE_PORT=port, BACKLOG=4096
+            )
+        }
+    configure_logging(settings)
+
+    load_object(settings["CLS_SUPERVISOR"]).from_settings(settings).start()
+
+
+class Proxy:
+    """
+    The proxy running in a subprocess
+    """
+
+    def __init__(self, workers: int = 1):
+        """
+
+        :param workers:
+        :type workers: int
+        """
+        self.workers: int = workers
+        self.port: int = free_port()
+        self.process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> Proxy:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """
+        Start the subprocess and wait for the channel to listen
+        :return:
+        :rtype: None
+        """
+        self.process = subprocess.Popen(  # nosec
+            [
+                sys.executable,
+                "-m",
+                __spec__.name,  # type: ignore
+                "serve",
+                "--port",
+                str(self.port),
+                "--workers",
+                str(self.workers),
+            ],
+            cwd=ROOT,
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("The proxy exited at startup")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), 0.1).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError("The proxy is not listening")
+
+    def stop(self) -> None:
+        """
+        Stop the subprocess
+        :return:
+        :rtype: None
+        """
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(STARTUP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+
+# ==== TARGETS ================================================================
+
+
+class Echo(asyncio.Protocol):
+    """
+    Write back the data received
+    """
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport  # pylint: disable=attribute-defined-outside-init
+
+    def data_received(self, data: bytes) -> None:
+        self.transport.write(data)
+
+
+async def sink(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Read the size, then the bytes of the size, and acknowledge them with a byte
+    """
+    try:
+        remaining = int.from_bytes(await reader.readexactly(HEADER), "big")
+        while remaining > 0:
+            data = await reader.read(CHUNK)
+            if not data:
+                return
+            remaining -= len(data)
+        writer.write(b"\x00")
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def source(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Read the size, then write the bytes of the size
+    """
+    try:
+        remaining = int.from_bytes(await reader.readexactly(HEADER), "big")
+        while remaining > 0:
+            size = min(remaining, CHUNK)
+            writer.write(PAYLOAD[:size])
+            await writer.drain()
+            remaining -= size
+    finally:
+        writer.close()
+
+
+class Targets:
+    """
+    The target servers on the loopback
+    """
+
+    def __init__(self):
+        self.servers: List[asyncio.AbstractServer] = []
+        self.echo: int = 0
+        self.sink: int = 0
+        self.source: int = 0
+
+    async def start(self) -> None:
+        """
+
+        :return:
+        :rtype: None
+        """
+        loop = asyncio.get_event_loop()
+        self.servers = [
+            await loop.create_server(Echo, "127.0.0.1", 0, backlog=4096),
+            await asyncio.start_server(sink, "127.0.0.1", 0, backlog=4096),
+            await asyncio.start_server(source, "127.0.0.1", 0, backlog=4096),
+        ]
+        self.echo, self.sink, self.source = (
+            server.sockets[0].getsockname()[1] for server in self.servers
+        )
+
+    async def close(self) -> None:
+        """
+
+        :return:
+        :rtype: None
+        """
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+
+
+# ==== LOAD GENERATOR =========================================================
+
+
+async def open_socks5(
+    proxy: int, port: int
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """
+    Open a connection to a target on the loopback through the proxy
+    :param proxy: the port of the proxy
+    :type proxy: int
+    :param port: the port of the target
+    :type port: int
+    :return:
+    :rtype: Tuple[StreamReader, StreamWriter]
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", proxy)
+    try:
+        writer.write(b"\x05\x01\x00")
+        if await reader.readexactly(2) != b"\x05\x00":
+            raise ConnectionError("The method is not accepted")
+
+        writer.write(
+            b"\x05\x01\x00\x01"
+            + socket.inet_aton("127.0.0.1")
+            + port.to_bytes(2, "big")
+        )
+        _, rep, _, atyp = await reader.readexactly(4)
+        if rep:
+            raise ConnectionError(f"The request is replied with REP {rep}")
+        # the bound address and port
+        await reader.readexactly({0x01: 4, 0x04: 16}[atyp] + 2)
+    except BaseException:
+        writer.close()
+        raise
+    return reader, writer
+
+
+async def handshakes(
+    proxy: int, targets: Targets, count: int, concurrency: int = CONCURRENCY
+) -> Dict[str, Any]:
+    """
+    Open the connections to the echo target, each closed once the first byte is
+    echoed
+    :param proxy:
+    :type proxy: int
+    :param targets:
+    :type targets: Targets
+    :param count:
+    :type count: int
+    :param concurrency: the connections open at once
+    :type concurrency: int
+    :return:
+    :rtype: Dict[str, Any]
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    ttfb: List[float] = []
+
+    async def handshake() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            reader, writer = await open_socks5(proxy, targets.echo)
+            try:
+                writer.write(b"x")
+                await reader.readexactly(1)
+                ttfb.append(time.perf_counter() - started)
+            finally:
+                writer.close()
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(handshake() for _ in range(count)), return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+
+    return {
+        "handshakes": len(ttfb),
+        "failed": sum(isinstance(result, BaseException) for result in results),
+        "handshakes_per_second": round(len(ttfb) / elapsed, 1),
+        "ttfb_p50_ms": round(percentile(ttfb, 0.5) * 1000, 3) if ttfb else None,
+        "ttfb_p99_ms": round(percentile(ttfb, 0.99) * 1000, 3) if ttfb else None,
+    }
+
+
+async def download(proxy: int, targets: Targets, size: int) -> int:
+    """
+    Download the bytes of the size from the source
+    :param proxy:
+    :type proxy: int
+    :param targets:
+    :type targets: Targets
+    :param size:
+    :type size: int
+    :return: the bytes received
+    :rtype: int
+    """
+    reader, writer = await open_socks5(proxy, targets.source)
+    try:
+        writer.write(size.to_bytes(HEADER, "big"))
+        received = 0
+        while data := await reader.read(CHUNK):
+            received += len(data)
+        return received
+    finally:
+        writer.close()
+
+
+async def upload(proxy: int, targets: Targets, size: int) -> int:
+    """
+    Upload the bytes of the size to the sink
+    :param proxy:
+    :type proxy: int
+    :param targets:
+    :type targets: Targets
+    :param size:
+    :type size: int
+    :return: the bytes sent
+    :rtype: int
+    """
+    reader, writer = await open_socks5(proxy, targets.sink)
+    try:
+        writer.write(size.to_bytes(HEADER, "big"))
+        remaining = size
+        while remaining > 0:
+            chunk = min(remaining, CHUNK)
+            writer.write(PAYLOAD[:chunk])
+            await writer.drain()
+            remaining -= chunk
+        await reader.readexactly(1)
+        return size
+    finally:
+        writer.close()
+
+
+async def bulk(proxy: int, targets: Targets, size: int) -> Dict[str, Any]:
+    """
+    The MB/s of one flow downloading and uploading the bytes of the size
+    :param proxy:
+    :type proxy: int
+    :param targets:
+    :type targets: Targets
+    :param size:
+    :type size: int
+    :return:
+    :rtype: Dict[str, Any]
+    """
+    results: Dict[str, Any] = {"bytes": size}
+    for name, transfer in (("download", download), ("upload", upload)):
+        started = time.perf_counter()
+        transferred = await transfer(proxy, targets, size)
+        elapsed = time.perf_counter() - started
+        results[f"{name}_mb_per_second"] = round(transferred / MB / elapsed, 1)
+    return results
+
+
+async def aggregate(
+    proxy: int, targets: Targets, flows: int, size: int, concurrency: int = CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    The MB/s of the flows downloading the bytes of the size each at once; all
+    flows are open before any download starts
+    :param proxy:
+    :type proxy: int
+    :param targets:
+    :type targets: Targets
+    :param flows:
+    :type flows: int
+    :param size:
+    :type size: int
+    :param concurrency: the connections being opened at once
+    :type concurrency: int
+    :return:
+    :rtype: Dict[str, Any]
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    opened = asyncio.Event()
+    remaining = flows
+
+    async def flow() -> int:
+        nonlocal remaining
+        try:
+            async with semaphore:
+                reader, writer = await open_socks5(proxy, targets.source)
+        finally:
+            remaining -= 1
+            if not remaining:
+                opened.set()
+        try:
+            await opened.wait()
+            writer.write(size.to_bytes(HEADER, "big"))
+            received = 0
+            while data := await reader.read(CHUNK):
+                received += len(data)
+            return received
+        finally:
+            writer.close()
+
+    tasks = [asyncio.ensure_future(flow()) for _ in range(flows)]
+    await opened.wait()
+    started = time.perf_counter()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    received = sum(result for result in results if isinstance(result, int))
+    return {
+        "flows": flows,
+        "failed": sum(isinstance(result, BaseException) for result in results),
+        "bytes_per_flow": size,
+        "mb_per_second": round(received / MB / elapsed, 1),
+    }
+
+
+async def run(
+    proxy: int, handshake_count: int, bulk_size: int, flows: Sequence[int], size: int
+) -> Dict[str, Any]:
+    """
+    Run all benchmarks against the proxy
+    :param proxy:
+    :type proxy: int
+    :param handshake_count:
+    :type handshake_count: int
+    :param bulk_size:
+    :type bulk_size: int
+    :param flows:
+    :type flows: Sequence[int]
+    :param size:
+    :type size: int
+    :return:
+    :rtype: Dict[str, Any]
+    """
+    targets = Targets()
+    await targets.start()
+    try:
+        return {
+            "handshakes": await handshakes(proxy, targets, handshake_count),
+            "bulk": await bulk(proxy, targets, bulk_size),
+            "aggregate": {
+                str(count): await aggregate(proxy, targets, count, size)
+                for count in flows
+            },
+        }
+    finally:
+        await targets.close()
+
+
+def main(argv: Sequence[str] = None) -> None:
+    """
+
+    :param argv:
+    :type argv: Sequence[str]
+    :return:
+    :rtype: None
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", nargs="?", choices=["run", "serve"], default="run")
+    parser.add_argument("--port", type=int, help="the port of the proxy to serve")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--handshakes", type=int, default=10000)
+    parser.add_argument("--bulk-size", type=int, default=256, help="in MB")
+    parser.add_argument("--flows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--flow-size", type=int, default=1024, help="in KB")
+    parser.add_argument("--output", help="the file of the results, stdout if not set")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.port, args.workers)
+        return
+
+    limit = raise_nofile_limit()
+    uvloop.install()
+    with Proxy(args.workers) as proxy:
+        results = asyncio.run(
+            run(
+                proxy.port,
+                args.handshakes,
+                args.bulk_size * MB,
+                args.flows,
+                args.flow_size * 1024,
+            )
+        )
+
+    report = {
+        "version": bifrost.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "workers": args.workers,
+        "nofile_limit": limit,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
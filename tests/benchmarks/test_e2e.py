@@ -0,0 +1,86 @@
+"""
+End-to-end benchmarks of the proxy
+
+Run with pytest-benchmark, e.g.:
+
+    pytest tests/benchmarks/test_e2e.py --benchmark-only --benchmark-json e2e.json
+
+Every benchmark runs a small round of the benchmarks of e2e.py against a proxy
+in a subprocess; the handshakes per second, the time to first byte and the MB/s
+are reported in the extra info. Run e2e.py for the full rounds.
+"""
+import asyncio
+
+import pytest
+
+from tests.benchmarks.e2e import (
+    MB,
+    Proxy,
+    Targets,
+    aggregate,
+    bulk,
+    handshakes,
+    raise_nofile_limit,
+)
+
+HANDSHAKES = 200
+BULK_SIZE = 16 * MB
+FLOWS = 100
+FLOW_SIZE = 256 * 1024
+
+
+@pytest.fixture(name="proxy", scope="module")
+def fixture_proxy():
+    """
+    A proxy in a subprocess
+    """
+    raise_nofile_limit()
+    with Proxy() as proxy:
+        yield proxy
+
+
+@pytest.fixture(name="run")
+def fixture_run(proxy):
+    """
+    Run a benchmark of e2e.py against the proxy and the targets in a loop
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    targets = Targets()
+    loop.run_until_complete(targets.start())
+
+    def run(benchmark, function, *args):
+        def round_():
+            benchmark.extra_info.update(
+                loop.run_until_complete(function(proxy.port, targets, *args))
+            )
+
+        benchmark.pedantic(round_, rounds=3)
+        assert not benchmark.extra_info.get("failed")
+
+    yield run
+
+    loop.run_until_complete(targets.close())
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+def test_handshakes(benchmark, run):
+    """
+    the handshakes per second, and the time to first byte
+    """
+    run(benchmark, handshakes, HANDSHAKES)
+
+
+def test_bulk(benchmark, run):
+    """
+    the MB/s of one flow downloading and uploading
+    """
+    run(benchmark, bulk, BULK_SIZE)
+
+
+def test_aggregate(benchmark, run):
+    """
+    the MB/s of concurrent flows
+    """
+    run(benchmark, aggregate, FLOWS, FLOW_SIZE)
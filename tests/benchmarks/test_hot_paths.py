@@ -0,0 +1,202 @@
+"""
+Micro-benchmarks of the hot paths
+
+Run with pytest-benchmark, e.g.:
+
+    pytest tests/benchmarks/test_hot_paths.py --benchmark-only
+
+Every benchmark times one call of a function run for every chunk or every
+handshake, with fake transports dropping the data written. The memory allocated
+per call is reported in the extra info, and a benchmark regressing over its
+baseline fails with BENCHMARK_ENFORCE set, see baseline.py.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bifrost.extensions import Stats
+from bifrost.protocols.socks5 import AUTH, DATA, INIT, STATES, Socks5Protocol
+from bifrost.protocols.socks5.parser import (
+    Greeting,
+    Request,
+    Socks5Parser,
+    UsernamePassword,
+)
+from bifrost.settings import Settings
+from bifrost.signals import SignalManager, data_sent
+from bifrost.utils.unit_converter import convert_unit
+from tests.benchmarks.baseline import check
+from tests.fakes import FakeTransport, fake_channel
+
+CHUNK = b"x" * 1400
+
+GREETING = Greeting(ver=5, methods=b"\x00\x02")
+USERNAME_PASSWORD = b"\x01\x05alice\x06secret"
+REQUEST = b"\x05\x01\x00\x03\x0bexample.com\x01\xbb"
+
+
+class NullTransport(FakeTransport):
+    """
+    A transport dropping the data written
+    """
+
+    def write(self, data):
+        """
+        write nothing
+        """
+
+
+def drive(coroutine):
+    """
+    Run a coroutine never suspended without any loop
+    """
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("The coroutine is suspended")
+
+
+@pytest.fixture(name="loop")
+def fixture_loop():
+    """
+    A loop not running
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    yield loop
+
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+@pytest.fixture(name="channel")
+def fixture_channel(loop):  # pylint: disable=unused-argument
+    """
+    A channel with the username/password authentication, in a loop
+    """
+    return fake_channel(
+        config={
+            "AUTH_METHODS": {
+                0x00: "bifrost.protocols.socks5.methods.NoAuth",
+                0x02: "bifrost.protocols.socks5.methods.UsernamePasswordAuth",
+            },
+            "USERNAMEPASSWORD_USERS": {"alice": "secret"},
+        }
+    )
+
+
+@pytest.fixture(name="protocol")
+def fixture_protocol(channel):
+    """
+    A Socks5Protocol compiled with the middlewares, with null transports
+    """
+    protocol = Socks5Protocol.from_channel(channel)
+    protocol.transport = NullTransport()
+    protocol.client_transport = NullTransport()
+    return protocol
+
+
+def test_parse_request(benchmark):
+    """
+    parse the request of the HOST state
+    """
+
+    def parse():
+        parser = Socks5Parser()
+        parser.receive_data(REQUEST)
+        return parser.next_event(Request)
+
+    assert benchmark(parse).dst_port == 443
+    check(benchmark, parse)
+
+
+def test_negotiate_method(benchmark, protocol):
+    """
+    select the method of a greeting in the INIT state
+    """
+    state = STATES[INIT]
+
+    def negotiate():
+        drive(state.event_received(protocol, GREETING))
+
+    benchmark(negotiate)
+    check(benchmark, negotiate)
+
+
+def test_username_password_auth(benchmark, protocol):
+    """
+    parse and check the username and password in the AUTH state
+    """
+    drive(STATES[INIT].event_received(protocol, Greeting(ver=5, methods=b"\x02")))
+    protocol.state = AUTH
+    state = STATES[AUTH]
+
+    def auth():
+        parser = Socks5Parser()
+        parser.receive_data(USERNAME_PASSWORD)
+        drive(state.event_received(protocol, parser.next_event(UsernamePassword)))
+
+    benchmark(auth)
+    check(benchmark, auth)
+
+
+def test_middlewares_data_received(benchmark, protocol):
+    """
+    relay a chunk in the DATA state through the hook compiled with the
+    middlewares
+    """
+    protocol.state = DATA
+
+    benchmark(protocol.data_received, CHUNK)
+    check(benchmark, protocol.data_received, CHUNK)
+
+
+def test_stats_increase(benchmark):
+    """
+    Stats.increase of a key
+    """
+    stats = Stats(SimpleNamespace(settings=Settings()))
+
+    benchmark(stats.increase, "data/server/sent", 1400)
+    check(benchmark, stats.increase, "data/server/sent", 1400)
+
+
+def test_signal_send(benchmark, loop):  # pylint: disable=unused-argument
+    """
+    SignalManager.send of a coalesced signal with one receiver, aggregated
+    until the loop runs
+    """
+    signal_manager = SignalManager.from_settings({})
+    signal_manager.connect(lambda **kwargs: None, data_sent)
+
+    benchmark(signal_manager.send, data_sent, size=1400)
+    check(benchmark, signal_manager.send, data_sent, size=1400)
+
+
+def test_protocol_config(benchmark, channel):
+    """
+    make a protocol, whose configuration is built once by the channel
+    """
+    benchmark(Socks5Protocol.from_channel, channel)
+    check(benchmark, Socks5Protocol.from_channel, channel)
+
+
+def test_build_config(benchmark, channel):
+    """
+    build the configuration of a protocol class in a channel
+    """
+    prefix = Socks5Protocol.setting_prefix
+
+    benchmark(Socks5Protocol.build_config, channel, prefix)
+    check(benchmark, Socks5Protocol.build_config, channel, prefix)
+
+
+def test_convert_unit(benchmark):
+    """
+    convert a rate to a human readable unit
+    """
+    assert benchmark(convert_unit, 123456789, rate=True)[1] == "Mibit/s"
+    check(benchmark, convert_unit, 123456789, True)
@@ -0,0 +1,104 @@
+"""
+Benchmarks of the memory of the connections
+
+Run with pytest-benchmark, e.g.:
+
+    pytest tests/benchmarks --benchmark-only
+
+The bytes allocated per connection by the protocols, measured with tracemalloc
+over CONNECTIONS connections, are reported in the extra info of every benchmark;
+the fake transports are not counted.
+"""
+import asyncio
+import tracemalloc
+
+import pytest
+
+from bifrost.protocols import Client, Socks5Protocol
+from bifrost.protocols.socks5 import HOST, STATES
+from tests.fakes import FakeTransport, fake_channel
+
+CONNECTIONS = 1000
+
+
+@pytest.fixture(name="channel")
+def fixture_channel():
+    """
+    A channel in a loop
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    yield fake_channel()
+
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+def idle(channel):
+    """
+    A connection waiting for the greeting
+    """
+    protocol = Socks5Protocol.from_channel(channel)
+    transport = FakeTransport()
+    transport.set_protocol(protocol)
+    protocol.connection_made(transport)
+    return protocol
+
+
+def active(channel):
+    """
+    A connection relaying the data, with both transports handed over to the
+    relay protocols
+    """
+    protocol = idle(channel)
+
+    client = Client.from_channel(channel, role="client")
+    client_transport = FakeTransport()
+    client_transport.set_protocol(client)
+    client.connection_made(client_transport)
+    client.server_transport = protocol.transport
+    client.timeouts = protocol.timeouts
+    protocol.client_transport = client_transport
+
+    STATES[HOST].switch(protocol)
+    return protocol.transport.get_protocol(), client_transport.get_protocol()
+
+
+def measure(factory, channel) -> int:
+    """
+    The bytes allocated per connection out of the fake transports
+    """
+    factory(channel)  # build the shared configurations first
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    connections = [factory(channel) for _ in range(CONNECTIONS)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    filters = [tracemalloc.Filter(False, FakeTransport.__init__.__code__.co_filename)]
+    size = sum(
+        stat.size_diff
+        for stat in after.filter_traces(filters).compare_to(
+            before.filter_traces(filters), "filename"
+        )
+    )
+    del connections
+    return size // CONNECTIONS
+
+
+def test_idle_connection(benchmark, channel):
+    """
+    the memory of a connection before the handshake
+    """
+    benchmark.extra_info["bytes_per_connection"] = measure(idle, channel)
+    benchmark(idle, channel)
+
+
+def test_active_connection(benchmark, channel):
+    """
+    the memory of a connection in DATA state, including the read buffers of
+    the relays
+    """
+    benchmark.extra_info["bytes_per_connection"] = measure(active, channel)
+    benchmark(active, channel)
@@ -0,0 +1,22 @@
+"""
+Benchmarks of SignalManager
+
+Each round sends a signal COUNT times without any receiver, as the middlewares
+do for every chunk.
+"""
+from bifrost.signals import SignalManager, data_sent
+
+COUNT = 1000
+
+
+def test_send_without_receivers(benchmark):
+    """
+    SignalManager.send of a signal without any receiver
+    """
+    signal_manager = SignalManager.from_settings({})
+
+    def run():
+        for _ in range(COUNT):
+            signal_manager.send(data_sent, size=1400)
+
+    benchmark(run)
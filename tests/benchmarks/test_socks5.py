@@ -0,0 +1,83 @@
+"""
+Benchmarks of Socks5Protocol
+
+Run with pytest-benchmark, e.g.:
+
+    pytest tests/benchmarks --benchmark-only
+
+Each round relays CHUNKS chunks, so the time per chunk is the time of a round
+divided by CHUNKS.
+"""
+import asyncio
+
+import pytest
+
+from bifrost.protocols.socks5 import DATA, STATES, Socks5Protocol
+from tests.fakes import FakeTransport, fake_channel
+
+CHUNKS = 1000
+CHUNK = b"x" * 1400
+
+
+@pytest.fixture(name="protocol")
+def fixture_protocol():
+    """
+    A Socks5Protocol in DATA state with fake transports
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    protocol = Socks5Protocol.from_channel(fake_channel())
+    protocol.transport = FakeTransport()
+    protocol.client_transport = FakeTransport()
+    protocol.state = DATA
+
+    yield protocol
+
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+async def _data_received_by_task(protocol, data: bytes) -> None:
+    """
+    The dispatch of every chunk before the synchronous DATA path: a task
+    gathering the coroutine of the state, then switching the state
+    """
+    state = STATES[protocol.state]
+    (result,) = await asyncio.gather(
+        state.data_received(protocol, data), return_exceptions=True
+    )
+    if result is None:
+        state.switch(protocol)
+
+
+def test_data_state_by_task(benchmark, protocol):
+    """
+    relay the chunks through one task per chunk
+    """
+    loop = protocol.loop
+
+    def relay():
+        tasks = [
+            loop.create_task(_data_received_by_task(protocol, CHUNK))
+            for _ in range(CHUNKS)
+        ]
+        loop.run_until_complete(asyncio.wait(tasks))
+        protocol.client_transport.written.clear()
+
+    benchmark.extra_info["chunks"] = CHUNKS
+    benchmark(relay)
+
+
+def test_data_state_synchronous(benchmark, protocol):
+    """
+    relay the chunks through the synchronous DATA path
+    """
+
+    def relay():
+        for _ in range(CHUNKS):
+            protocol.data_received(CHUNK)
+        protocol.client_transport.written.clear()
+
+    benchmark.extra_info["chunks"] = CHUNKS
+    benchmark(relay)
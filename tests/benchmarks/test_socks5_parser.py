@@ -0,0 +1,73 @@
+"""
+Benchmarks of the parser of the Socks5 handshake
+
+Run with pytest-benchmark, e.g.:
+
+    pytest tests/benchmarks --benchmark-only
+"""
+from bifrost.protocols.socks5.parser import (
+    Greeting,
+    Request,
+    Socks5Parser,
+    UsernamePassword,
+)
+
+HANDSHAKE = (
+    (Greeting, b"\x05\x02\x00\x02"),
+    (UsernamePassword, b"\x01\x05alice\x06secret"),
+    (Request, b"\x05\x01\x00\x03\x0bexample.com\x01\xbb"),
+)
+PIPELINED = b"".join(message for _, message in HANDSHAKE) + b"GET / HTTP/1.1\r\n"
+
+
+def test_handshake_pipelined(benchmark):
+    """
+    parse a handshake sent in one segment
+    """
+
+    def parse():
+        parser = Socks5Parser()
+        parser.receive_data(PIPELINED)
+        for expect, _ in HANDSHAKE:
+            parser.next_event(expect)
+        return parser.trailing_data()
+
+    assert benchmark(parse) == b"GET / HTTP/1.1\r\n"
+
+
+def test_handshake_one_message_per_read(benchmark):
+    """
+    parse a handshake sent message by message
+    """
+
+    def parse():
+        parser = Socks5Parser()
+        events = []
+        for expect, message in HANDSHAKE:
+            parser.receive_data(message)
+            events.append(parser.next_event(expect))
+        return events
+
+    assert None not in benchmark(parse)
+
+
+def test_handshake_fragmented(benchmark):
+    """
+    parse a handshake received byte by byte
+    """
+    fragments = [
+        (expect, [message[i : i + 1] for i in range(len(message))])
+        for expect, message in HANDSHAKE
+    ]
+
+    def parse():
+        parser = Socks5Parser()
+        events = []
+        for expect, chunks in fragments:
+            for chunk in chunks:
+                parser.receive_data(chunk)
+                if (event := parser.next_event(expect)) is not None:
+                    events.append(event)
+        return events
+
+    assert len(benchmark(parse)) == len(HANDSHAKE)
@@ -0,0 +1,40 @@
+"""
+Benchmarks of Stats
+
+Each round increases a counter of a channel COUNT times, by the key built at
+every call and by the handle resolved once.
+"""
+from types import SimpleNamespace
+
+from bifrost.extensions import Stats
+from bifrost.settings import Settings
+
+COUNT = 1000
+
+
+def test_increase_by_key(benchmark):
+    """
+    Stats.increase with a key built by an f-string
+    """
+    stats = Stats(SimpleNamespace(settings=Settings()))
+    channel = SimpleNamespace(name="server")
+
+    def run():
+        for _ in range(COUNT):
+            stats.increase(f"data/{channel.name}/sent", 1400)
+
+    benchmark(run)
+
+
+def test_increase_by_handle(benchmark):
+    """
+    Counter.add on a handle resolved once
+    """
+    stats = Stats(SimpleNamespace(settings=Settings()))
+    counter = stats.counter("data/server/sent")
+
+    def run():
+        for _ in range(COUNT):
+            counter.add(1400)
+
+    benchmark(run)
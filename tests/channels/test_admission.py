@@ -0,0 +1,178 @@
+"""
+Test the admission control of the connections on an interface
+"""
+import asyncio
+import ipaddress
+from unittest.case import TestCase
+
+from bifrost.channels.admission import ANY, Admission, TokenBucket
+from tests.fakes import fake_channel
+
+
+class TokenBucketTest(TestCase):
+    """
+    test TokenBucket class
+    """
+
+    def test_take(self):
+        """
+        test a burst is allowed at once, then the tokens come at the rate
+        :return:
+        """
+        bucket = TokenBucket(rate=10, burst=3)
+
+        self.assertListEqual([bucket.take(0) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(bucket.take(0), 0.1)
+        self.assertAlmostEqual(bucket.take(0.05), 0.05)
+        self.assertEqual(bucket.take(0.1), 0)
+
+        # the tokens never exceed the burst
+        self.assertListEqual([bucket.take(10) for _ in range(3)], [0, 0, 0])
+        self.assertGreater(bucket.take(10), 0)
+
+
+class AdmissionTest(TestCase):
+    """
+    test Admission class
+    """
+
+    def test_unlimited(self):
+        """
+        test the connections are all admitted without any limit
+        :return:
+        """
+        admission = Admission({})
+
+        self.assertEqual(admission.admit("127.0.0.1"), ANY)
+        self.assertEqual(admission.active, 1)
+        self.assertFalse(admission.full)
+
+        admission.release(ANY)
+        self.assertEqual(admission.active, 0)
+        self.assertDictEqual(admission.sources, {})
+
+    def test_full(self):
+        """
+        test the channel is full at MAX_CONNECTIONS
+        :return:
+        """
+        admission = Admission({"MAX_CONNECTIONS": 2})
+
+        sources = [admission.admit("127.0.0.1") for _ in range(2)]
+        self.assertTrue(admission.full)
+
+        admission.release(sources[0])
+        self.assertFalse(admission.full)
+
+    def test_per_source(self):
+        """
+        test the connections of a source over MAX_CONNECTIONS_PER_SOURCE are
+        rejected, a source being the network of the address with the prefix
+        :return:
+        """
+        admission = Admission({"MAX_CONNECTIONS_PER_SOURCE": 2, "SOURCE_PREFIX_V6": 64})
+
+        first = admission.admit("2001:db8::1")
+        self.assertEqual(first, ipaddress.ip_network("2001:db8::/64"))
+        self.assertEqual(admission.admit("2001:db8::2%eth0"), first)
+        self.assertIsNone(admission.admit("2001:db8::3"))
+        self.assertIsNotNone(admission.admit("2001:db8:0:1::1"))
+
+        # an IPv4-mapped address is an IPv4 source
+        self.assertEqual(
+            admission.admit("::ffff:10.0.0.1"), ipaddress.ip_network("10.0.0.1/32")
+        )
+
+        admission.release(first)
+        self.assertIsNotNone(admission.admit("2001:db8::3"))
+        self.assertEqual(admission.active, 4)
+
+    def test_source_limits(self):
+        """
+        test a network of SOURCE_LIMITS is limited as a whole, before the limit
+        by address
+        :return:
+        """
+        admission = Admission(
+            {"MAX_CONNECTIONS_PER_SOURCE": 1, "SOURCE_LIMITS": {"10.0.0.0/8": 2}}
+        )
+
+        self.assertIsNotNone(admission.admit("10.0.0.1"))
+        self.assertIsNotNone(admission.admit("10.0.0.1"))
+        self.assertIsNone(admission.admit("10.0.0.2"))
+
+        self.assertIsNotNone(admission.admit("192.168.0.1"))
+        self.assertIsNone(admission.admit("192.168.0.1"))
+
+
+class ChannelAdmissionTest(TestCase):
+    """
+    test a channel accepting the connections with admission control
+    """
+
+    def setUp(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.writers = []
+
+    def tearDown(self) -> None:
+        for writer in self.writers:
+            writer.close()
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        self.loop.run_until_complete(self.channel.stop())
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def start(self, **config):
+        """
+        start a channel listening on a free port of the loopback
+        """
+        self.channel = fake_channel(
+            config=dict(INTERFACE_ADDRESS="127.0.0.1", INTERFACE_PORT=0, **config)
+        )
+        self.loop.run_until_complete(self.channel.start())
+
+    def open(self):
+        """
+        open a connection to the channel
+        """
+        port = self.channel.sockets[0].getsockname()[1]
+        reader, writer = self.loop.run_until_complete(
+            asyncio.open_connection("127.0.0.1", port)
+        )
+        self.writers.append(writer)
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+        return reader, writer
+
+    def test_max_connections(self):
+        """
+        test the channel stops accepting at MAX_CONNECTIONS, and accepts the
+        connection waiting in the backlog when a connection is closed
+        :return:
+        """
+        self.start(MAX_CONNECTIONS=1)
+
+        _, first = self.open()
+        self.open()
+        self.assertEqual(self.channel.counter_active.value, 1)
+        self.assertEqual(self.channel.counter_accept_paused.value, 1)
+
+        first.close()
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+        self.assertEqual(self.channel.counter_active.value, 1)
+        self.assertEqual(self.channel.admission.active, 1)
+
+    def test_max_connections_per_source(self):
+        """
+        test the connections of a source over its limit are closed at once
+        :return:
+        """
+        self.start(MAX_CONNECTIONS_PER_SOURCE=1)
+
+        self.open()
+        rejected, _ = self.open()
+        self.assertEqual(self.channel.counter_active.value, 1)
+        self.assertEqual(self.channel.counter_rejected.value, 1)
+        self.assertEqual(
+            self.loop.run_until_complete(asyncio.wait_for(rejected.read(), 1)), b""
+        )
@@ -0,0 +1,107 @@
+"""
+Test ConnectionRegistry class
+"""
+from unittest.case import TestCase
+
+from bifrost.channels.registry import ConnectionRegistry
+
+
+class ConnectionRegistryTest(TestCase):
+    """
+    test ConnectionRegistry class
+    """
+
+    def setUp(self) -> None:
+        self.registry = ConnectionRegistry()
+        self.connections = [
+            self.registry.register(channel, f"127.0.0.1:{1000 + index}")
+            for index, channel in enumerate(["a", "b", "a", "b", "a"])
+        ]
+
+    def ids(self, **kwargs) -> list:
+        """
+        the ids of the connections selected
+        """
+        return [connection.id for connection in self.registry.select(**kwargs)]
+
+    def test_select(self):
+        """
+        test the connections are selected in order, after the cursor
+        :return:
+        """
+        self.assertListEqual(self.ids(), [1, 2, 3, 4, 5])
+        self.assertListEqual(self.ids(after=2), [3, 4, 5])
+        self.assertListEqual(self.ids(channel="a", after=1), [3, 5])
+        self.assertListEqual(self.ids(channel="c"), [])
+
+    def test_update(self):
+        """
+        test the connections are indexed by the fields updated, in the order of
+        their ids
+        :return:
+        """
+        first, _, third, _, fifth = self.connections
+        self.registry.update(fifth, user="alice")
+        self.registry.update(first, user="alice", destination="example.com", port=443)
+        self.registry.update(third, user="bob")
+
+        self.assertListEqual(self.ids(user="alice"), [1, 5])
+        self.assertListEqual(self.ids(user="alice", destination="example.com"), [1])
+        self.assertListEqual(self.ids(channel="a", user="bob"), [3])
+
+        self.registry.update(fifth, user="bob")
+        self.assertListEqual(self.ids(user="alice"), [1])
+        self.assertListEqual(self.ids(user="bob"), [3, 5])
+
+    def test_index_order(self):
+        """
+        test the ids of an index are kept in order when the field is set out of
+        order, and a connection indexed during a query is not repeated
+        :return:
+        """
+        first, second, third, fourth, _ = self.connections
+        for connection in (fourth, second, third):
+            self.registry.update(connection, user="alice")
+        self.assertListEqual(self.registry.indexes["user"]["alice"].order, [2, 3, 4])
+
+        self.registry.update(third, user="bob")
+        self.registry.update(third, user="alice")
+        self.assertListEqual(self.registry.indexes["user"]["alice"].order, [2, 3, 4])
+
+        selected = self.registry.select(user="alice")
+        self.assertEqual(next(selected).id, 2)
+        self.registry.update(first, user="alice")
+        self.assertListEqual([connection.id for connection in selected], [3, 4])
+        self.assertListEqual(self.ids(user="alice", after=2), [3, 4])
+
+    def test_min_bytes(self):
+        """
+        test the connections are filtered by the bytes relayed
+        :return:
+        """
+        self.connections[1].sent = 100
+        self.connections[3].received = 2000
+
+        self.assertListEqual(self.ids(min_bytes=100), [2, 4])
+        self.assertListEqual(self.ids(min_bytes=1000), [4])
+
+    def test_unregister(self):
+        """
+        test a connection lost is removed from the indexes, and the ids lost are
+        removed from the order once they are half of it
+        :return:
+        """
+        self.registry.update(self.connections[0], user="alice")
+        for connection in self.connections[:3]:
+            self.registry.unregister(connection)
+
+        self.assertEqual(len(self.registry), 2)
+        self.assertListEqual(self.ids(), [4, 5])
+        self.assertNotIn("alice", self.registry.indexes["user"])
+        self.assertListEqual(list(self.registry.indexes["channel"]["a"]), [5])
+
+        connections = [self.registry.register("a", "") for _ in range(100)]
+        for connection in connections:
+            self.registry.unregister(connection)
+        self.assertLess(len(self.registry.order), 100)
+        self.assertListEqual(self.ids(after=3), [4, 5])
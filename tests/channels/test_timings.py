@@ -0,0 +1,127 @@
+"""
+Test HandshakeTimings class, and the report of the phases in LogStats and Web
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.case import TestCase
+
+from bifrost.channels.timings import PHASES, HandshakeTimings, summaries
+from bifrost.extensions import LogStats, Web
+from tests.fakes import fake_channel
+
+
+class FakeLoop:
+    """
+    A loop whose time is moved by hand
+    """
+
+    def __init__(self):
+        self.now = 100.0
+
+    def time(self):
+        """
+        the time of this loop
+        """
+        return self.now
+
+
+class HandshakeTimingsTest(TestCase):
+    """
+    test HandshakeTimings class
+    """
+
+    def setUp(self) -> None:
+        self.channel = fake_channel()
+        self.loop = FakeLoop()
+        self.timings = HandshakeTimings(self.channel, self.loop)
+
+    def test_histograms(self):
+        """
+        test the channel has a histogram in Stats for every phase
+        :return:
+        """
+        self.assertListEqual(list(self.channel.histogram_phases), list(PHASES))
+        self.assertIs(
+            self.channel.histogram_phases["greeting"],
+            self.channel.stats.histograms["handshake/test/greeting"],
+        )
+
+    def test_phases(self):
+        """
+        test every phase is timed from the end of the previous one, and the
+        total from the connection made
+        :return:
+        """
+        histograms = self.channel.histogram_phases
+        for phase, duration in (("greeting", 0.001), ("request", 0.002)):
+            self.loop.now += duration
+            self.timings.phase(phase)
+        self.loop.now += 0.004
+        self.timings.phase("connect")
+        self.timings.replied()
+
+        self.assertAlmostEqual(histograms["greeting"].total, 0.001)
+        self.assertAlmostEqual(histograms["request"].total, 0.002)
+        self.assertAlmostEqual(histograms["connect"].total, 0.004)
+        self.assertAlmostEqual(histograms["total"].total, 0.007)
+        self.assertEqual(histograms["auth"].count, 0)
+
+    def test_summaries(self):
+        """
+        test the phases observed are summarized by the channels
+        :return:
+        """
+        self.loop.now += 0.001
+        self.timings.phase("greeting")
+        self.channel.stats.histogram("loop/lag").observe(0.001)
+
+        channels = summaries(self.channel.stats.histograms)
+
+        self.assertListEqual(list(channels), ["test"])
+        self.assertListEqual(list(channels["test"]), ["greeting"])
+        self.assertEqual(channels["test"]["greeting"]["count"], 1)
+
+
+class ReportTest(TestCase):
+    """
+    test the phases are reported by LogStats and Web
+    """
+
+    def setUp(self) -> None:
+        self.channel = fake_channel()
+        self.channel.histogram_phases["greeting"].observe(0.002)
+        self.service = self.channel.service
+
+    def test_logstats(self):
+        """
+        test the percentiles of the phases are logged
+        :return:
+        """
+        log_stats = LogStats.from_service(self.service)
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.addCleanup(asyncio.set_event_loop, None)
+        self.addCleanup(loop.close)
+
+        with self.assertLogs(log_stats.logger) as logs:
+            log_stats.log()
+        log_stats.timer_handle.cancel()
+
+        self.assertIn(
+            "Handshakes of [test] p50/p99 in ms: greeting 2.000/2.000", logs.output[-1],
+        )
+
+    def test_web(self):
+        """
+        test the phases are returned by the route of Web
+        :return:
+        """
+        web = Web(self.service, name=f"Web{id(self)}")
+
+        response = asyncio.run(web.handshakes(SimpleNamespace(args={})))
+
+        self.assertEqual(response.status, 200)
+        body = json.loads(response.body)
+        self.assertEqual(body["test"]["greeting"]["count"], 1)
+        self.assertAlmostEqual(body["test"]["greeting"]["max"], 0.002)
@@ -0,0 +1,114 @@
+"""
+Test LoopMonitor class and its route of Web
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.case import TestCase
+
+from bifrost.extensions import LoopMonitor, Web
+from tests.fakes import fake_service
+
+
+def blocking_callback():
+    """
+    a callback blocking the loop
+    """
+    time.sleep(0.2)
+
+
+class LoopMonitorTest(TestCase):
+    """
+    test LoopMonitor class
+    """
+
+    def setUp(self) -> None:
+        self.service = fake_service(
+            LOOP_MONITOR_INTERVAL=0.01, LOOP_MONITOR_SLOW_CALLBACK=0.05
+        )
+        self.monitor = LoopMonitor.from_service(self.service)
+
+    def run_loop(self, *callbacks):
+        """
+        run the monitor in a loop calling the callbacks
+        """
+
+        async def run():
+            await self.monitor.start()
+            await asyncio.sleep(0.05)
+            for callback in callbacks:
+                asyncio.get_event_loop().call_soon(callback)
+            await asyncio.sleep(0.05)
+            await self.monitor.stop()
+
+        asyncio.run(run())
+
+    def test_lag(self):
+        """
+        test the lag is sampled in the histogram of Stats
+        :return:
+        """
+        self.run_loop()
+
+        histogram = self.service.stats.histograms["loop/lag"]
+        self.assertGreater(histogram.count, 3)
+        self.assertLess(histogram.max, 0.05)
+        self.assertListEqual(self.monitor.report()["slow_callbacks"], [])
+
+    def test_slow_callback(self):
+        """
+        test a callback blocking the loop is captured with its stack
+        :return:
+        """
+        with self.assertLogs(self.monitor.logger, "WARNING"):
+            self.run_loop(blocking_callback)
+
+        self.assertGreaterEqual(self.service.stats.histograms["loop/lag"].max, 0.15)
+        self.assertEqual(self.service.stats["loop/slow_callbacks"], 1)
+
+        (slow_callback,) = self.monitor.report()["slow_callbacks"]
+        self.assertTrue(slow_callback["callback"].startswith("blocking_callback "))
+        self.assertIn("time.sleep(0.2)", slow_callback["stack"][-1])
+        self.assertGreaterEqual(slow_callback["lag"], 0.15)
+
+
+class WebLoopMonitorTest(TestCase):
+    """
+    test the route of LoopMonitor in Web
+    """
+
+    def setUp(self) -> None:
+        service = fake_service()
+        self.monitor = LoopMonitor.from_service(service)
+        service.extension_manager = SimpleNamespace(
+            extensions={"LoopMonitor": self.monitor}
+        )
+        self.web = Web(service, name=f"Web{id(self)}")
+
+    def request(self) -> tuple:
+        """
+        call the route with a request
+        """
+        response = asyncio.run(self.web.loop_monitor(SimpleNamespace(args={})))
+        return response.status, json.loads(response.body)
+
+    def test_get(self):
+        """
+        test the lag and the slow callbacks are reported
+        :return:
+        """
+        self.monitor.histogram_lag.observe(0.002)
+
+        status, body = self.request()
+        self.assertEqual(status, 200)
+        self.assertEqual(body["lag"]["count"], 1)
+        self.assertListEqual(body["slow_callbacks"], [])
+
+    def test_not_enabled(self):
+        """
+        test the route is not found without LoopMonitor
+        :return:
+        """
+        self.web.service.extension_manager.extensions.clear()
+        self.assertEqual(self.request()[0], 404)
@@ -0,0 +1,141 @@
+"""
+Test NegativeCache class and its routes of Web
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.case import TestCase
+
+from bifrost.extensions import NegativeCache, Web
+from tests.fakes import fake_service
+
+
+class NegativeCacheTest(TestCase):
+    """
+    test NegativeCache class
+    """
+
+    def setUp(self) -> None:
+        self.cache = NegativeCache.from_service(
+            fake_service(NEGATIVE_CACHE_TTL=0.05, NEGATIVE_CACHE_MAX_TTL=0.15)
+        )
+        asyncio.run(self.cache.start())
+
+    def test_get(self):
+        """
+        test a failure is kept for TTL
+        :return:
+        """
+        self.assertIsNone(self.cache.get("example.com", 80))
+
+        self.cache.add("example.com", 80, 0x05)
+        self.assertEqual(self.cache.get("example.com", 80), 0x05)
+        self.assertIsNone(self.cache.get("example.com", 443))
+        self.assertEqual(self.cache.counter_hits.value, 1)
+
+        self.cache.discard("example.com", 80)
+        self.assertIsNone(self.cache.get("example.com", 80))
+
+    def test_replies(self):
+        """
+        test only the REP codes of REPLIES are kept
+        :return:
+        """
+        self.cache.add("example.com", 80, 0x01)
+        self.assertIsNone(self.cache.get("example.com", 80))
+
+    def test_backoff(self):
+        """
+        test the time doubles with the failures in a row up to MAX_TTL
+        :return:
+        """
+        for _ in range(4):
+            self.cache.add("example.com", 80, 0x06)
+
+        entry = self.cache.cache[("example.com", 80)]
+        self.assertEqual(entry.failures, 4)
+        self.assertListEqual([e["ttl"] <= 0.15 for e in self.cache.entries()], [True])
+
+        self.cache.add("example.net", 80, 0x06)
+        self.cache.add("example.net", 80, 0x06)
+        self.assertGreater(self.cache.entries()[-1]["ttl"], 0.05)
+
+    def test_expires(self):
+        """
+        test a failure is forgotten after TTL
+        :return:
+        """
+        self.cache.add("example.com", 80, 0x04)
+        asyncio.run(asyncio.sleep(0.06))
+        self.assertIsNone(self.cache.get("example.com", 80))
+        self.assertListEqual(self.cache.entries(), [])
+
+    def test_size(self):
+        """
+        test the least recently used target is dropped
+        :return:
+        """
+        cache = NegativeCache.from_service(fake_service(NEGATIVE_CACHE_SIZE=2))
+        for port in range(3):
+            cache.add("example.com", port, 0x05)
+        self.assertListEqual([entry["port"] for entry in cache.entries()], [1, 2])
+
+
+class WebNegativeCacheTest(TestCase):
+    """
+    test the routes of NegativeCache in Web
+    """
+
+    def setUp(self) -> None:
+        service = fake_service()
+        self.cache = NegativeCache.from_service(service)
+        service.extension_manager = SimpleNamespace(
+            extensions={"NegativeCache": self.cache}
+        )
+        self.web = Web(service, name=f"Web{id(self)}")
+
+    def request(self, method: str, **args) -> tuple:
+        """
+        call the route with a request
+        """
+        response = asyncio.run(
+            self.web.negative_cache(SimpleNamespace(method=method, args=args))
+        )
+        return response.status, json.loads(response.body)
+
+    def test_get(self):
+        """
+        test the failing targets are listed
+        :return:
+        """
+        self.cache.add("example.com", 80, 0x05)
+
+        status, body = self.request("GET")
+        self.assertEqual(status, 200)
+        self.assertListEqual(
+            [(e["host"], e["port"], e["rep"]) for e in body["entries"]],
+            [("example.com", 80, 0x05)],
+        )
+
+    def test_delete(self):
+        """
+        test one or all of the targets are forgotten
+        :return:
+        """
+        self.cache.add("example.com", 80, 0x05)
+        self.cache.add("example.net", 80, 0x05)
+
+        self.assertEqual(self.request("DELETE", host="example.com")[0], 400)
+        self.assertEqual(
+            self.request("DELETE", host="Example.com", port="80"), (200, {"flushed": 1})
+        )
+        self.assertEqual(self.request("DELETE"), (200, {"flushed": 1}))
+        self.assertEqual(self.request("GET"), (200, {"entries": []}))
+
+    def test_not_enabled(self):
+        """
+        test the route is not found without NegativeCache
+        :return:
+        """
+        self.web.service.extension_manager.extensions.clear()
+        self.assertEqual(self.request("GET")[0], 404)
@@ -0,0 +1,107 @@
+"""
+Test Stats and SharedMemoryStats classes
+"""
+import asyncio
+import os
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.case import TestCase
+
+from bifrost.extensions import SharedMemoryStats, Stats
+from bifrost.settings import Settings
+from bifrost.utils import get_settings
+from bifrost.utils.shared_stats import read_stats
+
+
+class StatsTest(TestCase):
+    """
+    test Stats class
+    """
+
+    def setUp(self) -> None:
+        self.stats = Stats(SimpleNamespace(settings=Settings()))
+
+    def tearDown(self) -> None:
+        del self.stats
+
+    def test_counter(self):
+        """
+        test the handle of a counter is resolved once and seen by the mapping
+        :return:
+        """
+        self.stats.increase("data/sent", 10)
+        counter = self.stats.counter("data/sent")
+        self.assertIs(self.stats.counter("data/sent"), counter)
+
+        counter.add(5)
+        self.stats.increase("data/sent")
+        self.assertEqual(self.stats["data/sent"], 16)
+
+        self.stats["time/start"] = "now"
+        self.assertDictEqual(dict(self.stats), {"data/sent": 16, "time/start": "now"})
+
+    def test_counter_from_value(self):
+        """
+        test the value kept by the key is moved into the counter
+        :return:
+        """
+        self.assertEqual(self.stats["data/received"], 0)
+        self.stats["flow/buffered"] = 10
+        self.stats.counter("flow/buffered").add(-10)
+        self.assertEqual(self.stats["flow/buffered"], 0)
+        self.assertEqual(len(self.stats), 2)
+
+
+class SharedMemoryStatsTest(TestCase):
+    """
+    test SharedMemoryStats class
+    """
+
+    def setUp(self) -> None:
+        self.settings = get_settings()
+        with self.settings.unfreeze() as settings:
+            settings["STATS_SHM_NAME"] = f"bifrost_test_{os.getpid()}"
+            settings["STATS_SHM_SLOTS"] = 2
+            settings["STATS_SHM_KEY_SIZE"] = 16
+        self.stats = SharedMemoryStats(SimpleNamespace(settings=self.settings))
+
+    def tearDown(self) -> None:
+        self.stats.segment.unlink()
+        self.stats.segment.close()
+
+    def test_increase(self):
+        """
+        test the counters are in the segment, and the others in the process
+        :return:
+        """
+        self.stats["time/start"] = datetime.now()
+        self.stats.increase("data/sent", 10)
+        self.stats.increase("data/sent", 5)
+        self.stats.increase("data/received", 1, start=100)
+        self.stats.increase("connections", 1)  # no slot left
+
+        self.assertEqual(self.stats["data/sent"], 15)
+        self.assertEqual(self.stats["connections"], 1)
+        self.assertEqual(self.stats["unknown"], 0)
+        self.assertDictEqual(
+            read_stats(self.settings["STATS_SHM_NAME"]),
+            {"data/sent": 15, "data/received": 101},
+        )
+        self.assertSetEqual(
+            set(self.stats),
+            {"time/start", "data/sent", "data/received", "connections", "unknown"},
+        )
+
+    def test_stop(self):
+        """
+        test the segment is removed with the counters kept in the process
+        :return:
+        """
+        self.stats["time/start"] = datetime.now()
+        self.stats.increase("data/sent", 10)
+
+        asyncio.run(self.stats.stop())
+
+        self.assertDictEqual(read_stats(self.settings["STATS_SHM_NAME"]), {})
+        self.stats.increase("data/sent", 1)
+        self.assertEqual(self.stats["data/sent"], 11)
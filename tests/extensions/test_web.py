@@ -0,0 +1,155 @@
+"""
+Test the JSON routes of Web over the stats, the channels and the connections
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.case import TestCase
+
+from bifrost.extensions import Web
+from bifrost.middlewares import RegistryMiddleware
+from tests.fakes import fake_channel
+
+
+class FakeStream:
+    """
+    A streaming response recording the data sent
+    """
+
+    def __init__(self):
+        self.content_type = None
+        self.body = bytearray()
+        self.ended = False
+
+    async def send(self, data):
+        """
+        record the data sent
+        """
+        self.body.extend(data)
+
+    async def eof(self):
+        """
+        end the response
+        """
+        self.ended = True
+
+
+class WebTest(TestCase):
+    """
+    test the routes of the stats, the channels and the connections
+    """
+
+    def setUp(self) -> None:
+        channel = fake_channel()
+        self.service = channel.service
+        self.service.channels = {"test": channel}
+        self.middleware = RegistryMiddleware.from_service(self.service)
+        self.service.middleware_manager = SimpleNamespace(
+            middlewares={"RegistryMiddleware": self.middleware}
+        )
+        self.web = Web(self.service, name=f"Web{id(self)}")
+
+        registry = self.middleware.registry
+        for index in range(5):
+            connection = registry.register("test", f"127.0.0.1:{1000 + index}")
+            registry.update(connection, user="alice" if index % 2 else "bob")
+            connection.sent = index * 100
+
+    def call(self, route, **args) -> tuple:
+        """
+        call a route with a request of the arguments
+        """
+        response = asyncio.run(route(SimpleNamespace(args=args)))
+        return response.status, json.loads(response.body)
+
+    def stream(self, **args) -> dict:
+        """
+        call the route of the connections with a request of the arguments
+        """
+        stream = FakeStream()
+
+        async def respond(content_type=None):
+            stream.content_type = content_type
+            return stream
+
+        request = SimpleNamespace(args=args, respond=respond)
+        self.assertIsNone(asyncio.run(self.web.connections(request)))
+        self.assertTrue(stream.ended)
+        self.assertEqual(stream.content_type, "application/json")
+        return json.loads(stream.body)
+
+    def test_stats(self):
+        """
+        test the stats with a prefix are returned
+        :return:
+        """
+        self.service.stats.counter("data/sent").add(1400)
+        self.service.stats["time/start"] = "2020-01-01 00:00:00"
+
+        status, body = self.call(self.web.stats, prefix="data/")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body["stats"]["data/sent"], 1400)
+        self.assertNotIn("time/start", body["stats"])
+
+    def test_channels(self):
+        """
+        test every channel is returned with its connections registered
+        :return:
+        """
+        status, body = self.call(self.web.channels)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body["test"]["registered"], 5)
+        self.assertEqual(body["test"]["active"], 0)
+
+    def test_connections(self):
+        """
+        test the connections are paged with the cursor
+        :return:
+        """
+        body = self.stream(limit="2")
+        self.assertListEqual([item["id"] for item in body["connections"]], [1, 2])
+        self.assertEqual(body["next"], 2)
+
+        body = self.stream(limit="2", cursor=str(body["next"]))
+        self.assertListEqual([item["id"] for item in body["connections"]], [3, 4])
+
+        body = self.stream(limit="2", cursor=str(body["next"]))
+        self.assertListEqual([item["id"] for item in body["connections"]], [5])
+        self.assertIsNone(body["next"])
+
+    def test_connections_filtered(self):
+        """
+        test the connections are filtered by the user and the bytes
+        :return:
+        """
+        body = self.stream(user="alice", min_bytes="200")
+
+        self.assertListEqual([item["id"] for item in body["connections"]], [4])
+        self.assertEqual(body["connections"][0]["user"], "alice")
+        self.assertIsNone(body["next"])
+
+    def test_connections_invalid(self):
+        """
+        test the arguments not integers, or negative, are refused
+        :return:
+        """
+        for args in (
+            {"limit": "many"},
+            {"limit": "-1"},
+            {"cursor": "-1"},
+            {"min_bytes": "-1"},
+        ):
+            with self.subTest(args=args):
+                status, _ = self.call(self.web.connections, **args)
+                self.assertEqual(status, 400)
+
+    def test_connections_not_enabled(self):
+        """
+        test the route is not found without RegistryMiddleware
+        :return:
+        """
+        self.service.middleware_manager.middlewares.clear()
+        status, _ = self.call(self.web.connections)
+        self.assertEqual(status, 404)
@@ -0,0 +1,161 @@
+"""
+Fake objects used in tests
+"""
+import socket
+from types import SimpleNamespace
+
+from bifrost.channels import Channel
+from bifrost.extensions import NegativeCache, Stats
+from bifrost.middlewares import MiddlewareManager
+from bifrost.settings import Settings, defaults
+from bifrost.utils import get_settings
+from bifrost.utils.misc import load_object
+
+
+class FakeSignalManager:  # pylint: disable = too-few-public-methods
+    """
+    A signal manager drops all signals
+    """
+
+    def connect(self, receiver, signal):
+        """
+        connect nothing
+        """
+
+    def send(self, signal, **kwargs):
+        """
+        send nothing
+        """
+
+
+class FakeTransport:
+    """
+    A transport records the calls of flow control
+    """
+
+    def __init__(self, buffered=0, congestion=0):
+        self.buffered = buffered
+        self.congestion = congestion
+        self.reading = True
+        self.closing = False
+        self.aborted = False
+        self.limits = None
+        self.protocol = None
+        self.written = bytearray()
+
+    def get_extra_info(self, name, default=None):
+        """
+        the information of a local connection
+        """
+        return {
+            "peername": ("127.0.0.1", 50000),
+            "sockname": ("127.0.0.1", 1080),
+            "socket": SimpleNamespace(family=socket.AF_INET),
+        }.get(name, default)
+
+    def get_write_buffer_size(self):
+        """
+        the size of the write buffer
+        """
+        return self.buffered
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        """
+        record the watermarks
+        """
+        self.limits = (high, low)
+
+    def write(self, data):
+        """
+        record the written data, a part of it is kept in the buffer if the
+        transport is congested
+        """
+        self.written.extend(data)
+        self.buffered += self.congestion
+
+    def is_closing(self):
+        """
+        whether this transport is closing
+        """
+        return self.closing
+
+    def close(self):
+        """
+        close this transport
+        """
+        self.closing = True
+
+    def abort(self):
+        """
+        abort this transport
+        """
+        self.closing = True
+        self.aborted = True
+
+    def set_protocol(self, protocol):
+        """
+        replace the protocol
+        """
+        self.protocol = protocol
+
+    def get_protocol(self):
+        """
+        get the protocol
+        """
+        return self.protocol
+
+    def pause_reading(self):
+        """
+        pause reading
+        """
+        self.reading = False
+
+    def resume_reading(self):
+        """
+        resume reading
+        """
+        self.reading = True
+
+
+def fake_service(**settings) -> SimpleNamespace:
+    """
+    A service with the default settings over the given ones, real stats and a
+    fake signal manager
+    """
+    _settings = get_settings()
+    with _settings.unfreeze() as __settings:
+        __settings.update(settings)
+    return SimpleNamespace(
+        settings=_settings,
+        stats=Stats(SimpleNamespace(settings=_settings)),
+        signal_manager=FakeSignalManager(),
+    )
+
+
+def fake_channel(config=None, settings=None, name="test") -> Channel:
+    """
+    A channel with the config over the default server channel, the default
+    settings, real stats, middlewares, resolver and negative cache, and a fake
+    signal manager
+    """
+    settings = Settings(
+        dict(
+            {key: getattr(defaults, key) for key in dir(defaults) if key.isupper()},
+            **(settings or {}),
+            CHANNELS={name: dict(defaults.CHANNELS["server"], **(config or {}))},
+        )
+    )
+    service = SimpleNamespace(
+        settings=settings,
+        stats=Stats(SimpleNamespace(settings=settings)),
+        signal_manager=FakeSignalManager(),
+    )
+    # a new manager for every channel instead of the singleton one
+    service.middleware_manager = type.__call__(MiddlewareManager, service)
+    service.resolver = load_object(settings["CLS_RESOLVER"]).from_service(service)
+    negative_cache = NegativeCache.from_service(service)
+    negative_cache.counter_hits = service.stats.counter("negative_cache/hits")
+    service.extension_manager = SimpleNamespace(
+        extensions={"NegativeCache": negative_cache}
+    )
+    return Channel(service, name=name, setting_prefix=f"CHANNEL_{name.upper()}_")
@@ -0,0 +1,102 @@
+"""
+Test MiddlewareManager class
+"""
+from unittest.case import TestCase
+
+from bifrost.base import BaseComponent
+from bifrost.protocols import Client, Relay
+from tests.fakes import FakeTransport, fake_channel
+
+
+class RecordMiddleware(BaseComponent):
+    """
+    A middleware recording the hooks called
+    """
+
+    name = "RecordMiddleware"
+    setting_prefix = "MIDDLEWARE_RECORD_"
+
+    calls = []
+
+    def data_received(self, protocol, data):
+        """
+        record the data received in any role
+        """
+        self.calls.append(("data_received", protocol.role, data))
+
+    def client_eof_received(self, protocol):
+        """
+        record the eof received in client role only
+        """
+        self.calls.append(("client_eof_received", protocol.role))
+
+
+class MiddlewareManagerTest(TestCase):
+    """
+    test MiddlewareManager class
+    """
+
+    def setUp(self) -> None:
+        RecordMiddleware.calls = []
+
+    def test_compile_without_middlewares(self):
+        """
+        test the protocol class is used as it is without any middleware
+        :return:
+        """
+        channel = fake_channel(settings={"MIDDLEWARES": {}})
+        self.assertIs(channel.middleware_manager.compile(Client, "client"), Client)
+        self.assertIs(type(Client.from_channel(channel)), Client)
+
+    def test_compile(self):
+        """
+        test the hooks with middlewares are compiled once, the others are bare
+        :return:
+        """
+        channel = fake_channel(
+            settings={
+                "MIDDLEWARES": {
+                    "bifrost.middlewares.StatsMiddleware": 10,
+                    "tests.middlewares.test_manager.RecordMiddleware": 20,
+                }
+            }
+        )
+        manager = channel.middleware_manager
+
+        compiled = manager.compile(Relay, "client")
+        self.assertTrue(issubclass(compiled, Relay))
+        self.assertIs(manager.compile(Relay, "client"), compiled)
+        self.assertIs(manager.compile(compiled, "client"), compiled)
+        self.assertIs(compiled.connection_lost, Relay.connection_lost)
+
+        self.assertEqual(len(manager.chains[(Relay, "client", "buffer_updated")]), 1)
+        self.assertEqual(len(manager.chains[(Relay, "client", "eof_received")]), 1)
+        manager.compile(Relay, "interface")
+        self.assertEqual(manager.chains[(Relay, "interface", "eof_received")], ())
+
+    def test_chain(self):
+        """
+        test the middlewares are called in the role before the hook
+        :return:
+        """
+        channel = fake_channel(
+            settings={
+                "MIDDLEWARES": {
+                    "bifrost.middlewares.StatsMiddleware": 10,
+                    "tests.middlewares.test_manager.RecordMiddleware": 20,
+                }
+            }
+        )
+        protocol = Client.from_channel(channel)
+        protocol.transport = FakeTransport()
+        protocol.server_transport = FakeTransport()
+
+        protocol.data_received(b"hello")
+        protocol.eof_received()
+
+        self.assertEqual(protocol.server_transport.written, b"hello")
+        self.assertEqual(channel.stats["data/test/received"], 5)
+        self.assertListEqual(
+            RecordMiddleware.calls,
+            [("data_received", "client", b"hello"), ("client_eof_received", "client")],
+        )
@@ -0,0 +1,83 @@
+"""
+Test RegistryMiddleware class
+"""
+import asyncio
+import socket
+from unittest.case import TestCase
+
+from bifrost.protocols.socks5 import Socks5Protocol
+from tests.fakes import FakeTransport, fake_channel
+
+
+class RegistryMiddlewareTest(TestCase):
+    """
+    test RegistryMiddleware class with a socks5 connection relayed
+    """
+
+    def setUp(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        self.channel = fake_channel(
+            config={
+                "AUTH_METHODS": {
+                    0x02: "bifrost.protocols.socks5.methods.UsernamePasswordAuth"
+                },
+                "USERNAMEPASSWORD_USERS": {"alice": "secret"},
+            },
+            settings={"MIDDLEWARES": {"bifrost.middlewares.RegistryMiddleware": 0}},
+        )
+        self.registry = self.channel.middleware_manager.get_middleware(
+            "RegistryMiddleware"
+        ).registry
+
+    def tearDown(self) -> None:
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_connection(self):
+        """
+        test a connection is registered with its user, destination and bytes
+        until it is lost
+        :return:
+        """
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        self.addCleanup(listener.close)
+        port = listener.getsockname()[1]
+
+        protocol = Socks5Protocol.from_channel(self.channel)
+        transport = FakeTransport()
+        transport.set_protocol(protocol)
+        protocol.connection_made(transport)
+        (connection,) = self.registry.select()
+        self.assertEqual(connection.peer, "127.0.0.1:50000")
+
+        protocol.data_received(b"\x05\x01\x02" + b"\x01\x05alice\x06secret")
+        protocol.data_received(
+            b"\x05\x01\x00\x01\x7f\x00\x00\x01" + port.to_bytes(2, "big")
+        )
+        self.loop.run_until_complete(protocol.handshake)
+        target, _ = listener.accept()
+        self.addCleanup(target.close)
+
+        # the relays took over both transports
+        relay = transport.get_protocol()
+        relay.get_buffer(-1)[:4] = b"ping"
+        relay.buffer_updated(4)
+        target.sendall(b"hello")
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+
+        self.assertListEqual(list(self.registry.select(user="alice")), [connection])
+        self.assertListEqual(
+            list(self.registry.select(destination="127.0.0.1")), [connection]
+        )
+        self.assertEqual(connection.port, port)
+        # the handshake and the data relayed
+        self.assertEqual(connection.sent, 27 + 4)
+        self.assertEqual(connection.received, 5)
+
+        relay.connection_lost(None)
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.assertEqual(len(self.registry), 0)
@@ -0,0 +1,131 @@
+"""
+Test the parser of the Socks5 handshake
+"""
+from unittest.case import TestCase
+
+from bifrost.exceptions.protocol import (
+    ProtocolVersionNotSupportedException,
+    Socks5AddressTypeNotSupportedException,
+)
+from bifrost.protocols.socks5.parser import (
+    Greeting,
+    Request,
+    Socks5Parser,
+    UsernamePassword,
+    parse_greeting,
+    parse_request,
+    parse_username_password,
+)
+
+GREETING = b"\x05\x02\x00\x02"
+USERNAME_PASSWORD = b"\x01\x05alice\x06secret"
+REQUEST_IPV4 = b"\x05\x01\x00\x01\x7f\x00\x00\x01\x00\x50"
+REQUEST_DOMAIN = b"\x05\x01\x00\x03\x0bexample.com\x01\xbb"
+REQUEST_IPV6 = b"\x05\x01\x00\x04" + b"\x00" * 15 + b"\x01\x00\x50"
+
+
+class ParseTest(TestCase):
+    """
+    test the functions parsing a message
+    """
+
+    def test_parse_greeting(self):
+        """
+        test the method selection message
+        :return:
+        """
+        self.assertTupleEqual(
+            parse_greeting(GREETING + b"more"), (Greeting(0x05, b"\x00\x02"), 4)
+        )
+        self.assertIsNone(parse_greeting(GREETING[:3]))
+        with self.assertRaises(ProtocolVersionNotSupportedException):
+            parse_greeting(b"\x04\x01\x00")
+
+    def test_parse_username_password(self):
+        """
+        test the username/password request
+        :return:
+        """
+        self.assertTupleEqual(
+            parse_username_password(USERNAME_PASSWORD),
+            (UsernamePassword(0x01, b"alice", b"secret"), 14),
+        )
+        for size in range(len(USERNAME_PASSWORD)):
+            self.assertIsNone(parse_username_password(USERNAME_PASSWORD[:size]))
+
+    def test_parse_request(self):
+        """
+        test the SOCKS request with all address types
+        :return:
+        """
+        self.assertTupleEqual(
+            parse_request(REQUEST_IPV4),
+            (Request(0x05, 0x01, 0x00, 0x01, "127.0.0.1", 80), 10),
+        )
+        self.assertTupleEqual(
+            parse_request(REQUEST_DOMAIN),
+            (Request(0x05, 0x01, 0x00, 0x03, b"example.com", 443), 18),
+        )
+        self.assertTupleEqual(
+            parse_request(REQUEST_IPV6),
+            (Request(0x05, 0x01, 0x00, 0x04, "::1", 80), 22),
+        )
+        for size in range(len(REQUEST_DOMAIN)):
+            self.assertIsNone(parse_request(REQUEST_DOMAIN[:size]))
+
+        with self.assertRaises(Socks5AddressTypeNotSupportedException):
+            parse_request(b"\x05\x01\x00\x05\x00\x00")
+
+
+class Socks5ParserTest(TestCase):
+    """
+    test Socks5Parser class
+    """
+
+    def setUp(self) -> None:
+        self.parser = Socks5Parser()
+
+    def tearDown(self) -> None:
+        del self.parser
+
+    def test_fragmented(self):
+        """
+        test the messages are parsed when received byte by byte
+        :return:
+        """
+        events = []
+        for expect, message in (
+            (Greeting, GREETING),
+            (UsernamePassword, USERNAME_PASSWORD),
+            (Request, REQUEST_DOMAIN),
+        ):
+            for i in range(len(message)):
+                self.assertIsNone(self.parser.next_event(expect))
+                self.parser.receive_data(message[i : i + 1])
+            events.append(self.parser.next_event(expect))
+
+        self.assertListEqual(
+            events,
+            [
+                Greeting(0x05, b"\x00\x02"),
+                UsernamePassword(0x01, b"alice", b"secret"),
+                Request(0x05, 0x01, 0x00, 0x03, b"example.com", 443),
+            ],
+        )
+        self.assertEqual(self.parser.trailing_data(), b"")
+
+    def test_coalesced(self):
+        """
+        test the messages received in one segment are parsed one by one, and
+        the bytes after them are left
+        :return:
+        """
+        self.parser.receive_data(GREETING + USERNAME_PASSWORD + REQUEST_IPV4 + b"GET")
+
+        self.assertIsInstance(self.parser.next_event(Greeting), Greeting)
+        self.assertIsInstance(
+            self.parser.next_event(UsernamePassword), UsernamePassword
+        )
+        self.assertIsInstance(self.parser.next_event(Request), Request)
+        self.assertEqual(self.parser.trailing_data(), b"GET")
+        self.assertIsNone(self.parser.next_event(Request))
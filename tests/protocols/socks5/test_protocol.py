@@ -0,0 +1,500 @@
+"""
+Test Socks5Protocol class
+"""
+import asyncio
+import socket
+from unittest.case import TestCase
+from unittest.mock import patch
+
+from bifrost.protocols.socks5 import DATA, HOST, STATES, Socks5Protocol
+from bifrost.protocols.socks5.parser import Request
+from tests.fakes import FakeTransport, fake_channel
+
+
+class Socks5ProtocolTest(TestCase):
+    """
+    test Socks5Protocol class
+    """
+
+    def setUp(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        # keep the protocol in DATA state
+        self.protocol = Socks5Protocol.from_channel(
+            fake_channel(config={"RELAY_PROTOCOL": None})
+        )
+        self.protocol.transport = FakeTransport()
+
+    def tearDown(self) -> None:
+        del self.protocol
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def patch_host(self, event_received) -> None:
+        """
+        replace the handler of the request shared by all protocols in this test
+        """
+        patcher = patch.object(STATES[HOST], "event_received", event_received)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_data_received_data_state(self):
+        """
+        test the data is forwarded without any task in DATA state
+        :return:
+        """
+        self.protocol.state = DATA
+        self.protocol.client_transport = FakeTransport()
+
+        self.protocol.data_received(b"hello")
+
+        self.assertEqual(bytes(self.protocol.client_transport.written), b"hello")
+        self.assertIsNone(self.protocol.handshake)
+
+    def test_data_received_in_order(self):
+        """
+        test the data received during the handshake is kept in order
+        :return:
+        """
+        connected = self.loop.create_future()
+        events = []
+
+        async def event_received(protocol, event):  # pylint: disable = unused-argument
+            events.append(event)
+            await connected
+            self.protocol.client_transport = FakeTransport()
+
+        self.protocol.state = HOST
+        self.patch_host(event_received)
+
+        self.protocol.data_received(b"\x05\x01\x00\x01\x7f\x00")
+        self.protocol.data_received(b"\x00\x01\x00\x50hello ")
+        self.protocol.data_received(b"world")
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+        self.assertListEqual(events, [Request(0x05, 0x01, 0x00, 0x01, "127.0.0.1", 80)])
+        self.assertIsNotNone(self.protocol.handshake)
+
+        connected.set_result(None)
+        self.loop.run_until_complete(self.protocol.handshake)
+
+        self.assertEqual(self.protocol.state, DATA)
+        self.assertEqual(bytes(self.protocol.client_transport.written), b"hello world")
+        self.assertIsNone(self.protocol.handshake)
+
+    def test_pipelined_handshake(self):
+        """
+        test the greeting, authentication and request sent in one segment are
+        all processed
+        :return:
+        """
+        self.protocol = Socks5Protocol.from_channel(
+            fake_channel(
+                config={
+                    "RELAY_PROTOCOL": None,
+                    "AUTH_METHODS": {
+                        0x02: "bifrost.protocols.socks5.methods.UsernamePasswordAuth"
+                    },
+                    "USERNAMEPASSWORD_AUTH_BACKEND": (
+                        "bifrost.protocols.socks5.methods."
+                        "UsernamePasswordAuthConfigBackend"
+                    ),
+                    "USERNAMEPASSWORD_USERS": {"alice": "secret"},
+                }
+            )
+        )
+        self.protocol.transport = FakeTransport()
+
+        async def event_received(protocol, event):  # pylint: disable = unused-argument
+            self.protocol.client_transport = FakeTransport()
+            self.protocol.transport.write(b"\x05\x00")
+
+        self.patch_host(event_received)
+
+        self.protocol.data_received(
+            b"\x05\x01\x02"
+            b"\x01\x05alice\x06secret"
+            b"\x05\x01\x00\x03\x0bexample.com\x00\x50"
+            b"GET / HTTP/1.1\r\n"
+        )
+        self.loop.run_until_complete(self.protocol.handshake)
+
+        self.assertEqual(self.protocol.state, DATA)
+        self.assertEqual(
+            bytes(self.protocol.transport.written), b"\x05\x02\x01\x00\x05\x00"
+        )
+        self.assertEqual(
+            bytes(self.protocol.client_transport.written), b"GET / HTTP/1.1\r\n"
+        )
+
+    def test_version_not_supported(self):
+        """
+        test the connection is closed when the version is not supported
+        :return:
+        """
+        self.protocol.data_received(b"\x04\x01\x00")
+        self.loop.run_until_complete(self.protocol.handshake)
+        self.assertTrue(self.protocol.transport.is_closing())
+
+    def test_connect(self):
+        """
+        test the target is connected and the winning family and the latency are
+        counted
+        :return:
+        """
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        self.addCleanup(listener.close)
+        port = listener.getsockname()[1]
+
+        self.protocol.state = HOST
+        self.protocol.data_received(
+            b"\x05\x01\x00\x01\x7f\x00\x00\x01" + port.to_bytes(2, "big")
+        )
+        self.loop.run_until_complete(self.protocol.handshake)
+        self.protocol.client_transport.close()
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+        self.assertEqual(self.protocol.state, DATA)
+        self.assertEqual(
+            bytes(self.protocol.transport.written[:4]), b"\x05\x00\x00\x01"
+        )
+        channel = self.protocol.channel
+        self.assertEqual(channel.counter_connect_families[socket.AF_INET].value, 1)
+        self.assertEqual(channel.counter_connect_families[socket.AF_INET6].value, 0)
+        self.assertGreater(channel.counter_connect_latency.value, 0)
+
+    def test_connect_timeout(self):
+        """
+        test the connection to a target not answering is given up after the
+        connect timeout of the channel
+        :return:
+        """
+        self.protocol = Socks5Protocol.from_channel(
+            fake_channel(config={"RELAY_PROTOCOL": None, "CONNECT_TIMEOUT": 0.1})
+        )
+        self.protocol.transport = FakeTransport()
+
+        # a listener with its backlog filled never answers
+        blackhole = socket.socket()
+        blackhole.bind(("127.0.0.1", 0))
+        blackhole.listen(0)
+        filler = socket.create_connection(blackhole.getsockname())
+        self.addCleanup(blackhole.close)
+        self.addCleanup(filler.close)
+        port = blackhole.getsockname()[1]
+
+        self.protocol.state = HOST
+        self.protocol.data_received(
+            b"\x05\x01\x00\x01\x7f\x00\x00\x01" + port.to_bytes(2, "big")
+        )
+        start = self.loop.time()
+        self.loop.run_until_complete(self.protocol.handshake)
+
+        self.assertLess(self.loop.time() - start, 1)
+        self.assertTrue(self.protocol.transport.is_closing())
+        self.assertEqual(bytes(self.protocol.transport.written[:2]), b"\x05\x06")
+        self.assertEqual(self.protocol.channel.counter_connect_timeouts.value, 1)
+
+    def test_connect_ipv6(self):
+        """
+        test the address bound to an IPv6 target is replied with ATYP X'04'
+        :return:
+        """
+        listener = socket.socket(socket.AF_INET6)
+        listener.bind(("::1", 0))
+        listener.listen(1)
+        self.addCleanup(listener.close)
+        port = listener.getsockname()[1]
+
+        self.protocol.state = HOST
+        self.protocol.data_received(
+            b"\x05\x01\x00\x04" + bytes(15) + b"\x01" + port.to_bytes(2, "big")
+        )
+        self.loop.run_until_complete(self.protocol.handshake)
+        self.protocol.client_transport.close()
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+        written = bytes(self.protocol.transport.written)
+        self.assertEqual(written[:4], b"\x05\x00\x00\x04")
+        self.assertEqual(written[4:20], socket.inet_pton(socket.AF_INET6, "::1"))
+        self.assertEqual(
+            self.protocol.channel.counter_connect_families[socket.AF_INET6].value, 1
+        )
+
+    def test_connect_refused(self):
+        """
+        test a refused connection is replied with X'05' before closing
+        :return:
+        """
+        closed = socket.socket()
+        closed.bind(("127.0.0.1", 0))
+        port = closed.getsockname()[1]
+        closed.close()
+
+        self.protocol.state = HOST
+        self.protocol.data_received(
+            b"\x05\x01\x00\x01\x7f\x00\x00\x01" + port.to_bytes(2, "big")
+        )
+        self.loop.run_until_complete(self.protocol.handshake)
+
+        self.assertEqual(
+            bytes(self.protocol.transport.written),
+            b"\x05\x05\x00\x01\x00\x00\x00\x00\x00\x00",
+        )
+        self.assertTrue(self.protocol.transport.is_closing())
+        self.assertEqual(
+            self.protocol.channel.stats["socks5/test/replies/connection_refused"], 1
+        )
+        negative_cache = self.protocol.channel.service.extension_manager.extensions[
+            "NegativeCache"
+        ]
+        self.assertEqual(negative_cache.get("127.0.0.1", port), 0x05)
+
+    def test_connect_refused_dual_stack(self):
+        """
+        test a host refusing the connections on both families is replied with
+        X'05' and cached
+        :return:
+        """
+        infos = []
+        for family, host in ((socket.AF_INET, "127.0.0.1"), (socket.AF_INET6, "::1")):
+            closed = socket.socket(family)
+            closed.bind((host, 0))
+            infos.append((family, socket.SOCK_STREAM, 0, "", closed.getsockname()))
+            closed.close()
+
+        async def resolve(host, port):  # pylint: disable=unused-argument
+            return infos
+
+        patcher = patch.object(self.protocol.channel.resolver, "resolve", resolve)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.protocol.state = HOST
+        self.protocol.data_received(b"\x05\x01\x00\x03\x09localhost\x00\x50")
+        self.loop.run_until_complete(self.protocol.handshake)
+
+        self.assertEqual(bytes(self.protocol.transport.written[:2]), b"\x05\x05")
+        self.assertTrue(self.protocol.transport.is_closing())
+        negative_cache = self.protocol.channel.service.extension_manager.extensions[
+            "NegativeCache"
+        ]
+        self.assertEqual(negative_cache.get("localhost", 80), 0x05)
+
+    def test_concurrent_auth(self):
+        """
+        test the authentication replies to its own protocol when another
+        handshake authenticates while the backend is awaited
+        :return:
+        """
+        channel = fake_channel(
+            config={
+                "AUTH_METHODS": {
+                    0x02: "bifrost.protocols.socks5.methods.UsernamePasswordAuth"
+                },
+                "USERNAMEPASSWORD_AUTH_BACKEND": (
+                    "bifrost.protocols.socks5.methods."
+                    "UsernamePasswordAuthConfigBackend"
+                ),
+                "USERNAMEPASSWORD_USERS": {"alice": "secret"},
+            }
+        )
+
+        async def authenticate(
+            backend, username, password
+        ):  # pylint: disable = unused-argument
+            await asyncio.sleep(0)
+            return username == b"alice" and password == b"secret"
+
+        patcher = patch(
+            "bifrost.protocols.socks5.methods.UsernamePasswordAuthConfigBackend"
+            ".authenticate",
+            authenticate,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        protocols = []
+        for password in (b"secret", b"wrong!"):
+            protocol = Socks5Protocol.from_channel(channel)
+            protocol.transport = FakeTransport()
+            protocol.data_received(b"\x05\x01\x02\x01\x05alice\x06" + password)
+            protocols.append(protocol)
+        self.loop.run_until_complete(
+            asyncio.gather(*(protocol.handshake for protocol in protocols))
+        )
+
+        self.assertEqual(bytes(protocols[0].transport.written), b"\x05\x02\x01\x00")
+        self.assertFalse(protocols[0].transport.is_closing())
+        self.assertEqual(bytes(protocols[1].transport.written), b"\x05\x02\x01\xff")
+        self.assertTrue(protocols[1].transport.is_closing())
+
+    def test_no_acceptable_methods(self):
+        """
+        test a greeting without any acceptable method is replied with X'FF'
+        before closing, without logging a traceback
+        :return:
+        """
+        with patch.object(self.protocol.logger, "exception") as exception:
+            self.protocol.data_received(b"\x05\x01\x80")
+            self.loop.run_until_complete(self.protocol.handshake)
+
+        self.assertEqual(bytes(self.protocol.transport.written), b"\x05\xff")
+        self.assertTrue(self.protocol.transport.is_closing())
+        exception.assert_not_called()
+
+    def test_not_supported(self):
+        """
+        test an unsupported command or address type is replied before closing
+        :return:
+        """
+        for request, rep in (
+            (b"\x05\x02\x00\x01\x7f\x00\x00\x01\x00\x50", b"\x07"),
+            (b"\x05\x01\x00\x05\x7f\x00\x00\x01\x00\x50", b"\x08"),
+        ):
+            with self.subTest(request=request):
+                self.protocol = Socks5Protocol.from_channel(
+                    fake_channel(config={"RELAY_PROTOCOL": None})
+                )
+                self.protocol.transport = FakeTransport()
+                self.protocol.state = HOST
+
+                self.protocol.data_received(request)
+                self.loop.run_until_complete(self.protocol.handshake)
+
+                self.assertEqual(
+                    bytes(self.protocol.transport.written[:2]), b"\x05" + rep
+                )
+                self.assertTrue(self.protocol.transport.is_closing())
+
+    def test_negative_cache(self):
+        """
+        test a target failing recently is replied without connecting
+        :return:
+        """
+        self.protocol.channel.service.extension_manager.extensions["NegativeCache"].add(
+            "127.0.0.1", 80, 0x05
+        )
+
+        self.protocol.state = HOST
+        self.protocol.data_received(b"\x05\x01\x00\x01\x7f\x00\x00\x01\x00\x50")
+        self.loop.run_until_complete(self.protocol.handshake)
+
+        self.assertEqual(bytes(self.protocol.transport.written[:2]), b"\x05\x05")
+        self.assertTrue(self.protocol.transport.is_closing())
+        self.assertEqual(self.protocol.channel.stats["negative_cache/hits"], 1)
+
+    def connect(self, **config) -> FakeTransport:
+        """
+        a connection made on a channel with the timeouts in the config and a
+        timer wheel ticking every 10ms
+        """
+        self.protocol = Socks5Protocol.from_channel(
+            fake_channel(
+                config=dict({"RELAY_PROTOCOL": None}, **config),
+                settings={"TIMER_WHEEL_RESOLUTION": 0.01},
+            )
+        )
+        transport = FakeTransport()
+        transport.set_protocol(self.protocol)
+        self.protocol.connection_made(transport)
+        return transport
+
+    def test_handshake_timeout(self):
+        """
+        test a client not finishing the handshake is aborted, even if it keeps
+        sending data
+        :return:
+        """
+        transport = self.connect(HANDSHAKE_TIMEOUT=0.05, IDLE_TIMEOUT=10)
+
+        for _ in range(5):
+            # an incomplete greeting
+            self.protocol.data_received(b"\x05")
+            self.loop.run_until_complete(asyncio.sleep(0.02))
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+
+        self.assertTrue(transport.aborted)
+        self.assertEqual(self.protocol.channel.stats["timeouts/test/handshake"], 1)
+        self.assertEqual(len(self.protocol.channel.timer_wheel), 0)
+
+    def test_idle_timeout(self):
+        """
+        test a connection is kept while the data flows, and both sides are
+        aborted once it is idle
+        :return:
+        """
+        transport = self.connect(HANDSHAKE_TIMEOUT=None, IDLE_TIMEOUT=0.1)
+        self.protocol.state = DATA
+        self.protocol.client_transport = FakeTransport()
+
+        for _ in range(5):
+            self.protocol.data_received(b"hello")
+            self.loop.run_until_complete(asyncio.sleep(0.04))
+        self.assertFalse(transport.aborted)
+
+        self.loop.run_until_complete(asyncio.sleep(0.2))
+
+        self.assertTrue(transport.aborted)
+        self.assertTrue(self.protocol.client_transport.aborted)
+        self.assertEqual(self.protocol.channel.stats["timeouts/test/idle"], 1)
+
+    def test_timeouts_cancelled(self):
+        """
+        test the timer of a connection lost is removed from the wheel
+        :return:
+        """
+        self.connect(LIFETIME_TIMEOUT=60)
+        wheel = self.protocol.channel.timer_wheel
+        self.assertEqual(len(wheel), 1)
+
+        self.protocol.connection_lost(None)
+        self.assertEqual(len(wheel), 0)
+
+    def test_handshake_timings(self):
+        """
+        test the phases of a handshake are timed until the first byte from the
+        target
+        :return:
+        """
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        self.addCleanup(listener.close)
+        port = listener.getsockname()[1]
+
+        self.connect()
+        self.protocol.data_received(b"\x05\x01\x00")
+        self.protocol.data_received(
+            b"\x05\x01\x00\x01\x7f\x00\x00\x01" + port.to_bytes(2, "big")
+        )
+        self.loop.run_until_complete(self.protocol.handshake)
+        self.assertIsNone(self.protocol.timings)
+
+        target, _ = listener.accept()
+        self.addCleanup(target.close)
+        target.sendall(b"hello")
+        self.loop.run_until_complete(asyncio.sleep(0.05))
+        self.protocol.client_transport.close()
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+        self.assertEqual(bytes(self.protocol.transport.written[-5:]), b"hello")
+        counts = {
+            phase: histogram.count
+            for phase, histogram in self.protocol.channel.histogram_phases.items()
+        }
+        self.assertDictEqual(
+            counts,
+            {
+                "greeting": 1,
+                "auth": 0,
+                "request": 1,
+                "resolve": 1,
+                "connect": 1,
+                "first_byte": 1,
+                "total": 1,
+            },
+        )
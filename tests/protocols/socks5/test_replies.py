@@ -0,0 +1,57 @@
+"""
+Test the replies of the Socks5 requests
+"""
+import asyncio
+import errno
+import socket
+from unittest.case import TestCase
+
+from bifrost.exceptions.protocol import (
+    Socks5AddressTypeNotSupportedException,
+    Socks5CMDNotSupportedException,
+)
+from bifrost.protocols.socks5 import replies
+
+
+class RepliesTest(TestCase):
+    """
+    test the REP codes and the packing of the replies
+    """
+
+    def test_reply_code(self):
+        """
+        test the errors are mapped to their REP codes
+        :return:
+        """
+        for exc, rep in (
+            (ConnectionRefusedError(errno.ECONNREFUSED, "refused"), 0x05),
+            (OSError(errno.ENETUNREACH, "Network is unreachable"), 0x03),
+            (OSError(errno.EHOSTUNREACH, "No route to host"), 0x04),
+            (OSError(errno.EACCES, "Permission denied"), 0x02),
+            (OSError(errno.ETIMEDOUT, "Connection timed out"), 0x06),
+            (socket.gaierror(socket.EAI_NONAME, "Name unknown"), 0x04),
+            (asyncio.TimeoutError(), 0x06),
+            (OSError("Multiple exceptions"), 0x01),
+            (ValueError(), 0x01),
+            (Socks5CMDNotSupportedException(), 0x07),
+            (Socks5AddressTypeNotSupportedException(), 0x08),
+        ):
+            with self.subTest(exc=exc):
+                self.assertEqual(replies.reply_code(exc), rep)
+
+    def test_pack_reply(self):
+        """
+        test the bound address is packed with its ATYP
+        :return:
+        """
+        self.assertEqual(
+            replies.pack_reply(0x00, socket.AF_INET, "127.0.0.1", 1080),
+            b"\x05\x00\x00\x01\x7f\x00\x00\x01\x04\x38",
+        )
+        self.assertEqual(
+            replies.pack_reply(0x00, socket.AF_INET6, "::1", 1080),
+            b"\x05\x00\x00\x04" + bytes(15) + b"\x01\x04\x38",
+        )
+        self.assertEqual(
+            replies.pack_reply(0x05), b"\x05\x05\x00\x01\x00\x00\x00\x00\x00\x00"
+        )
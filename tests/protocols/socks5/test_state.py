@@ -0,0 +1,86 @@
+"""
+Test the states of Socks5Protocol
+"""
+import asyncio
+from unittest import TestCase
+
+from bifrost.protocols.socks5 import (
+    AUTH,
+    DATA,
+    HOST,
+    INIT,
+    STATES,
+    Socks5Protocol,
+    Socks5StateAuth,
+    Socks5StateData,
+    Socks5StateHost,
+    Socks5StateInit,
+)
+from bifrost.protocols.socks5.methods import NoAuth, UsernamePasswordAuth
+from tests.fakes import fake_channel
+
+
+class Socks5StateTest(TestCase):
+    """
+    test the state machine of Socks5Protocol
+    """
+
+    def setUp(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        # no relay protocol to hand the transports over to in DATA state
+        self.protocol = Socks5Protocol.from_channel(
+            fake_channel(config={"RELAY_PROTOCOL": None})
+        )
+
+    def tearDown(self) -> None:
+        del self.protocol
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def switch(self) -> None:
+        """
+        switch the protocol with the handler of its current state
+        """
+        STATES[self.protocol.state].switch(self.protocol)
+
+    def test_state_machine_init(self):
+        """
+        test a protocol starts in INIT state
+        :return:
+        """
+        self.assertEqual(self.protocol.state, INIT)
+        self.assertIsInstance(STATES[self.protocol.state], Socks5StateInit)
+
+    def test_state_machine_switch(self):
+        """
+        test the states a protocol goes through with an authentication
+        :return:
+        """
+        self.protocol.cls_auth_method = UsernamePasswordAuth
+
+        self.switch()
+        self.assertEqual(self.protocol.state, AUTH)
+        self.assertIsInstance(STATES[self.protocol.state], Socks5StateAuth)
+
+        self.switch()
+        self.assertEqual(self.protocol.state, HOST)
+        self.assertIsInstance(STATES[self.protocol.state], Socks5StateHost)
+
+        self.switch()
+        self.assertEqual(self.protocol.state, DATA)
+        self.assertIsInstance(STATES[self.protocol.state], Socks5StateData)
+
+        self.switch()
+        self.assertEqual(self.protocol.state, DATA)
+
+    def test_state_machine_switch_no_auth(self):
+        """
+        test AUTH state is skipped without authentication
+        :return:
+        """
+        self.protocol.cls_auth_method = NoAuth
+
+        self.switch()
+        self.assertEqual(self.protocol.state, HOST)
@@ -0,0 +1,38 @@
+"""
+Test Interface protocol
+"""
+import asyncio
+from unittest.case import TestCase
+
+from bifrost.protocols import Interface
+from tests.fakes import FakeTransport, fake_channel
+
+
+class InterfaceTest(TestCase):
+    """
+    test Interface protocol
+    """
+
+    def test_data_received(self):
+        """
+        test the data received is forwarded to the client and counted once
+        :return:
+        """
+        channel = fake_channel()
+
+        async def receive():
+            interface = Interface.from_channel(channel, role="interface")
+            transport = FakeTransport()
+            transport.set_protocol(interface)
+            interface.connection_made(transport)
+            interface.client_transport = FakeTransport()
+
+            interface.data_received(b"x" * 100)
+            await asyncio.sleep(0)
+            return interface
+
+        interface = asyncio.run(receive())
+
+        self.assertEqual(bytes(interface.client_transport.written), b"x" * 100)
+        self.assertEqual(channel.stats["data/sent"], 100)
+        self.assertEqual(channel.stats["data/test/sent"], 100)
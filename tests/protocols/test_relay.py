@@ -0,0 +1,98 @@
+"""
+Test Relay protocol
+"""
+from unittest.case import TestCase
+
+from bifrost.protocols import Client, Relay
+from tests.fakes import FakeTransport, fake_channel
+
+
+class RelayTest(TestCase):
+    """
+    test Relay protocol
+    """
+
+    def setUp(self) -> None:
+        self.channel = fake_channel(
+            config={"BUFFER_SIZE": 16, "BUFFER_SIZE_MIN": 8, "BUFFER_SIZE_MAX": 64}
+        )
+
+        client = Client.from_channel(self.channel, role="client")
+        client.transport = FakeTransport()
+        client.server_transport = FakeTransport()
+        client.transport.set_protocol(client)
+        client.writing_paused = True
+        client.buffered = 10
+
+        self.client = client
+        self.relay = Relay.take_over(client)
+
+    def tearDown(self) -> None:
+        del self.relay
+        del self.client
+        del self.channel
+
+    def test_take_over(self):
+        """
+        test the relay replaces the protocol and keeps the status
+        :return:
+        """
+        self.assertIs(self.client.transport.get_protocol(), self.relay)
+        self.assertEqual(self.relay.role, "client")
+        self.assertIs(self.relay.peer_transport, self.client.server_transport)
+        self.assertTrue(self.relay.writing_paused)
+        self.assertEqual(self.relay.buffered, 10)
+        self.assertEqual(self.client.buffered, 0)
+
+    def test_buffer_updated(self):
+        """
+        test the data in the buffer is written to the peer and counted
+        :return:
+        """
+        buffer = self.relay.get_buffer(-1)
+        buffer[:5] = b"hello"
+        self.relay.buffer_updated(5)
+
+        self.assertEqual(bytes(self.relay.peer_transport.written), b"hello")
+        self.assertEqual(self.channel.stats["data/received"], 5)
+        self.assertEqual(self.channel.stats["data/test/received"], 5)
+        self.assertIs(self.relay.get_buffer(-1), buffer)
+
+    def test_buffer_handed_over(self):
+        """
+        test a new buffer is allocated when the peer keeps the written data
+        :return:
+        """
+        self.relay.peer_transport.congestion = 1
+        buffer = self.relay.get_buffer(-1)
+        self.relay.buffer_updated(5)
+        self.assertIsNot(self.relay.get_buffer(-1), buffer)
+
+    def test_buffer_size(self):
+        """
+        test the buffer grows when full and shrinks when underused
+        :return:
+        """
+        self.relay.buffer_updated(16)
+        self.assertEqual(self.relay.buffer_size, 32)
+        self.relay.buffer_updated(32)
+        self.relay.buffer_updated(64)
+        self.assertEqual(self.relay.buffer_size, 64)
+        self.assertEqual(len(self.relay.get_buffer(-1)), 64)
+
+        for _ in range(8):
+            self.relay.buffer_updated(1)
+        self.assertEqual(self.relay.buffer_size, 32)
+        for _ in range(8 * 3):
+            self.relay.buffer_updated(1)
+        self.assertEqual(self.relay.buffer_size, 8)
+
+    def test_connection_lost(self):
+        """
+        test the peer is closed and the buffered bytes released
+        :return:
+        """
+        self.channel.stats["flow/buffered"] = 10
+        self.relay.connection_lost(None)
+        self.assertTrue(self.relay.peer_transport.is_closing())
+        self.assertEqual(self.channel.stats["flow/buffered"], 0)
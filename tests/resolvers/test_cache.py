@@ -0,0 +1,223 @@
+"""
+Test CachingResolver class
+"""
+import asyncio
+import socket
+from types import SimpleNamespace
+from unittest.case import TestCase
+
+from bifrost.extensions import Stats
+from bifrost.resolvers import Answer, BaseResolver, CachingResolver
+from bifrost.settings import Settings
+from tests.fakes import FakeSignalManager
+
+
+class FakeResolver(BaseResolver):
+    """
+    A backend answering a new address for every lookup, after a tick
+    """
+
+    def __init__(self, service, name: str = None, setting_prefix: str = None):
+        super(FakeResolver, self).__init__(service, name, setting_prefix)
+        self.calls = 0
+        self.ttl = None
+        self.error = None
+        self.stopped = False
+
+    async def stop(self) -> None:
+        self.stopped = True
+
+    async def lookup(self, host: str) -> Answer:
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return Answer([(socket.AF_INET, f"192.0.2.{self.calls}")], self.ttl)
+
+
+class CachingResolverTest(TestCase):
+    """
+    test CachingResolver class
+    """
+
+    def setUp(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self) -> None:
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def resolver(self, **config) -> CachingResolver:
+        """
+        a resolver over a fake backend
+        """
+        settings = Settings(
+            {
+                f"RESOLVER_CACHE_{key}": value
+                for key, value in dict(
+                    {
+                        "BACKEND": "tests.resolvers.test_cache.FakeResolver",
+                        "SIZE": 16,
+                        "TTL": 300,
+                        "STALE_TTL": 60,
+                        "NEGATIVE_TTL": 30,
+                    },
+                    **config,
+                ).items()
+            }
+        )
+        service = SimpleNamespace(
+            settings=settings,
+            stats=Stats(SimpleNamespace(settings=settings)),
+            signal_manager=FakeSignalManager(),
+        )
+        return CachingResolver.from_service(service)
+
+    def lookup(self, resolver: CachingResolver, host: str) -> Answer:
+        """
+        look up a name
+        """
+        return self.loop.run_until_complete(resolver.lookup(host))
+
+    def test_hit(self):
+        """
+        test a name is looked up once and then served from the cache
+        :return:
+        """
+        resolver = self.resolver()
+
+        answer = self.lookup(resolver, "example.com")
+        self.assertEqual(self.lookup(resolver, "example.com"), answer)
+        self.assertEqual(resolver.backend.calls, 1)
+        self.assertEqual(resolver.counter_misses.value, 1)
+        self.assertEqual(resolver.counter_hits.value, 1)
+
+    def test_coalesced(self):
+        """
+        test the concurrent lookups of a name share one lookup of the backend
+        :return:
+        """
+        resolver = self.resolver()
+
+        answers = self.loop.run_until_complete(
+            asyncio.gather(*(resolver.lookup("example.com") for _ in range(10)))
+        )
+        self.assertEqual(len(set(map(repr, answers))), 1)
+        self.assertEqual(resolver.backend.calls, 1)
+        self.assertEqual(resolver.counter_coalesced.value, 9)
+        self.assertEqual(resolver.counter_misses.value, 1)
+        self.assertDictEqual(resolver.lookups, {})
+
+    def test_stop(self):
+        """
+        test the lookups in flight are cancelled and the backend is stopped
+        :return:
+        """
+        resolver = self.resolver()
+        # a lookup never answered
+        resolver.backend.lookup = lambda host: asyncio.sleep(10)
+
+        lookup = self.loop.create_task(resolver.lookup("example.com"))
+        self.loop.run_until_complete(asyncio.sleep(0))
+        task = resolver.lookups["example.com"]
+        self.loop.run_until_complete(resolver.stop())
+        self.loop.run_until_complete(
+            asyncio.gather(lookup, task, return_exceptions=True)
+        )
+
+        self.assertTrue(task.cancelled())
+        self.assertTrue(resolver.backend.stopped)
+
+    def test_negative(self):
+        """
+        test a failed lookup is cached for NEGATIVE_TTL
+        :return:
+        """
+        resolver = self.resolver(NEGATIVE_TTL=0.05)
+        resolver.backend.error = socket.gaierror(socket.EAI_NONAME, "Name unknown")
+
+        for _ in range(2):
+            with self.assertRaises(socket.gaierror):
+                self.lookup(resolver, "example.invalid")
+        self.assertEqual(resolver.backend.calls, 1)
+        self.assertEqual(resolver.counter_negative_hits.value, 1)
+
+        self.loop.run_until_complete(asyncio.sleep(0.06))
+        resolver.backend.error = None
+        self.lookup(resolver, "example.invalid")
+        self.assertEqual(resolver.backend.calls, 2)
+
+    def test_stale(self):
+        """
+        test an expired answer is served while it is looked up again, and kept
+        if the lookup fails
+        :return:
+        """
+        resolver = self.resolver(TTL=0.05)
+
+        answer = self.lookup(resolver, "example.com")
+        self.loop.run_until_complete(asyncio.sleep(0.06))
+
+        # served without waiting, then refreshed in the background
+        self.assertEqual(self.lookup(resolver, "example.com"), answer)
+        self.assertEqual(resolver.counter_stale_hits.value, 1)
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        fresh = self.lookup(resolver, "example.com")
+        self.assertNotEqual(fresh, answer)
+        self.assertEqual(resolver.backend.calls, 2)
+
+        self.loop.run_until_complete(asyncio.sleep(0.06))
+        resolver.backend.error = socket.gaierror(socket.EAI_AGAIN, "Try again")
+        self.assertEqual(self.lookup(resolver, "example.com"), fresh)
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        self.assertEqual(self.lookup(resolver, "example.com"), fresh)
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        self.assertEqual(resolver.counter_errors.value, 2)
+
+    def test_ttl(self):
+        """
+        test the time to live of an answer caps TTL
+        :return:
+        """
+        resolver = self.resolver(STALE_TTL=0)
+        resolver.backend.ttl = 0.05
+
+        self.lookup(resolver, "example.com")
+        self.loop.run_until_complete(asyncio.sleep(0.06))
+        self.lookup(resolver, "example.com")
+        self.assertEqual(resolver.backend.calls, 2)
+
+    def test_size(self):
+        """
+        test the least recently used name is dropped
+        :return:
+        """
+        resolver = self.resolver(SIZE=2)
+
+        for host in ("a.example", "b.example", "a.example", "c.example"):
+            self.lookup(resolver, host)
+        self.assertSetEqual(set(resolver.cache), {"a.example", "c.example"})
+
+    def test_resolve(self):
+        """
+        test the addresses are given with the port as getaddrinfo does, and an
+        IP address is not looked up
+        :return:
+        """
+        resolver = self.resolver()
+
+        self.assertListEqual(
+            self.loop.run_until_complete(resolver.resolve(b"example.com", 80)),
+            [
+                (
+                    socket.AF_INET,
+                    socket.SOCK_STREAM,
+                    socket.IPPROTO_TCP,
+                    "",
+                    ("192.0.2.1", 80),
+                )
+            ],
+        )
+        self.loop.run_until_complete(resolver.resolve("::1", 80))
+        self.assertEqual(resolver.backend.calls, 1)
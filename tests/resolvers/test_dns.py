@@ -0,0 +1,275 @@
+"""
+Test DNSResolver class against a local stand-in DNS server
+"""
+import asyncio
+import os
+import socket
+import struct
+import tempfile
+from types import SimpleNamespace
+from unittest.case import TestCase
+
+from bifrost.extensions import Stats
+from bifrost.resolvers import DNSResolver
+from bifrost.resolvers.dns import (
+    FAMILIES,
+    HEADER,
+    RECORD,
+    TYPE_A,
+    TYPE_AAAA,
+    encode_question,
+    parse_server,
+    read_resolv_conf,
+)
+from bifrost.settings import Settings
+from tests.fakes import FakeSignalManager
+
+RECORDS = {
+    "example.com": {TYPE_A: ["192.0.2.1", "192.0.2.2"], TYPE_AAAA: ["2001:db8::1"]},
+    "v4.example.com": {TYPE_A: ["192.0.2.4"]},
+}
+
+
+def answer(query: bytes, truncate: bool = False) -> bytes:
+    """
+    the response of the records to a query
+    """
+    qid = struct.unpack_from("!H", query)[0]
+    question = query[HEADER.size :]
+    labels, offset = [], 0
+    while question[offset]:
+        labels.append(question[offset + 1 : offset + 1 + question[offset]].decode())
+        offset += question[offset] + 1
+    qtype = struct.unpack_from("!H", question, offset + 1)[0]
+
+    name = ".".join(labels)
+    if name not in RECORDS:
+        return HEADER.pack(qid, 0x8183, 1, 0, 0, 0) + question
+    if truncate:
+        return HEADER.pack(qid, 0x8380, 1, 0, 0, 0) + question
+
+    addresses = RECORDS[name].get(qtype, [])
+    records = b"".join(
+        b"\xc0\x0c"
+        + RECORD.pack(qtype, 1, 60 + index, 4 if qtype == TYPE_A else 16)
+        + socket.inet_pton(FAMILIES[qtype], address)
+        for index, address in enumerate(addresses)
+    )
+    return HEADER.pack(qid, 0x8180, 1, len(addresses), 0, 0) + question + records
+
+
+class StandInServer(asyncio.DatagramProtocol):
+    """
+    A DNS server answering the queries in the reverse order of a batch,
+    dropping the first queries, or truncating the responses over UDP
+    """
+
+    def __init__(self, batch: int = 1, drop: int = 0, truncate: bool = False):
+        self.batch = batch
+        self.drop = drop
+        self.truncate = truncate
+        self.queries = []
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if self.drop:
+            self.drop -= 1
+            return
+        self.queries.append((data, addr))
+        if len(self.queries) >= self.batch:
+            for query, addr_ in reversed(self.queries):
+                self.transport.sendto(answer(query, self.truncate), addr_)
+            self.queries = []
+
+
+class DNSResolverTest(TestCase):
+    """
+    test DNSResolver class
+    """
+
+    def setUp(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self) -> None:
+        self.loop.run_until_complete(self.resolver.stop())
+        self.transport.close()
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def start(self, port: int = 0, **kwargs) -> DNSResolver:
+        """
+        start a stand-in server on the port, and a resolver querying it
+        """
+        self.transport, self.server = self.loop.run_until_complete(
+            self.loop.create_datagram_endpoint(
+                lambda: StandInServer(**kwargs), local_addr=("127.0.0.1", port)
+            )
+        )
+        settings = Settings(
+            {
+                "RESOLVER_DNS_SERVERS": [
+                    "127.0.0.1:%s" % self.transport.get_extra_info("sockname")[1]
+                ],
+                "RESOLVER_DNS_TIMEOUT": 0.1,
+                "RESOLVER_DNS_ATTEMPTS": 2,
+            }
+        )
+        service = SimpleNamespace(
+            settings=settings,
+            stats=Stats(SimpleNamespace(settings=settings)),
+            signal_manager=FakeSignalManager(),
+        )
+        self.resolver = DNSResolver.from_service(service)
+        return self.resolver
+
+    def lookup(self, host: str):
+        """
+        look up a name
+        """
+        return self.loop.run_until_complete(self.resolver.lookup(host))
+
+    def test_lookup(self):
+        """
+        test A and AAAA are queried in parallel and the lowest TTL is kept
+        :return:
+        """
+        self.start(batch=2)
+
+        answer_ = self.lookup("Example.COM")
+        self.assertListEqual(
+            answer_.addresses,
+            [
+                (socket.AF_INET6, "2001:db8::1"),
+                (socket.AF_INET, "192.0.2.1"),
+                (socket.AF_INET, "192.0.2.2"),
+            ],
+        )
+        self.assertEqual(answer_.ttl, 60)
+        self.assertEqual(self.resolver.counter_queries.value, 2)
+
+        self.assertListEqual(
+            self.lookup("v4.example.com").addresses, [(socket.AF_INET, "192.0.2.4")]
+        )
+
+    def test_pipelined(self):
+        """
+        test many queries in flight are matched with their responses by ID
+        :return:
+        """
+        self.start(batch=20)
+
+        answers = self.loop.run_until_complete(
+            asyncio.gather(
+                *(
+                    self.resolver.lookup(host)
+                    for host in ["example.com", "v4.example.com"] * 5
+                )
+            )
+        )
+        self.assertListEqual(
+            [len(answer_.addresses) for answer_ in answers], [3, 1] * 5
+        )
+        self.assertDictEqual(self.resolver.pending, {})
+
+    def test_nxdomain(self):
+        """
+        test an unknown name raises gaierror
+        :return:
+        """
+        self.start()
+
+        with self.assertRaises(socket.gaierror) as context:
+            self.lookup("unknown.example")
+        self.assertEqual(context.exception.errno, socket.EAI_NONAME)
+
+    def test_retry(self):
+        """
+        test a query is sent again after the timeout
+        :return:
+        """
+        self.start(drop=1)
+
+        self.assertEqual(len(self.lookup("example.com").addresses), 3)
+        self.assertEqual(self.resolver.counter_failures.value, 1)
+
+        self.server.drop = 4
+        with self.assertRaises(socket.gaierror) as context:
+            self.lookup("example.com")
+        self.assertEqual(context.exception.errno, socket.EAI_AGAIN)
+
+    def test_truncated(self):
+        """
+        test a query is sent over TCP when its response is truncated
+        :return:
+        """
+
+        async def handle(reader, writer):
+            while True:
+                try:
+                    length = struct.unpack("!H", await reader.readexactly(2))[0]
+                except asyncio.IncompleteReadError:
+                    break
+                response = answer(await reader.readexactly(length))
+                writer.write(struct.pack("!H", len(response)) + response)
+            writer.close()
+
+        # the TCP port is bound first, as it is more likely to be taken
+        server = self.loop.run_until_complete(
+            asyncio.start_server(handle, "127.0.0.1", 0)
+        )
+        self.start(port=server.sockets[0].getsockname()[1], truncate=True)
+        try:
+            self.assertEqual(len(self.lookup("example.com").addresses), 3)
+            self.assertEqual(self.resolver.counter_truncated.value, 2)
+        finally:
+            server.close()
+            self.loop.run_until_complete(server.wait_closed())
+
+
+class ConfigTest(TestCase):
+    """
+    test the configuration of the servers
+    """
+
+    def test_parse_server(self):
+        """
+        test the servers with and without ports
+        :return:
+        """
+        self.assertEqual(parse_server("192.0.2.53"), ("192.0.2.53", 53))
+        self.assertEqual(parse_server("192.0.2.53:5353"), ("192.0.2.53", 5353))
+        self.assertEqual(parse_server("2001:db8::53"), ("2001:db8::53", 53))
+        self.assertEqual(parse_server("[2001:db8::53]:5353"), ("2001:db8::53", 5353))
+
+    def test_read_resolv_conf(self):
+        """
+        test the name servers are read from resolv.conf
+        :return:
+        """
+        with tempfile.NamedTemporaryFile("w", delete=False) as file:
+            file.write(
+                "# comment\nsearch example.com\n"
+                "nameserver 192.0.2.53\nnameserver fe80::53%eth0\n"
+            )
+        try:
+            self.assertListEqual(
+                read_resolv_conf(file.name), ["192.0.2.53", "fe80::53"]
+            )
+        finally:
+            os.unlink(file.name)
+        self.assertListEqual(read_resolv_conf("/nonexistent"), [])
+
+    def test_encode_question(self):
+        """
+        test a name is encoded in labels
+        :return:
+        """
+        self.assertEqual(
+            encode_question("Example.com.", TYPE_AAAA),
+            b"\x07example\x03com\x00\x00\x1c\x00\x01",
+        )
@@ -0,0 +1,57 @@
+"""
+Test the shutdown of Bifrost service
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.case import TestCase
+from unittest.mock import patch
+
+from bifrost.service.bifrost import Bifrost
+from tests.fakes import FakeSignalManager
+
+
+class FakeResolver:
+    """
+    A resolver recording if its query in flight is still running when stopped
+    """
+
+    def __init__(self, query: asyncio.Task):
+        self.query = query
+        self.stopped_before_cancel = None
+
+    async def stop(self):
+        """
+        record the state of the query
+        """
+        self.stopped_before_cancel = not self.query.cancelled()
+
+
+class BifrostStopTest(TestCase):
+    """
+    test the shutdown of Bifrost service
+    """
+
+    def test_stop(self):
+        """
+        test the resolver is stopped before the tasks are cancelled
+        :return:
+        """
+        sleep = asyncio.sleep
+
+        async def stop():
+            query = asyncio.create_task(sleep(10))
+            service = SimpleNamespace(
+                stopping=False,
+                signal_manager=FakeSignalManager(),
+                resolver=FakeResolver(query),
+                loop=SimpleNamespace(stop=lambda: None),
+            )
+            with patch("asyncio.sleep", lambda delay: sleep(0)):
+                await Bifrost._stop(service)  # pylint: disable=protected-access
+            return service, query
+
+        service, query = asyncio.run(stop())
+
+        self.assertTrue(service.stopping)
+        self.assertTrue(service.resolver.stopped_before_cancel)
+        self.assertTrue(query.cancelled())
@@ -0,0 +1,127 @@
+"""
+Test Supervisor class
+"""
+import os
+import signal
+import tempfile
+import threading
+import time
+from unittest.case import TestCase
+
+from bifrost.service import Supervisor
+from bifrost.settings import Settings, defaults
+
+
+class FakeService:
+    """
+    A service recording its worker id and crashing once per worker if asked
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+    @classmethod
+    def from_settings(cls, settings: Settings):
+        """
+
+        :param settings:
+        :type settings: Settings
+        :return:
+        """
+        return cls(settings)
+
+    def start(self):
+        """
+
+        :return:
+        """
+        path = os.path.join(
+            self.settings["TEST_DIRECTORY"], str(self.settings["WORKER_ID"])
+        )
+        with open(path, "a") as file:
+            file.write(f"{os.getpid()}\n")
+
+        if self.settings["TEST_CRASH"] and os.path.getsize(path) == len(
+            f"{os.getpid()}\n"
+        ):
+            raise RuntimeError("crash")
+
+        if self.settings["TEST_BLOCK"]:
+            time.sleep(60)
+
+
+class SupervisorTest(TestCase):
+    """
+    test Supervisor class
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings = Settings()
+        with self.settings.unfreeze() as settings:
+            settings.update_from_module(defaults)
+            settings["CLS_SERVICE"] = "tests.service.test_supervisor.FakeService"
+            settings["WORKERS"] = 3
+            settings["WORKER_RESTART_DELAY"] = 0
+            settings["TEST_DIRECTORY"] = self.directory.name
+            settings["TEST_CRASH"] = False
+            settings["TEST_BLOCK"] = False
+        self.supervisor = Supervisor.from_settings(self.settings)
+        self.handlers = {
+            sig: signal.getsignal(sig)
+            for sig in (signal.SIGHUP, signal.SIGQUIT, signal.SIGTERM, signal.SIGINT)
+        }
+
+    def tearDown(self) -> None:
+        for sig, handler in self.handlers.items():
+            signal.signal(sig, handler)
+        self.directory.cleanup()
+        del self.supervisor
+        del self.settings
+
+    def read(self, worker_id: int):
+        """
+        Get the pids of the processes started for a worker
+        :param worker_id:
+        :return:
+        """
+        with open(os.path.join(self.directory.name, str(worker_id))) as file:
+            return file.read().split()
+
+    def test_start(self):
+        """
+        test every worker runs the service with its own id
+        :return:
+        """
+        self.supervisor.start()
+        self.assertListEqual(sorted(os.listdir(self.directory.name)), ["0", "1", "2"])
+        for worker_id in range(3):
+            self.assertEqual(len(self.read(worker_id)), 1)
+        self.assertDictEqual(self.supervisor.workers, {})
+
+    def test_restart(self):
+        """
+        test the crashed workers are restarted with the same id
+        :return:
+        """
+        with self.settings.unfreeze() as settings:
+            settings["TEST_CRASH"] = True
+        self.supervisor.start()
+        for worker_id in range(3):
+            self.assertEqual(len(self.read(worker_id)), 2)
+
+    def test_stop(self):
+        """
+        test the stop signal is forwarded to all workers, which are not restarted
+        :return:
+        """
+        with self.settings.unfreeze() as settings:
+            settings["TEST_BLOCK"] = True
+        timer = threading.Timer(0.5, self.supervisor.stop)
+        timer.start()
+        begin = time.monotonic()
+        self.supervisor.start()
+        timer.join()
+        self.assertLess(time.monotonic() - begin, 10)
+        for worker_id in range(3):
+            self.assertEqual(len(self.read(worker_id)), 1)
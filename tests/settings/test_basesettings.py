@@ -160,3 +160,48 @@ class BaseSettingsTest(TestCase):
         """
         self.assertTrue("a" in self.settings)
         self.assertFalse("c" in self.settings)
+
+    def test_snapshot(self):
+        """
+        test the snapshot is built once while frozen and rebuilt after unfreezing
+        :return:
+        """
+        snapshot = self.settings.snapshot()
+        self.assertDictEqual(dict(snapshot), {"a": 1, "b": 2})
+        with self.assertRaises(TypeError):
+            snapshot["a"] = 3  # type: ignore
+
+        compiled = self.settings._snapshot  # pylint: disable = protected-access
+        self.assertEqual(self.settings["a"], 1)
+        self.assertIs(
+            self.settings._snapshot, compiled  # pylint: disable = protected-access
+        )
+
+        with self.settings.unfreeze() as settings:
+            settings["a"] = 3
+            self.assertEqual(settings["a"], 3)
+        self.assertEqual(self.settings["a"], 3)
+        self.assertDictEqual(dict(self.settings.snapshot()), {"a": 3, "b": 2})
+
+    def test_prefixed(self):
+        """
+        test the views of the values with a prefix
+        :return:
+        """
+        settings = BaseSettings(
+            settings={"PREFIX_A": 1, "PREFIX_B_PREFIX_": 2, "OTHER": 3}
+        )
+
+        view = settings.prefixed("PREFIX_")
+        self.assertDictEqual(dict(view), {"A": 1, "B_PREFIX_": 2})
+        self.assertIs(settings.prefixed("PREFIX_"), view)
+        self.assertDictEqual(dict(settings.prefixed("NONE_")), {})
+
+        with settings.unfreeze() as _settings:
+            _settings["PREFIX_C"] = 4
+            self.assertDictEqual(
+                dict(_settings.prefixed("PREFIX_")), {"A": 1, "B_PREFIX_": 2, "C": 4}
+            )
+        self.assertDictEqual(
+            dict(settings.prefixed("PREFIX_")), {"A": 1, "B_PREFIX_": 2, "C": 4}
+        )
@@ -0,0 +1,76 @@
+"""
+Test SignalManager class
+"""
+import asyncio
+from unittest.case import TestCase
+
+from bifrost.signals import SignalManager, data_received, data_sent
+
+
+class SignalManagerTest(TestCase):
+    """
+    test SignalManager class
+    """
+
+    def setUp(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.signal_manager = SignalManager.from_settings(
+            {"SIGNAL_MANAGER_COALESCE": ["data_sent"]}
+        )
+        self.calls = []
+
+    def tearDown(self) -> None:
+        self.loop.close()
+        del self.signal_manager
+
+    def receiver(self, **kwargs):
+        """
+        record the keyword arguments
+        """
+        self.calls.append(kwargs)
+
+    def run_once(self, *sends):
+        """
+        send the signals in one loop iteration, then run the callbacks
+        """
+
+        async def main():
+            for signal, kwargs in sends:
+                self.signal_manager.send(signal, **kwargs)
+            await asyncio.sleep(0)
+
+        self.loop.run_until_complete(main())
+
+    def test_send_without_receivers(self):
+        """
+        test nothing is scheduled, even without a loop, and no key is added
+        :return:
+        """
+        self.signal_manager.send(data_received, size=10)
+        self.assertNotIn(data_received, self.signal_manager)
+
+    def test_send(self):
+        """
+        test every send is dispatched with its keyword arguments
+        :return:
+        """
+        self.signal_manager.connect(self.receiver, data_received)
+        self.run_once((data_received, {"size": 10}), (data_received, {"size": 5}))
+        self.assertListEqual(self.calls, [{"size": 10}, {"size": 5}])
+
+    def test_coalesce(self):
+        """
+        test the sends in one loop iteration are dispatched once aggregated
+        :return:
+        """
+        self.signal_manager.connect(self.receiver, data_sent)
+        self.run_once(
+            (data_sent, {"size": 10}),
+            (data_sent, {"size": 5, "sender": "b"}),
+            (data_sent, {"size": 1}),
+        )
+        self.run_once((data_sent, {"size": 7}))
+        self.assertListEqual(
+            self.calls,
+            [{"count": 3, "size": 16, "sender": "b"}, {"count": 1, "size": 7}],
+        )
@@ -0,0 +1,178 @@
+"""
+Test the outbound connections with Happy Eyeballs
+"""
+import asyncio
+import socket
+from unittest.case import TestCase
+
+from bifrost.utils.connect import connect_socket, create_connection, interleave
+
+
+def info(family: int, address: tuple) -> tuple:
+    """
+    an address as returned by getaddrinfo
+    """
+    return family, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", address
+
+
+class InterleaveTest(TestCase):
+    """
+    test the order of the addresses
+    """
+
+    def test_interleave(self):
+        """
+        test the families are interleaved starting with the first one
+        :return:
+        """
+        infos = [
+            info(socket.AF_INET6, ("::1", 1)),
+            info(socket.AF_INET6, ("::2", 1)),
+            info(socket.AF_INET6, ("::3", 1)),
+            info(socket.AF_INET, ("127.0.0.1", 1)),
+        ]
+        self.assertListEqual(
+            [i[4][0] for i in interleave(infos)], ["::1", "127.0.0.1", "::2", "::3"]
+        )
+        self.assertListEqual(
+            [i[4][0] for i in interleave(infos[::-1])],
+            ["127.0.0.1", "::3", "::2", "::1"],
+        )
+
+
+class ConnectTest(TestCase):
+    """
+    test racing the connection attempts against local listeners
+    """
+
+    def setUp(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.sockets = []
+
+    def tearDown(self) -> None:
+        for sock in self.sockets:
+            sock.close()
+        self.loop.close()
+
+    def listen(self, family: int, host: str, backlog: bool = True) -> tuple:
+        """
+        a listener accepting the connections in its backlog, or never answering
+        the connections if its backlog is filled
+        """
+        sock = socket.socket(family)
+        self.sockets.append(sock)
+        sock.bind((host, 0))
+        if backlog:
+            sock.listen(8)
+        else:
+            # the following connections are left in SYN_SENT
+            sock.listen(0)
+            filler = socket.socket(family)
+            self.sockets.append(filler)
+            filler.connect(sock.getsockname())
+        return info(family, sock.getsockname())
+
+    def refused(self, family: int, host: str) -> tuple:
+        """
+        an address refusing the connections
+        """
+        sock = socket.socket(family)
+        sock.bind((host, 0))
+        address = sock.getsockname()
+        sock.close()
+        return info(family, address)
+
+    def test_blackhole_first(self):
+        """
+        test the next family is tried after the delay when the first address
+        doesn't answer, and the losing attempt is cancelled
+        :return:
+        """
+        infos = [
+            self.listen(socket.AF_INET6, "::1", backlog=False),
+            self.listen(socket.AF_INET, "127.0.0.1"),
+        ]
+
+        start = self.loop.time()
+        sock = self.loop.run_until_complete(connect_socket(infos, 0.05, self.loop))
+        elapsed = self.loop.time() - start
+        self.sockets.append(sock)
+
+        self.assertEqual(sock.family, socket.AF_INET)
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 1)
+        self.assertEqual(len(asyncio.all_tasks(self.loop)), 0)
+
+    def test_refused_first(self):
+        """
+        test the next address is tried at once when the first one fails
+        :return:
+        """
+        infos = [
+            self.refused(socket.AF_INET6, "::1"),
+            self.listen(socket.AF_INET, "127.0.0.1"),
+        ]
+
+        start = self.loop.time()
+        sock = self.loop.run_until_complete(connect_socket(infos, 10, self.loop))
+        self.sockets.append(sock)
+
+        self.assertEqual(sock.family, socket.AF_INET)
+        self.assertLess(self.loop.time() - start, 1)
+
+    def test_all_refused(self):
+        """
+        test the error is raised when all attempts fail
+        :return:
+        """
+        infos = [self.refused(socket.AF_INET, "127.0.0.1")]
+
+        with self.assertRaises(ConnectionRefusedError):
+            self.loop.run_until_complete(connect_socket(infos, 0.05, self.loop))
+
+    def test_all_refused_dual_stack(self):
+        """
+        test the errno is kept when the addresses of both families are refused
+        :return:
+        """
+        infos = [
+            self.refused(socket.AF_INET, "127.0.0.1"),
+            self.refused(socket.AF_INET6, "::1"),
+        ]
+
+        with self.assertRaises(ConnectionRefusedError) as context:
+            self.loop.run_until_complete(connect_socket(infos, 0.05, self.loop))
+        self.assertIn("Multiple exceptions", str(context.exception))
+
+    def test_timeout(self):
+        """
+        test the connection is given up after the timeout
+        :return:
+        """
+        address = self.listen(socket.AF_INET, "127.0.0.1", backlog=False)[4]
+
+        start = self.loop.time()
+        with self.assertRaises(asyncio.TimeoutError):
+            self.loop.run_until_complete(
+                create_connection(
+                    asyncio.Protocol, *address, delay=0.05, timeout=0.2, loop=self.loop,
+                )
+            )
+        self.assertLess(self.loop.time() - start, 1)
+
+    def test_create_connection(self):
+        """
+        test the transport is created on the connected socket
+        :return:
+        """
+        address = self.listen(socket.AF_INET, "127.0.0.1")[4]
+
+        transport, protocol = self.loop.run_until_complete(
+            create_connection(
+                asyncio.Protocol, address[0].encode(), address[1], loop=self.loop
+            )
+        )
+        self.assertIsInstance(protocol, asyncio.Protocol)
+        self.assertEqual(transport.get_extra_info("peername"), address)
+        transport.close()
+        self.loop.run_until_complete(asyncio.sleep(0))
@@ -0,0 +1,70 @@
+"""
+Test the log-bucketed histogram
+"""
+import random
+from unittest.case import TestCase
+
+from bifrost.utils.histogram import Histogram, bucket_bounds, bucket_index
+
+
+class HistogramTest(TestCase):
+    """
+    test Histogram class
+    """
+
+    def test_buckets(self):
+        """
+        test every value falls in the bounds of its bucket, and the buckets are
+        contiguous
+        :return:
+        """
+        for value in list(range(10000)) + [2 ** 30, 2 ** 30 - 1]:
+            lowest, highest = bucket_bounds(bucket_index(value))
+            self.assertLessEqual(lowest, value)
+            self.assertLessEqual(value, highest)
+
+        for index in range(Histogram.size - 1):
+            self.assertEqual(bucket_bounds(index)[1] + 1, bucket_bounds(index + 1)[0])
+
+    def test_percentile(self):
+        """
+        test the percentiles are within the precision of the buckets
+        :return:
+        """
+        random.seed(0)
+        values = sorted(random.expovariate(100) for _ in range(10000))
+        histogram = Histogram()
+        for value in values:
+            histogram.observe(value)
+
+        for fraction in (0.5, 0.9, 0.99):
+            expected = values[round(fraction * len(values)) - 1]
+            self.assertAlmostEqual(
+                histogram.percentile(fraction), expected, delta=expected / 16
+            )
+        self.assertEqual(histogram.percentile(1), values[-1])
+        self.assertEqual(histogram.count, len(values))
+
+    def test_summary(self):
+        """
+        test the summary of an empty histogram, and the values out of range
+        :return:
+        """
+        histogram = Histogram()
+        self.assertDictEqual(
+            histogram.summary(),
+            {
+                "count": 0,
+                "mean": None,
+                "p50": None,
+                "p90": None,
+                "p99": None,
+                "max": None,
+            },
+        )
+
+        histogram.observe(-1)
+        histogram.observe(10 ** 9)
+        self.assertEqual(histogram.buckets[0], 1)
+        self.assertEqual(histogram.buckets[-1], 1)
+        self.assertListEqual([count for _, count in histogram.cumulative()], [1, 2])
@@ -0,0 +1,203 @@
+"""
+Test the Prometheus text exposition of Stats, and its route of Web
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.case import TestCase
+from unittest.mock import patch
+
+from bifrost.extensions import Stats, Web
+from bifrost.settings import Settings
+from bifrost.utils import prometheus
+from bifrost.utils.histogram import Histogram
+from bifrost.utils.prometheus import (
+    Exposition,
+    metric_name,
+    render_histogram,
+    split_key,
+)
+from tests.fakes import fake_service
+
+
+class RenderTest(TestCase):
+    """
+    test the rendering of the series
+    """
+
+    def test_metric_name(self):
+        """
+        test the characters not allowed are replaced
+        :return:
+        """
+        self.assertEqual(
+            metric_name("data/server-1/sent", "_total"),
+            "bifrost_data_server_1_sent_total",
+        )
+
+    def test_split_key(self):
+        """
+        test the parts of the keys of a channel varying are split as labels
+        :return:
+        """
+        self.assertEqual(
+            split_key("flow/Socks5/paused"), ("flow/paused", {"channel": "Socks5"})
+        )
+        self.assertEqual(
+            split_key("connect/Socks5/ipv4"),
+            ("connect/wins", {"channel": "Socks5", "family": "ipv4"}),
+        )
+        self.assertEqual(
+            split_key("connect/Socks5/timeouts"),
+            ("connect/timeouts", {"channel": "Socks5"}),
+        )
+        self.assertEqual(
+            split_key("timeouts/Socks5/idle"),
+            ("timeouts", {"channel": "Socks5", "timeout": "idle"}),
+        )
+        self.assertEqual(split_key("data/sent"), ("data/sent", {}))
+
+    def test_histogram(self):
+        """
+        test the log buckets are summed up in the buckets exposed
+        :return:
+        """
+        histogram = Histogram()
+        for value in (0.00005, 0.0003, 0.0003, 0.02, 100):
+            histogram.observe(value)
+
+        lines = (
+            render_histogram("bifrost_lag_seconds", {}, histogram).decode().split("\n")
+        )
+
+        self.assertIn('bifrost_lag_seconds_bucket{le="0.0001"} 1', lines)
+        self.assertIn('bifrost_lag_seconds_bucket{le="0.00025"} 1', lines)
+        self.assertIn('bifrost_lag_seconds_bucket{le="0.0005"} 3', lines)
+        self.assertIn('bifrost_lag_seconds_bucket{le="0.025"} 4', lines)
+        self.assertIn('bifrost_lag_seconds_bucket{le="60"} 4', lines)
+        self.assertIn('bifrost_lag_seconds_bucket{le="+Inf"} 5', lines)
+        self.assertIn("bifrost_lag_seconds_count 5", lines)
+
+
+class ExpositionTest(TestCase):
+    """
+    test Exposition class
+    """
+
+    def setUp(self) -> None:
+        self.stats = Stats(SimpleNamespace(settings=Settings()))
+        self.stats.counter("data/sent").add(1400)
+        self.stats.counter("admission/server/active").add(3)
+        self.stats.counter("flow/server/paused").add(2)
+        self.stats.counter("flow/client/paused").add(1)
+        self.stats.histogram("handshake/server/total").observe(0.02)
+        self.stats["time/start"] = "2020-01-01 00:00:00"
+        self.stats["custom"] = 7
+        self.stats.histogram("loop/lag").observe(0.002)
+        self.exposition = Exposition(self.stats, gauges=["admission/*/active"])
+
+    def render(self) -> str:
+        """
+        render the stats
+        """
+        return asyncio.run(self.exposition.render()).decode()
+
+    def test_render(self):
+        """
+        test the counters, the gauges, the numbers and the histograms are
+        rendered
+        :return:
+        """
+        body = self.render()
+
+        self.assertIn("# TYPE bifrost_data_sent_total counter\n", body)
+        self.assertIn("bifrost_data_sent_total 1400\n", body)
+        self.assertIn("# TYPE bifrost_admission_active gauge\n", body)
+        self.assertIn('bifrost_admission_active{channel="server"} 3\n', body)
+        self.assertIn("# TYPE bifrost_custom untyped\n", body)
+        self.assertIn("bifrost_loop_lag_seconds_count 1\n", body)
+        self.assertNotIn("time_start", body)
+
+    def test_labels(self):
+        """
+        test the series of a metric of all channels are rendered together after
+        one type
+        :return:
+        """
+        body = self.render()
+
+        self.assertEqual(body.count("# TYPE bifrost_flow_paused_total counter\n"), 1)
+        self.assertIn(
+            "# TYPE bifrost_flow_paused_total counter\n"
+            'bifrost_flow_paused_total{channel="server"} 2\n'
+            'bifrost_flow_paused_total{channel="client"} 1\n',
+            body,
+        )
+        self.assertIn(
+            'bifrost_handshake_seconds_bucket{channel="server",phase="total",le="0.025"}'
+            " 1\n",
+            body,
+        )
+
+    def test_changed_only(self):
+        """
+        test only the series changed since the last scrape are rendered again
+        :return:
+        """
+        self.render()
+        self.stats.counter("data/sent").add(100)
+
+        with patch.object(
+            prometheus, "render_value", wraps=prometheus.render_value
+        ) as render_value, patch.object(
+            prometheus, "render_histogram", wraps=prometheus.render_histogram
+        ) as render_histogram:
+            body = self.render()
+
+        render_value.assert_called_once_with("bifrost_data_sent_total", {}, 1500)
+        render_histogram.assert_not_called()
+        self.assertIn("bifrost_custom 7\n", body)
+
+    def test_cache(self):
+        """
+        test the body is returned as it is within the cache time
+        :return:
+        """
+        self.exposition.cache = 60
+        body = self.render()
+        self.stats.counter("data/sent").add(100)
+
+        self.assertEqual(self.render(), body)
+
+    def test_batch(self):
+        """
+        test the rendering yields to the loop between the batches
+        :return:
+        """
+        for index in range(prometheus.BATCH * 2):
+            self.stats.counter(f"key/{index}")
+
+        with patch.object(prometheus.asyncio, "sleep", wraps=asyncio.sleep) as sleep:
+            self.render()
+
+        self.assertEqual(sleep.call_count, 2)
+
+
+class WebMetricsTest(TestCase):
+    """
+    test the route of the metrics in Web
+    """
+
+    def test_metrics(self):
+        """
+        test the stats of the service are served in the text format
+        :return:
+        """
+        service = fake_service()
+        service.stats.counter("data/sent").add(1400)
+        web = Web(service, name=f"Web{id(self)}")
+
+        response = asyncio.run(web.metrics(SimpleNamespace(args={})))
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.content_type, prometheus.CONTENT_TYPE)
+        self.assertIn(b"bifrost_data_sent_total 1400\n", response.body)
@@ -0,0 +1,86 @@
+"""
+Test the counters in shared memory
+"""
+import os
+from unittest.case import TestCase
+
+from bifrost.utils.shared_stats import SharedStatsSegment, read_stats
+
+
+class SharedStatsSegmentTest(TestCase):
+    """
+    test SharedStatsSegment class and read_stats function
+    """
+
+    def setUp(self) -> None:
+        self.name = f"bifrost_test_{os.getpid()}"
+        self.segments = [
+            SharedStatsSegment.create(f"{self.name}.{worker_id}", 4, 16)
+            for worker_id in range(2)
+        ]
+
+    def tearDown(self) -> None:
+        for segment in self.segments:
+            segment.unlink()
+            segment.close()
+
+    def test_allocate(self):
+        """
+        test the keys fitting in the segment get a slot
+        :return:
+        """
+        segment = self.segments[0]
+        self.assertEqual(segment.allocate("data/sent", 10), 0)
+        self.assertEqual(segment.allocate("data/received"), 1)
+        self.assertIsNone(segment.allocate("a key longer than 16 bytes"))
+        segment.values[1] += 5
+        self.assertDictEqual(segment.items(), {"data/sent": 10, "data/received": 5})
+
+        segment.allocate("a")
+        segment.allocate("b")
+        self.assertIsNone(segment.allocate("c"))
+        self.assertEqual(segment.used, 4)
+
+    def test_read_stats(self):
+        """
+        test the counters of all workers are summed, skipping the missing ones
+        :return:
+        """
+        for worker_id, segment in enumerate(self.segments):
+            segment.values[segment.allocate("data/sent")] += 100
+            segment.allocate(f"worker/{worker_id}", 1)
+
+        self.assertDictEqual(
+            read_stats(self.name, workers=3),
+            {"data/sent": 200, "worker/0": 1, "worker/1": 1},
+        )
+        # reading doesn't remove the segments
+        self.assertEqual(
+            read_stats(self.name, workers=1), {"data/sent": 100, "worker/0": 1}
+        )
+
+    def test_reuse(self):
+        """
+        test the counters left in a segment of the same layout are kept
+        :return:
+        """
+        self.segments[0].allocate("data/sent", 42)
+        segment = SharedStatsSegment.create(f"{self.name}.0", 4, 16)
+        self.assertDictEqual(segment.items(), {"data/sent": 42})
+        segment.close()
+
+        segment = SharedStatsSegment.create(f"{self.name}.0", 2, 16)
+        self.assertDictEqual(segment.items(), {})
+        segment.close()
+
+    def test_replace_smaller(self):
+        """
+        test a segment left smaller than the layout is replaced
+        :return:
+        """
+        self.segments[0].allocate("data/sent", 42)
+        segment = SharedStatsSegment.create(f"{self.name}.0", 1024, 64)
+        self.assertEqual(segment.slots, 1024)
+        self.assertDictEqual(segment.items(), {})
+        self.assertEqual(segment.allocate("data/sent", 1), 0)
+        segment.close()
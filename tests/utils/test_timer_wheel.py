@@ -0,0 +1,180 @@
+"""
+Test the hierarchical timer wheel
+"""
+import random
+from unittest.case import TestCase
+
+from bifrost.utils.timer_wheel import TimerWheel
+
+
+class FakeHandle:  # pylint: disable = too-few-public-methods
+    """
+    A handle of the fake loop
+    """
+
+    def __init__(self, when, callback):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        cancel this handle
+        """
+        self.cancelled = True
+
+
+class FakeLoop:
+    """
+    A loop whose clock is moved by the test
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.handles = []
+
+    def time(self):
+        """
+        the clock of this loop
+        """
+        return self.now
+
+    def call_at(self, when, callback):
+        """
+        record the handle
+        """
+        handle = FakeHandle(when, callback)
+        self.handles.append(handle)
+        return handle
+
+    def call_exception_handler(self, context):
+        """
+        raise the exception of a callback
+        """
+        raise context["exception"]
+
+    def advance(self, seconds):
+        """
+        move the clock and run the handles due
+        """
+        self.now += seconds
+        while due := [
+            handle
+            for handle in self.handles
+            if handle.when <= self.now and not handle.cancelled
+        ]:
+            for handle in due:
+                self.handles.remove(handle)
+                handle.callback()
+
+
+class TimerWheelTest(TestCase):
+    """
+    test TimerWheel class
+    """
+
+    def setUp(self) -> None:
+        self.loop = FakeLoop()
+        # a small wheel spanning 4 ** 3 ticks
+        self.wheel = TimerWheel(self.loop, resolution=1, slots=4, levels=3)
+        self.fired = []
+
+    def fire(self, name):
+        """
+        record the tick of a timer fired
+        """
+        self.fired.append((name, self.wheel.tick))
+
+    def test_call_later(self):
+        """
+        test the timers fire at their ticks in order
+        :return:
+        """
+        self.wheel.call_later(3, self.fire, "c")
+        self.wheel.call_later(1, self.fire, "a")
+        self.wheel.call_later(1.5, self.fire, "b")
+
+        for _ in range(3):
+            self.loop.advance(1)
+
+        self.assertListEqual(self.fired, [("a", 1), ("b", 2), ("c", 3)])
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_cancel(self):
+        """
+        test a timer cancelled never fires, and the wheel stops ticking without
+        any timer
+        :return:
+        """
+        timer = self.wheel.call_later(2, self.fire, "a")
+        timer.cancel()
+        timer.cancel()
+
+        self.assertTrue(timer.cancelled())
+        self.assertEqual(len(self.wheel), 0)
+
+        self.loop.advance(5)
+        self.assertListEqual(self.fired, [])
+        self.assertListEqual(self.loop.handles, [])
+
+    def test_cascade(self):
+        """
+        test the timers in the upper levels, and beyond the span of the last
+        level, are cascaded down and fire at their ticks
+        :return:
+        """
+        random.seed(0)
+        delays = [random.randint(1, 200) for _ in range(100)]
+        for index, delay in enumerate(delays):
+            self.wheel.call_later(delay, self.fire, index)
+
+        for _ in range(max(delays)):
+            self.loop.advance(1)
+
+        self.assertEqual(len(self.fired), len(delays))
+        for index, tick in self.fired:
+            self.assertEqual(tick, delays[index])
+
+    def test_late(self):
+        """
+        test the ticks passed are all processed when the loop is late
+        :return:
+        """
+        self.wheel.call_later(2, self.fire, "a")
+        self.wheel.call_later(20, self.fire, "b")
+
+        self.loop.advance(10)
+        self.assertListEqual(self.fired, [("a", 2)])
+        self.assertEqual(self.wheel.tick, 10)
+
+        self.loop.advance(10)
+        self.assertListEqual(self.fired, [("a", 2), ("b", 20)])
+
+    def test_idle(self):
+        """
+        test the ticks passed without any timer are skipped
+        :return:
+        """
+        self.loop.advance(100)
+        self.assertEqual(self.wheel.now(), 100)
+
+        self.wheel.call_later(1, self.fire, "a")
+        self.loop.advance(1)
+        self.assertListEqual(self.fired, [("a", 101)])
+
+    def test_reschedule(self):
+        """
+        test a callback scheduling a timer in the wheel
+        :return:
+        """
+
+        def again(count):
+            self.fire(count)
+            if count:
+                self.wheel.call_later(1, again, count - 1)
+
+        self.wheel.call_later(1, again, 2)
+        for _ in range(5):
+            self.loop.advance(1)
+
+        self.assertListEqual(self.fired, [(2, 1), (1, 2), (0, 3)])